@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: MIT
 
 import time
+from wrist.boottime import BootTimeline  # first, so its clock covers the other imports
 import board
 import microcontroller
 import displayio
@@ -11,13 +12,40 @@ from analogio import AnalogIn
 import neopixel
 import adafruit_adt7410
 from adafruit_bitmap_font import bitmap_font
-from adafruit_display_text.label import Label
 from adafruit_button import Button
 import adafruit_touchscreen
+from adafruit_bus_device.i2c_device import I2CDevice
 from adafruit_pyportal import PyPortal
 import adafruit_lsm9ds1
 import adafruit_si7021
 import adafruit_ds3231
+from wrist.atlas import Atlas
+from wrist.audio import Audio
+from wrist.clock import RtcClock
+from wrist.crew import CrewView, load_roster
+from wrist.frames import FrameGovernor
+from wrist.glyphpack import GlyphPack
+from wrist.heap import HeapMeter
+from wrist.history import History
+from wrist.images import ImageCache
+from wrist.labels import LabelUpdater, TextBuffer
+from wrist.motion import AccelFIFO, MotionService, Shake, Steps, WristRaise
+from wrist.power import PowerManager, PowerState
+from wrist.scheduler import Scheduler
+from wrist.scrolllist import ScrollList
+from wrist.sensors import SensorCache
+from wrist.telemetry import TelemetryLog
+from wrist.tilemap import TileMap
+from wrist.touch import TouchEngine
+from wrist.views import Views
+from wrist.vitals import VitalsFeed
+
+# Set to True to print how long each part of startup takes and how much heap
+# it uses; tools/boot_diff.py compares two of these timelines.
+BOOT_PROFILE = False
+BOOT_PROFILE_FILE = None  # e.g. "/sd/boot_timeline.json" to keep a copy
+boot_timeline = BootTimeline(BOOT_PROFILE, BOOT_PROFILE_FILE)
+boot_timeline.mark("imports")
 
 # ------------- Inputs and Outputs Setup ------------- #
 try:  # attempt to init. the temperature sensor
@@ -49,7 +77,7 @@ months = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct",
 
 if False:  # change to True if you want to set the time!
     #                     year, mon, date, hour, min, sec, wday, yday, isdst
-    current = time.struct_time((2022, 03, 09, 17, 23, 0, 5, -1, -1))
+    current = time.struct_time((2022, 3, 9, 17, 23, 0, 5, -1, -1))
     # you must set year, mon, date, hour, min, sec and weekday
     # yearday is not supported, isdst can be set but we don't do anything with it at this time
     print("Setting time to:", current)  # uncomment for debugging
@@ -57,6 +85,14 @@ if False:  # change to True if you want to set the time!
     print()
 # pylint: enable-msg=using-constant-test
 
+# The time shown is extrapolated from the monotonic clock between syncs with
+# the RTC every CLOCK_RESYNC seconds, which also measure and correct the
+# monotonic clock's drift; no frame reads the RTC.
+CLOCK_RESYNC = 600
+wall_clock = RtcClock(rtc, resync=CLOCK_RESYNC)
+
+boot_timeline.mark("i2c sensors")
+
 pixel = neopixel.NeoPixel(board.NEOPIXEL, 1, brightness=1)
 WHITE = 0xffffff
 RED = 0xff0000
@@ -82,6 +118,7 @@ def numberUP(num, max_val):
 
 # ------------- Screen Setup ------------- #
 pyportal = PyPortal()
+boot_timeline.mark("pyportal")
 display = board.DISPLAY
 display.rotation = 0
 
@@ -92,12 +129,14 @@ def set_backlight(val):
     board.DISPLAY.auto_brightness = False
     board.DISPLAY.brightness = val
 
-# Set the Backlight
+# Set the Backlight. Once running, the power manager sets it within this
+# range by ambient light: the low end in the dark, the high end in daylight.
 if board.board_id == "pyportal_titano":
     # 0.3 brightness does not cause the display to be visible on the Titano
-    set_backlight(1)
+    BACKLIGHT_RANGE = (0.5, 1)
 else:
-    set_backlight(0.3)
+    BACKLIGHT_RANGE = (0.1, 0.5)
+set_backlight(BACKLIGHT_RANGE[1])
 
 # Touchscreen setup
 # -------Rotate 0:
@@ -109,27 +148,25 @@ ts = adafruit_touchscreen.Touchscreen(board.TOUCH_XL, board.TOUCH_XR,
                                       calibration=((5200, 59000), (5800, 57000)),
                                       size=(screen_width, screen_height))
 
+boot_timeline.mark("touchscreen")
+
+# ------------- Audio ------------- #
+# Effects are read into RAM once and played without waiting for them, so a
+# tap never waits on flash or on the sound. Every other sample is kept
+# (24kHz), which halves their RAM; drop an effect here to save its share.
+AUDIO_STEP = 2
+BEEP_COALESCE = 0.15  # repeat beeps closer together than this are dropped
+AUDIO_PERIOD = 0.05
+
+pyportal.peripherals.speaker_disable = False
+audio = Audio(pyportal.peripherals.audio)  # PyPortal already holds the AUDIO_OUT pin
+audio.load("beep", soundBeep, step=AUDIO_STEP, interrupt=True, coalesce=BEEP_COALESCE)
+audio.load("tab", soundTab, step=AUDIO_STEP, coalesce=BEEP_COALESCE)
+audio.load("demo", soundDemo, step=AUDIO_STEP)
+boot_timeline.mark("audio")
+
 # ------------- Display Groups ------------- #
 splash = displayio.Group()  # The Main Display Group
-view1 = displayio.Group()  # Group for View 1 objects
-view2 = displayio.Group()  # Group for View 2 objects
-view3 = displayio.Group()  # Group for View 3 objects
-view4 = displayio.Group()  # Group for View 4 objects
-view5 = displayio.Group()  # Group for View 5 objects
-view6 = displayio.Group()  # Group for View 6 objects
-
-def hideLayer(hide_target):
-    try:
-        splash.remove(hide_target)
-    except ValueError:
-        pass
-
-def showLayer(show_target):
-    try:
-        time.sleep(0.1)
-        splash.append(show_target)
-    except ValueError:
-        pass
 
 # ------------- Setup for Images ------------- #
 
@@ -141,13 +178,19 @@ bg_group = displayio.Group()
 splash.append(bg_group)
 
 
-icon_group = displayio.Group()
-icon_group.x = 240
-icon_group.y = 0
-icon_group.scale = 1
-view1.append(icon_group)
+# This will handel switching Images and Icons. Bitmaps are shared between
+# every group showing the same file, and closed once the cache needs the room.
+IMAGE_CACHE_BUDGET = 64 * 1024  # bytes of image data kept for images not on screen
+images = ImageCache(IMAGE_CACHE_BUDGET)
+
+# Icons and portraits packed by tools/build_atlas.py are drawn as tiles of one
+# shared sheet and palette; anything not in the atlas is opened on its own.
+try:
+    atlas = Atlas("/images/atlas.json")
+except OSError:
+    # No atlas built, every image comes from its own file
+    atlas = None
 
-# This will handel switching Images and Icons
 def set_image(group, filename):
     """Set the image file for a given goup for display.
     This is most useful for Icons or image slideshows.
@@ -156,228 +199,150 @@ def set_image(group, filename):
     """
     print("Set image to ", filename)
     if group:
-        group.pop()
+        images.release(group.pop())
 
     if not filename:
         return  # we're done, no icon desired
 
-    # CircuitPython 6 & 7 compatible
-    image_file = open(filename, "rb")
-    image = displayio.OnDiskBitmap(image_file)
-    image_sprite = displayio.TileGrid(image, pixel_shader=getattr(image, 'pixel_shader', displayio.ColorConverter()))
-
-    # # CircuitPython 7+ compatible
-    # image = displayio.OnDiskBitmap(filename)
-    # image_sprite = displayio.TileGrid(image, pixel_shader=image.pixel_shader)
+    if atlas and filename in atlas:
+        group.append(atlas.tilegrid(filename))
+    else:
+        group.append(images.tilegrid(filename))
 
-    group.append(image_sprite)
+boot_timeline.mark("images")
 
 #set_image(bg_group, "/images/solid.bmp")
 
 # ---------- Text Boxes ------------- #
-# Set the font and preload letters
-font = bitmap_font.load_font("/fonts/Helvetica-Bold-16.bdf")
-font.load_glyphs(b'abcdefghjiklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890- ()') # pre-load glyphs for fast printing
-
-# Default Label styling:
-TABS_X = 5
-TABS_Y = 5
-
-# User 1 ###################################################################
-############################################################################
-user_group = displayio.Group(x=0, y=50, scale=1)
-view1.append(user_group)
-
-item1_group = displayio.Group(x=65, y=55, scale=1)
-view1.append(item1_group)
-
-item2_group = displayio.Group(x=100, y=55, scale=1)
-view1.append(item2_group)
-
-item3_group = displayio.Group(x=135, y=55, scale=1)
-view1.append(item3_group)
-
-item4_group = displayio.Group(x=170, y=55, scale=1)
-view1.append(item4_group)
-
-item5_group = displayio.Group(x=65, y=85, scale=1)
-view1.append(item5_group)
-
-home1_label = Label(font, x = TABS_X, y = TABS_Y+10, color=0xc29542, scale=2)
-view1.append(home1_label)
-
-home2_label = Label(font, x = TABS_X, y = TABS_Y+30, color=0xc29542)
-view1.append(home2_label)
-
-sensor_data = Label(font, x = TABS_X, y = 130, color=0xc29542)
-view1.append(sensor_data)
-
-stat_data = Label(font, x = TABS_X, y = 90, color=0xc29542)
-view1.append(stat_data)
-
-stat2_data = Label(font, x = 5, y = 45, color=0xFFFFFF)
-view1.append(stat2_data)
-
-# User 2 ###################################################################
-############################################################################
-user_group2 = displayio.Group(x=0, y=50, scale=1)
-view2.append(user_group2)
-
-item1_group2 = displayio.Group(x=65, y=55, scale=1)
-view2.append(item1_group2)
-
-item2_group2 = displayio.Group(x=100, y=55, scale=1)
-view2.append(item2_group2)
-
-item3_group2 = displayio.Group(x=135, y=55, scale=1)
-view2.append(item3_group2)
-
-item4_group2 = displayio.Group(x=170, y=55, scale=1)
-view2.append(item4_group2)
-
-item5_group2 = displayio.Group(x=65, y=85, scale=1)
-view2.append(item5_group2)
-
-home1_label2 = Label(font, x = TABS_X, y = TABS_Y+10, color=0xc29542, scale=2)
-view2.append(home1_label2)
-
-home2_label2 = Label(font, x = TABS_X, y = TABS_Y+30, color=0xc29542)
-view2.append(home2_label2)
-
-sensor_data2 = Label(font, x = TABS_X, y = 130, color=0xc29542)
-view2.append(sensor_data2)
-
-stat_data2 = Label(font, x = TABS_X, y = 90, color=0xc29542)
-view2.append(stat_data2)
-
-stat2_data2 = Label(font, x = 5, y = 45, color=0xFFFFFF)
-view2.append(stat2_data2)
-
-# User 3 ###################################################################
-############################################################################
-user_group3 = displayio.Group(x=0, y=50, scale=1)
-view3.append(user_group3)
-
-item1_group3 = displayio.Group(x=65, y=55, scale=1)
-view3.append(item1_group3)
-
-item2_group3 = displayio.Group(x=100, y=55, scale=1)
-view3.append(item2_group3)
-
-item3_group3 = displayio.Group(x=135, y=55, scale=1)
-view3.append(item3_group3)
-
-item4_group3 = displayio.Group(x=170, y=55, scale=1)
-view3.append(item4_group3)
-
-item5_group3 = displayio.Group(x=65, y=85, scale=1)
-view3.append(item5_group3)
-
-home1_label3 = Label(font, x = TABS_X, y = TABS_Y+10, color=0xc29542, scale=2)
-view3.append(home1_label3)
-
-home2_label3 = Label(font, x = TABS_X, y = TABS_Y+30, color=0xc29542)
-view3.append(home2_label3)
-
-sensor_data3 = Label(font, x = TABS_X, y = 130, color=0xc29542)
-view3.append(sensor_data3)
-
-stat_data3 = Label(font, x = TABS_X, y = 90, color=0xc29542)
-view3.append(stat_data3)
+# Set the font and preload letters. The glyph pack from tools/build_font.py
+# holds only the characters the app shows and needs no BDF parsing.
+try:
+    font = GlyphPack("/fonts/Helvetica-Bold-16.glyphs")
+    font.load_glyphs()
+except OSError:
+    # No glyph pack built, parse the BDF
+    font = bitmap_font.load_font("/fonts/Helvetica-Bold-16.bdf")
+    font.load_glyphs('abcdefghjiklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890- ()°:%') # pre-load glyphs for fast printing
+
+boot_timeline.mark("font")
+
+# ------------- Crew ------------- #
+# Who is on the crew comes from the roster file; every member is shown in the
+# same view, repopulated when their button is pressed.
+roster = load_roster("/roster.json")
+
+VITALS_TEXT = 'Pulse: {}bpm{}\nResp: {}bpm{}\nTemp: {:.0f}°F\nHumidity: {:.0f}%'
+
+# Only the live view's labels get written, and only when their text changes
+labels = LabelUpdater()
+
+# Seconds between label statistics printed to the console, 0 to turn off
+STATS_INTERVAL = 10
+
+# ------------- Heap ------------- #
+# Every allocation brings the next garbage collection closer, and each one
+# freezes the clock for a few milliseconds. HEAP_PROFILE, off unless you
+# are chasing allocations, adds bytes allocated per task and per loop pass
+# to the stats (two heap readings per task run). HOT_PATH builds the vitals
+# text in place in a fixed buffer instead of formatting a new string every
+# frame. HEAP_BUDGETS are the bytes per second a task may allocate; a task
+# over budget is flagged in the stats, and with HEAP_STRICT the watch stops
+# with an error instead.
+HEAP_PROFILE = False
+HOT_PATH = True
+HEAP_STRICT = False
+HEAP_BUDGETS = {"touch": 1024, "display": 6144}
+heap = HeapMeter(HEAP_BUDGETS, strict=HEAP_STRICT) if HEAP_PROFILE else None
+vitals_text = TextBuffer(64)
+
+# ------------- Views ------------- #
+# Views are built the first time they are shown, or ahead of time while the
+# loop is idle, and torn down again once unused for VIEW_TEARDOWN seconds.
+# The live one sits in a single slot in splash, swapped by index.
+PREFETCH_VIEWS = True
+VIEW_TEARDOWN = 5 * 60  # None keeps every view once built
+VIEWS_PERIOD = 5  # seconds between prefetch/teardown passes
+VIEW_SWITCH_BUDGET = 0.02  # seconds; a frame is 0.1
+
+crew_view = None
 
-stat2_data3 = Label(font, x = 5, y = 45, color=0xFFFFFF)
-view3.append(stat2_data3)
-
-# User 4 ###################################################################
-############################################################################
-user_group4 = displayio.Group(x=0, y=50, scale=1)
-view4.append(user_group4)
-
-item1_group4 = displayio.Group(x=65, y=55, scale=1)
-view4.append(item1_group4)
-
-item2_group4 = displayio.Group(x=100, y=55, scale=1)
-view4.append(item2_group4)
-
-item3_group4 = displayio.Group(x=135, y=55, scale=1)
-view4.append(item3_group4)
-
-item4_group4 = displayio.Group(x=170, y=55, scale=1)
-view4.append(item4_group4)
-
-item5_group4 = displayio.Group(x=65, y=85, scale=1)
-view4.append(item5_group4)
-
-home1_label4 = Label(font, x = TABS_X, y = TABS_Y+10, color=0xc29542, scale=2)
-view4.append(home1_label4)
-
-home2_label4 = Label(font, x = TABS_X, y = TABS_Y+30, color=0xc29542)
-view4.append(home2_label4)
-
-sensor_data4 = Label(font, x = TABS_X, y = 130, color=0xc29542)
-view4.append(sensor_data4)
-
-stat_data4 = Label(font, x = TABS_X, y = 90, color=0xc29542)
-view4.append(stat_data4)
-
-stat2_data4 = Label(font, x = 5, y = 45, color=0xFFFFFF)
-view4.append(stat2_data4)
-
-# User 5 ###################################################################
-############################################################################
-user_group5 = displayio.Group(x=0, y=50, scale=1)
-view5.append(user_group5)
-
-item1_group5 = displayio.Group(x=65, y=55, scale=1)
-view5.append(item1_group5)
-
-item2_group5 = displayio.Group(x=100, y=55, scale=1)
-view5.append(item2_group5)
-
-item3_group5 = displayio.Group(x=135, y=55, scale=1)
-view5.append(item3_group5)
-
-item4_group5 = displayio.Group(x=170, y=55, scale=1)
-view5.append(item4_group5)
-
-item5_group5 = displayio.Group(x=65, y=85, scale=1)
-view5.append(item5_group5)
-
-home1_label5 = Label(font, x = TABS_X, y = TABS_Y+10, color=0xc29542, scale=2)
-view5.append(home1_label5)
-
-home2_label5 = Label(font, x = TABS_X, y = TABS_Y+30, color=0xc29542)
-view5.append(home2_label5)
-
-sensor_data5 = Label(font, x = TABS_X, y = 130, color=0xc29542)
-view5.append(sensor_data5)
-
-stat_data5 = Label(font, x = TABS_X, y = 90, color=0xc29542)
-view5.append(stat_data5)
+#pylint: disable=global-statement
+def build_crew_view():
+    global crew_view
+    crew_view = CrewView(font, set_image)
+    labels.add("crew", "vitals", crew_view.vitals)
+    labels.add("crew", "name", crew_view.name)
+    return crew_view.group
+
+def teardown_crew_view(group):
+    global crew_view
+    crew_view.clear()
+    labels.remove("crew")
+    crew_view = None
+#pylint: enable=global-statement
 
-stat2_data5 = Label(font, x = 5, y = 45, color=0xFFFFFF)
-view5.append(stat2_data5)
+# The map is drawn from a tile pyramid built by tools/build_tiles.py, dragged
+# to pan, tapped to zoom in and held to zoom out. Only the tiles on screen and
+# a ring of MAP_RING around them are kept in memory, however big the map.
+MAP_TILES = "/sd/map.tiles"
+MAP_WIDTH = 212
+MAP_HEIGHT = 240
+MAP_RING = 1
+map_view = None
 
+#pylint: disable=global-statement
+def build_map_view():
+    global map_view
+    group = displayio.Group()
+    try:
+        map_view = TileMap(MAP_TILES, MAP_WIDTH, MAP_HEIGHT, ring=MAP_RING)
+    except (OSError, ValueError):
+        # No tile pyramid on the card, or a corrupt or truncated one: show
+        # the bundled map as one image
+        map_group = displayio.Group(x=0, y=0, scale=1)
+        group.append(map_group)
+        set_image(map_group, "/images/map2.bmp")
+        return group
+    group.append(map_view.group)
+    return group
+
+def teardown_map_view(group):
+    global map_view
+    if map_view is None:
+        set_image(group[0], None)
+    else:
+        map_view.close()
+        map_view = None
+#pylint: enable=global-statement
 
+#pylint: disable=global-statement
+def select_view(what_view):
+    # restyle only the buttons of the old and the new view
+    global view_live
+    last_view = view_live
+    view_live = what_view
+    crew_list.rebind(last_view - 1)
+    crew_list.rebind(what_view - 1)
+    map_button.selected = what_view != MAP_VIEW
+#pylint: enable=global-statement
 
-map_group = displayio.Group(x=0, y=0, scale=1)
-view6.append(map_group)
+def show_crew_view(group, index):
+    member = roster[index]
+    select_view(index + 1)
+    crew_list.show(index)
+    crew_view.show_member(member)
+    labels.show("crew")
+    labels.set("name", member["name"])
 
+def show_map_view(group, arg):
+    select_view(MAP_VIEW)
+    labels.show("map")
 
-text_hight = Label(font, text="M", color=0x03AD31)
-# return a reformatted string with word wrapping using PyPortal.wrap_nicely
-def text_box(target, top, string, max_chars):
-    text = pyportal.wrap_nicely(string, max_chars)
-    new_text = ""
-    test = ""
-    for w in text:
-        new_text += '\n'+w
-        test += 'M\n'
-    text_hight.text = test  # Odd things happen without this
-    glyph_box = text_hight.bounding_box
-    target.text = ""  # Odd things happen without this
-    target.y = int(glyph_box[3]/2)+top
-    target.text = new_text
+views = Views(VIEW_TEARDOWN, switch_budget=VIEW_SWITCH_BUDGET)
+CREW = views.add("crew", build_crew_view, teardown_crew_view, show_crew_view)
+# not prefetched: its tile cache is tens of KB, spent only if the map is opened
+MAP = views.add("map", build_map_view, teardown_map_view, show_map_view, prefetch=False)
+splash.append(views.slot)  # over the background, under the buttons
 
 # ---------- Display Buttons ------------- #
 # Default button styling:
@@ -395,57 +360,32 @@ BIG_BUTTON_WIDTH = int(screen_width/2)
 BIG_BUTTON_Y = int(screen_height-BIG_BUTTON_HEIGHT)
 BUTTON_Y = int(screen_height-TAPS_HEIGHT)
 
-# This group will make it easy for us to read a button press later.
-buttons = []
-
-# Main User Interface Buttons
-button_view1 = Button(x=TAPS_WIDTH*2, y=0,
-                      width=TAPS_WIDTH, height=TAPS_HEIGHT,
-                      label="Crew1", label_font=font, label_color=0xff7e00,
-                      fill_color=0x755e1e, outline_color=0x967824,
-                      selected_fill=0xb08409, selected_outline=0xe3b536,
-                      selected_label=0x402807)
-buttons.append(button_view1)  # adding this button to the buttons group
-
-button_view2 = Button(x=TAPS_WIDTH*2, y=BUTTON_HEIGHT,
-                      width=TAPS_WIDTH, height=TAPS_HEIGHT,
-                      label="Crew2", label_font=font, label_color=0xff7e00,
-                      fill_color=0x755e1e, outline_color=0x967824,
-                      selected_fill=0xb08409, selected_outline=0xe3b536,
-                      selected_label=0x402807)
-buttons.append(button_view2)  # adding this button to the buttons group
-
-button_view3 = Button(x=TAPS_WIDTH*2, y=BUTTON_HEIGHT*2,
-                      width=TAPS_WIDTH, height=TAPS_HEIGHT,
-                      label="Crew3", label_font=font, label_color=0xff7e00,
-                      fill_color=0x755e1e, outline_color=0x967824,
-                      selected_fill=0xb08409, selected_outline=0xe3b536,
-                      selected_label=0x402807)
-buttons.append(button_view3)  # adding this button to the buttons group
-
-button_view4 = Button(x=TAPS_WIDTH*2, y=BUTTON_HEIGHT*3,
-                      width=TAPS_WIDTH, height=TAPS_HEIGHT,
-                      label="Crew4", label_font=font, label_color=0xff7e00,
-                      fill_color=0x755e1e, outline_color=0x967824,
-                      selected_fill=0xb08409, selected_outline=0xe3b536,
-                      selected_label=0x402807)
-buttons.append(button_view4)  # adding this button to the buttons group
-
-button_view5 = Button(x=TAPS_WIDTH*2, y=BUTTON_HEIGHT*4,
-                      width=TAPS_WIDTH, height=TAPS_HEIGHT,
-                      label="Crew5", label_font=font, label_color=0xff7e00,
-                      fill_color=0x755e1e, outline_color=0x967824,
-                      selected_fill=0xb08409, selected_outline=0xe3b536,
-                      selected_label=0x402807)
-buttons.append(button_view5)  # adding this button to the buttons group
-
-button_view6 = Button(x=TAPS_WIDTH*2, y=BUTTON_HEIGHT*5,
-                      width=TAPS_WIDTH, height=TAPS_HEIGHT,
-                      label="Map", label_font=font, label_color=0xff7e00,
-                      fill_color=0x755e1e, outline_color=0x967824,
-                      selected_fill=0xb08409, selected_outline=0xe3b536,
-                      selected_label=0x402807)
-buttons.append(button_view6)  # adding this button to the buttons group
+# Main User Interface Buttons: a scrolling list with one row per crew member,
+# then the map button under it
+BUTTON_STYLE = dict(width=TAPS_WIDTH, height=TAPS_HEIGHT, label_font=font, label_color=0xff7e00,
+                    fill_color=0x755e1e, outline_color=0x967824,
+                    selected_fill=0xb08409, selected_outline=0xe3b536,
+                    selected_label=0x402807)
+CREW_LIST_HEIGHT = screen_height - BUTTON_HEIGHT
+CREW_LIST_FRICTION = 0.35  # seconds for a flung list to lose two thirds of its speed
+CREW_LIST_STEP = 0.05  # seconds between steps of a flung list
+MAP_VIEW = len(roster) + 1
+view_live = 0  # the view shown, 1 based: a crew member or MAP_VIEW
+
+# Only the rows that fit on screen are Buttons; they are moved and relabelled
+# as the list scrolls, so a long roster costs no more to draw than a short one.
+def make_crew_row(slot):
+    return Button(x=0, y=0, label="Crew%d" % (slot + 1), **BUTTON_STYLE)
+
+def bind_crew_row(row, index):
+    label = "Crew%d" % (index + 1)
+    if row.label != label:
+        row.label = label
+    row.selected = index + 1 != view_live
+
+crew_list = ScrollList(len(roster), make_crew_row, bind_crew_row, TAPS_WIDTH*2, 0, TAPS_WIDTH,
+                       CREW_LIST_HEIGHT, BUTTON_HEIGHT, friction=CREW_LIST_FRICTION)
+map_button = Button(x=TAPS_WIDTH*2, y=CREW_LIST_HEIGHT, label="Map", **BUTTON_STYLE)
 
 '''
 button_switch = Button(x=0, y=BIG_BUTTON_Y,
@@ -465,9 +405,11 @@ button_2 = Button(x=BIG_BUTTON_WIDTH, y=BIG_BUTTON_Y,
 buttons.append(button_2)  # adding this button to the buttons group
 '''
 
-# Add all of the main buttons to the splash Group
-for b in buttons:
-    splash.append(b)
+# Add the main buttons to the splash Group, the map button last so it covers
+# the row scrolling out under it
+splash.append(crew_list.group)
+splash.append(map_button)
+boot_timeline.mark("buttons")
 
 '''
 # Make a button to change the icon image on view2
@@ -494,119 +436,17 @@ button_sound = Button(x=150, y=140,
 # Add this button to view2 Group
 view3.append(button_sound)
 '''
-#pylint: disable=global-statement
-def switch_view(what_view):
-    global view_live
-    if what_view == 1:
-        hideLayer(view2)
-        hideLayer(view3)
-        hideLayer(view4)
-        hideLayer(view5)
-        hideLayer(view6)
-        button_view1.selected = False
-        button_view2.selected = True
-        button_view3.selected = True
-        button_view4.selected = True
-        button_view5.selected = True
-        button_view6.selected = True
-        showLayer(view1)
-        view_live = 1
-        print("View1 On")
-    elif what_view == 2:
-        hideLayer(view1)
-        hideLayer(view3)
-        hideLayer(view4)
-        hideLayer(view5)
-        hideLayer(view6)
-        button_view1.selected = True
-        button_view2.selected = False
-        button_view3.selected = True
-        button_view4.selected = True
-        button_view5.selected = True
-        button_view6.selected = True
-        showLayer(view2)
-        view_live = 2
-        print("View2 On")
-    elif what_view == 3:
-        hideLayer(view1)
-        hideLayer(view2)
-        hideLayer(view4)
-        hideLayer(view5)
-        hideLayer(view6)
-        button_view1.selected = True
-        button_view2.selected = True
-        button_view3.selected = False
-        button_view4.selected = True
-        button_view5.selected = True
-        button_view6.selected = True
-        showLayer(view3)
-        view_live = 3
-        print("View3 On")
-    elif what_view == 4:
-        hideLayer(view1)
-        hideLayer(view2)
-        hideLayer(view3)
-        hideLayer(view5)
-        hideLayer(view6)
-        button_view1.selected = True
-        button_view2.selected = True
-        button_view3.selected = True
-        button_view4.selected = False
-        button_view5.selected = True
-        button_view6.selected = True
-        showLayer(view4)
-        view_live = 4
-        print("View4 On")
-    elif what_view == 5:
-        hideLayer(view1)
-        hideLayer(view2)
-        hideLayer(view3)
-        hideLayer(view4)
-        hideLayer(view6)
-        button_view1.selected = True
-        button_view2.selected = True
-        button_view3.selected = True
-        button_view4.selected = True
-        button_view5.selected = False
-        button_view6.selected = True
-        showLayer(view5)
-        view_live = 5
-        print("View5 On")
-    elif what_view == 6:
-        hideLayer(view1)
-        hideLayer(view2)
-        hideLayer(view3)
-        hideLayer(view4)
-        hideLayer(view5)
-        button_view1.selected = True
-        button_view2.selected = True
-        button_view3.selected = True
-        button_view4.selected = True
-        button_view5.selected = True
-        button_view6.selected = False
-        showLayer(view6)
-        view_live = 6
-        print("View6 On")
+# View numbers are 1 based: one per crew member, then the map
+VIEW_TABLE = [(CREW, i) for i in range(len(roster))] + [(MAP, None)]
 
-
-#pylint: enable=global-statement
+def switch_view(what_view):
+    """Show crew member ``what_view`` (1 based), or the map after the last one."""
+    views.switch(*VIEW_TABLE[what_view - 1])
+    print("View%d On" % what_view)
 
 # Set veriables and startup states
-button_view1.selected = False
-button_view2.selected = True
-button_view3.selected = True
-button_view4.selected = True
-button_view5.selected = True
-button_view6.selected = True
-showLayer(view1)
-hideLayer(view2)
-hideLayer(view3)
-hideLayer(view4)
-hideLayer(view5)
-hideLayer(view6)
-
-
-view_live = 1
+switch_view(1)
+boot_timeline.mark("first view")
 icon = 1
 icon_name = "Ruby"
 button_mode = 1
@@ -614,112 +454,397 @@ switch_state = 0
 #button_switch.label = "OFF"
 #button_switch.selected = True
 
-# Update out Labels with display text.
-#text_box(feed2_label, TABS_Y, 'Tap on the Icon button to meet a new friend.', 18)
-
-set_image(user_group, "/images/male_young_hair_style_sunglasses_party.bmp")
-set_image(item1_group, "/images/nav.bmp")
-set_image(item2_group, "/images/wrench_screwdriver.bmp")
-set_image(item3_group, "/images/head_set.bmp")
-set_image(item4_group, "/images/flash_light_off_bolt_lightning.bmp")
-set_image(item5_group, "/images/video_camera.bmp")
-
-set_image(user_group2, "/images/male_young_party_sunglasses.bmp")
-set_image(item1_group2, "/images/mars_rover.bmp")
-set_image(item2_group2, "/images/medical_healthcare_firstaid.bmp")
-set_image(item3_group2, "/images/head_set.bmp")
-set_image(item4_group2, "/images/flash_light_off_bolt_lightning.bmp")
-set_image(item5_group2, "/images/wrench_screwdriver.bmp")
-
-set_image(user_group3, "/images/female_afro_hair_style_funk.bmp")
-set_image(item1_group3, "/images/fly_flying_helicopter_transport.bmp")
-set_image(item2_group3, "/images/ground_satelite_dish.bmp")
-set_image(item3_group3, "/images/head_set.bmp")
-set_image(item4_group3, "/images/video_camera.bmp")
-set_image(item5_group3, "/images/flash_light_off_bolt_lightning.bmp")
-
-set_image(user_group4, "/images/male_afro_hair_beard.bmp")
-set_image(item1_group4, "/images/car_travel.bmp")
-set_image(item2_group4, "/images/ground_satelite_dish.bmp")
-set_image(item3_group4, "/images/interface_ui_plug_in_plugin.bmp")
-set_image(item4_group4, "/images/head_set.bmp")
-set_image(item5_group4, "/images/restaurant_food_dinner_lunch_knife_fork.bmp")
-
-set_image(user_group5, "/images/male_punk_alternative_industrial_rock.bmp")
-set_image(item1_group5, "/images/ship_sea_cruise_navigation.bmp")
-set_image(item2_group5, "/images/ground_satelite_dish.bmp")
-set_image(item3_group5, "/images/interface_ui_plug_in_plugin.bmp")
-set_image(item4_group5, "/images/head_set.bmp")
-set_image(item5_group5, "/images/mars_rover.bmp")
-
-set_image(map_group, "/images/map2.bmp")
-# ------------- Code Loop ------------- #
-while True:
-    touch = ts.touch_point
-    light = light_sensor.value
-
+# ------------- Sensors ------------- #
+def read_temperature():
     if adt:  # Only if we have the temperature sensor
         tempC = adt.temperature
     else:  # No temperature sensor
         tempC = microcontroller.cpu.temperature
+    return tempC * 1.8 + 32
+
+def read_light():
+    return light_sensor.value
+
+def read_clock():
+    return wall_clock.datetime()
+
+def read_humidity():
+    return hum.relative_humidity
+
+def start_humidity():
+    hum.start_measurement(adafruit_si7021.HUMIDITY)
+
+# Seconds each reading stays fresh before the bus is read again
+LIGHT_TTL = 0.5
+TEMPERATURE_TTL = 2
+CLOCK_TTL = 0.5
+HUMIDITY_TTL = 30
+HUMIDITY_CONVERSION = 0.025  # SI7021 RH + temperature conversion time
+
+# Every reading goes through the cache, so one pass never hits the same
+# register twice. Humidity is started on one pass and collected on a later
+# one rather than polling the SI7021 while it converts.
+sensors = SensorCache()
+sensors.add("light", read_light, LIGHT_TTL)
+sensors.add("tempF", read_temperature, TEMPERATURE_TTL)
+sensors.add("time", read_clock, CLOCK_TTL)
+sensors.add("humidity", read_humidity, HUMIDITY_TTL, start=start_humidity, settle=HUMIDITY_CONVERSION)
+sensors.refresh()  # first reading of everything, so the first frame is complete
+boot_timeline.mark("first readings")
+
+# ------------- Crew Vitals Feed ------------- #
+# With a secrets.py naming the WiFi network and the base station's
+# "vitals_url", pulse and respiration come from there: every crew feed in one
+# request each VITALS_INTERVAL seconds, over one kept-open connection. Values
+# not confirmed for VITALS_STALE seconds get a "?". Without it the roster's
+# values are shown.
+VITALS_INTERVAL = 5
+VITALS_TIMEOUT = 5
+VITALS_STALE = 30
+VITALS_STEP = 0.05  # seconds between the steps of a request
+STALE_MARK = "?"
+STALE_BYTES = bytes(STALE_MARK, "utf-8")
+
+try:
+    from secrets import secrets
+except ImportError:
+    secrets = {}
+
+# feed name -> that member's vitals, updated in place
+feed_vitals = {member["vitals"]["feed"]: member["vitals"] for member in roster if "feed" in member["vitals"]}
+
+def store_vitals(name, values):
+    vitals = feed_vitals.get(name)
+    if vitals is not None:
+        vitals.update(values)
+
+vitals_feed = None
+if secrets.get("vitals_url") and feed_vitals:
+    vitals_feed = VitalsFeed(pyportal.network._wifi.esp,  # pylint: disable=protected-access
+                             secrets["vitals_url"], feed_vitals, interval=VITALS_INTERVAL,
+                             timeout=VITALS_TIMEOUT, stale_after=VITALS_STALE,
+                             ssid=secrets.get("ssid"), password=secrets.get("password"))
+    vitals_feed.on_update = store_vitals
+
+def vitals_stale(member):
+    return vitals_feed is not None and vitals_feed.stale(member["vitals"].get("feed"))
+
+def vitals_mark(member):
+    return STALE_MARK if vitals_stale(member) else ""
+
+boot_timeline.mark("vitals feed")
+
+# ------------- Vitals History ------------- #
+# Every metric keeps per-second, per-minute and per-hour min/max/mean in
+# arrays sized here, so history never grows the heap. The room sensors are
+# shared by the whole crew; pulse and respiration are kept per member.
+HISTORY_PERIOD = 1  # seconds between samples
+SPARKLINE_PERIOD = 5  # seconds between sparkline updates; a line that did not change is not redrawn
+environment_history = {
+    "tempF": History("h", scale=10),
+    "humidity": History("h", scale=10),
+    "light": History("H"),
+}
+crew_history = [{"pulse": History("B"), "resp": History("B")} for member in roster]
+print("vitals history: {} bytes".format(
+    sum(h.nbytes for h in environment_history.values())
+    + sum(h.nbytes for member in crew_history for h in member.values())))
+
+def record_history():
+    now = time.monotonic()
+    for name, history in environment_history.items():
+        history.add(now, sensors.get(name))
+    for member, history in zip(roster, crew_history):
+        # the histories keep bytes; a roster value out of range must not stop the loop
+        history["pulse"].add(now, max(0, min(member["vitals"]["pulse"], 255)))
+        history["resp"].add(now, max(0, min(member["vitals"]["resp"], 255)))
+
+# ------------- Motion ------------- #
+# The accelerometer queues samples in its FIFO at MOTION_RATE; the motion task
+# drains it in one burst a few times a second and runs the gesture detectors.
+MOTION_RATE = 50  # samples per second
+MOTION_PERIOD = 0.2  # must come round before the 32-sample FIFO fills
+IMU_TRACE = False  # log every sample to /sd/imu for tools/imu_replay.py
+
+imu_trace = None
+if IMU_TRACE:
+    try:
+        imu_trace = TelemetryLog("/sd/imu", "<hhh", "ax,ay,az", prefix="imu")
+    except OSError:
+        print("No SD card, IMU trace is not logged")
+
+def record_imu(x, y, z):
+    imu_trace.append(None, x, y, z)
+
+wrist_raise = WristRaise(MOTION_RATE)
+motion = MotionService(AccelFIFO(I2CDevice(i2c_bus, 0x6B), rate=MOTION_RATE),
+                       (wrist_raise, Shake(MOTION_RATE), Steps(MOTION_RATE)),
+                       record=record_imu if imu_trace else None)
+
+def wrist_raised(detector):
+    power.activity()
+    scheduler.wake("display")
+
+def shaken(detector):
+    # a shake moves on to the next crew member, or back to the first from the map
+    power.activity()
+    audio.play("tab")
+    switch_view(numberUP(view_live, len(roster)))
+    scheduler.wake("display")
+    scheduler.wake("sparklines")
+
+motion.on("raise", wrist_raised)
+motion.on("shake", shaken)
+
+# ------------- Telemetry ------------- #
+# Readings are packed into 10-byte records in RAM and written to the SD card
+# (mounted at /sd by PyPortal) only in whole 512-byte sectors, so the loop
+# never waits on a small write. tools/decode_log.py turns the files into CSV.
+TELEMETRY_DIR = "/sd/log"
+TELEMETRY_RECORD = "<IhHH"
+TELEMETRY_FIELDS = "time,tempF/10,humidity/10,light"
+TELEMETRY_PERIOD = 1  # seconds between records
+TELEMETRY_FLUSH = 30  # seconds between writes to the card; up to this much is lost on power-off
+TELEMETRY_MAX_BYTES = 1024 * 1024  # a new file after this size, or at midnight
+
+try:
+    telemetry = TelemetryLog(TELEMETRY_DIR, TELEMETRY_RECORD, TELEMETRY_FIELDS,
+                             max_bytes=TELEMETRY_MAX_BYTES)
+except OSError:
+    print("No SD card, telemetry is not logged")
+    telemetry = None
+
+def log_telemetry():
+    now = sensors.get("time")
+    # Clamped to the record's fields: the SI7021's conversion reads a little
+    # below 0% or above 100% near the ends, and struct refuses to pack a
+    # value out of range
+    temperature = max(-32768, min(int(sensors.get("tempF") * 10), 32767))
+    humidity = max(0, min(int(sensors.get("humidity") * 10), 1000))
+    telemetry.append((now.tm_year, now.tm_mon, now.tm_mday), int(time.mktime(now)),
+                     temperature, humidity, max(0, min(sensors.get("light"), 65535)))
+
+def draw_sparklines():
+    # The sparklines follow the vitals lines: pulse, resp, temperature, humidity
+    if crew_view is None or view_live > len(roster):
+        return
+    history = crew_history[view_live - 1]
+    series = (history["pulse"], history["resp"], environment_history["tempF"], environment_history["humidity"])
+    for sparkline, metric in zip(crew_view.sparklines, series):
+        sparkline.plot(metric)
+
+# ------------- Tasks ------------- #
+def press_button(i, point):
+    print('button%d pressed' % i)
+    if view_live != i + 1:  # only if that view is not already visable
+        audio.play("beep")
+        switch_view(i + 1)
+        touch.responded()  # timed until the new view is on screen
+        scheduler.wake("display")  # show the new view on the next pass, not the next period
+        scheduler.wake("sparklines")
+
+# Presses are debounced and looked up in a grid of the button areas; the
+# loop keeps running while a finger is down. The crew list selects when a
+# tap lifts, so a drag can scroll it, and its latency includes the tap.
+TOUCH_DEBOUNCE = 0.02
+TOUCH_LATENCY_BUDGET = 0.15  # first contact to the switched view on screen, in seconds
+
+# Map gestures: a drag pans, a tap zooms in a level and a hold zooms out
+map_point = None
+map_moved = False
 
-    tempF = tempC * 1.8 + 32
-    current = rtc.datetime
-
-    sensor_data.text = 'Pulse: {}bpm\nResp: {}bpm\nTemp: {:.0f}°F\nHumidity: {:.0f}%'.format(52, 12, tempF, hum.relative_humidity)
-    sensor_data2.text = 'Pulse: {}bpm\nResp: {}bpm\nTemp: {:.0f}°F\nHumidity: {:.0f}%'.format(67, 14, tempF, hum.relative_humidity)
-    sensor_data3.text = 'Pulse: {}bpm\nResp: {}bpm\nTemp: {:.0f}°F\nHumidity: {:.0f}%'.format(88, 13, tempF, hum.relative_humidity)
-    sensor_data4.text = 'Pulse: {}bpm\nResp: {}bpm\nTemp: {:.0f}°F\nHumidity: {:.0f}%'.format(92, 16, tempF, hum.relative_humidity)
-    sensor_data5.text = 'Pulse: {}bpm\nResp: {}bpm\nTemp: {:.0f}°F\nHumidity: {:.0f}%'.format(77, 12, tempF, hum.relative_humidity)
-
-    stat2_data.text = 'Johnson'
-    stat2_data2.text = 'Ford'
-    stat2_data3.text = 'Pearson'
-    stat2_data4.text = 'Brown'
-    stat2_data5.text = 'Shaw'
-
-    home1_label.text = '{:02}:{:02}:{:02}'.format(current.tm_hour, current.tm_min, current.tm_sec)
-    home1_label2.text = '{:02}:{:02}:{:02}'.format(current.tm_hour, current.tm_min, current.tm_sec)
-    home1_label3.text = '{:02}:{:02}:{:02}'.format(current.tm_hour, current.tm_min, current.tm_sec)
-    home1_label4.text = '{:02}:{:02}:{:02}'.format(current.tm_hour, current.tm_min, current.tm_sec)
-    home1_label5.text = '{:02}:{:02}:{:02}'.format(current.tm_hour, current.tm_min, current.tm_sec)
-
-    #home2_label.text = '{} {} {}, {}'.format(days[int(current.tm_wday)], months[int(current.tm_mon)], current.tm_mday, current.tm_year)
-
-    # ------------- Handle Button Press Detection  ------------- #
-    if touch:  # Only do this if the screen is touched
-        # loop with buttons using enumerate() to number each button group as i
-        for i, b in enumerate(buttons):
-            if b.contains(touch):  # Test each button to see if it was pressed
-                print('button%d pressed' % i)
-                if i == 0 and view_live != 1:  # only if view1 is visable
-                    pyportal.play_file(soundBeep)
-                    switch_view(1)
-                    while ts.touch_point:
-                        pass
-                if i == 1 and view_live != 2:  # only if view2 is visable
-                    pyportal.play_file(soundBeep)
-                    switch_view(2)
-                    while ts.touch_point:
-                        pass
-                if i == 2 and view_live != 3:  # only if view3 is visable
-                    pyportal.play_file(soundBeep)
-                    switch_view(3)
-                    while ts.touch_point:
-                        pass
-                if i == 3 and view_live != 4:  # only if view4 is visable
-                    pyportal.play_file(soundBeep)
-                    switch_view(4)
-                    while ts.touch_point:
-                        pass
-                if i == 4 and view_live != 5:  # only if view5 is visable
-                    pyportal.play_file(soundBeep)
-                    switch_view(5)
-                    while ts.touch_point:
-                        pass
-                if i == 5 and view_live != 6:  # only if view6 is visable
-                    pyportal.play_file(soundBeep)
-                    switch_view(6)
-                    while ts.touch_point:
-                        pass
-    board.DISPLAY.show(splash)
\ No newline at end of file
+#pylint: disable=global-statement
+def map_press(key, point):
+    global map_point, map_moved
+    map_point = point
+    map_moved = False
+
+def map_move(key, point):
+    global map_point, map_moved
+    map_moved = True
+    if map_view is not None and view_live == MAP_VIEW:
+        map_view.pan(map_point[0] - point[0], map_point[1] - point[1])  # drawn on the next frame
+    map_point = point
+
+def map_hold(key, point):
+    global map_moved
+    map_moved = True
+    if map_view is not None and view_live == MAP_VIEW and map_view.zoom(1):
+        audio.play("tab")
+        scheduler.wake("display")
+
+def map_release(key, point):
+    if not map_moved and map_view is not None and view_live == MAP_VIEW and map_view.zoom(-1):
+        audio.play("tab")
+        scheduler.wake("display")
+#pylint: enable=global-statement
+
+def prefetch_map_tiles():
+    if map_view is not None and view_live == MAP_VIEW:
+        map_view.prefetch(MAP_PREFETCH_TILES)
+
+touch = TouchEngine(ts, debounce=TOUCH_DEBOUNCE, latency_budget=TOUCH_LATENCY_BUDGET)
+crew_list.on_select = press_button
+touch.add(crew_list.x, crew_list.y, crew_list.width, crew_list.height, "crew list",
+          on_press=crew_list.press, on_move=crew_list.move, on_release=crew_list.release)
+touch.add(map_button.x, map_button.y, map_button.width, map_button.height, len(roster),
+          on_press=press_button)
+touch.add(0, 0, MAP_WIDTH, MAP_HEIGHT, "map", on_press=map_press, on_hold=map_hold,
+          on_release=map_release, on_move=map_move)
+
+def build_vitals_text(vitals, stale):
+    # VITALS_TEXT, written into vitals_text without allocating
+    text = vitals_text
+    text.begin()
+    text.add(b"Pulse: ")
+    text.add_int(vitals["pulse"])
+    text.add(b"bpm")
+    if stale:
+        text.add(STALE_BYTES)
+    text.add(b"\nResp: ")
+    text.add_int(vitals["resp"])
+    text.add(b"bpm")
+    if stale:
+        text.add(STALE_BYTES)
+    text.add(b"\nTemp: ")
+    text.add_round(sensors.get("tempF"))
+    text.add(b"\xc2\xb0F\nHumidity: ")
+    text.add_round(sensors.get("humidity"))
+    text.add(b"%")
+    return text.text()
+
+def update_display():
+    if view_live <= len(roster) and crew_view is not None:
+        crew_view.clock.show(wall_clock.seconds())
+        member = roster[view_live - 1]
+        vitals = member["vitals"]
+        if HOT_PATH:
+            labels.set("vitals", build_vitals_text(vitals, vitals_stale(member)))
+            return
+        mark = vitals_mark(member)
+        labels.set("vitals", VITALS_TEXT.format(vitals["pulse"], mark, vitals["resp"], mark,
+                                                sensors.get("tempF"), sensors.get("humidity")))
+        #home2_label.text = '{} {} {}, {}'.format(days[int(current.tm_wday)], months[int(current.tm_mon)], current.tm_mday, current.tm_year)
+
+def run_views():
+    if PREFETCH_VIEWS:
+        views.prefetch()
+    views.expire()
+
+def print_stats():
+    print('labels: {:.1f} writes/s, {:.1f} skipped/s'.format(*labels.rates()))
+    print(frames.stats())
+    print(wall_clock.stats())
+    print(touch.stats())
+    print(crew_list.stats())
+    print(motion.stats())
+    print(images.stats())
+    print(audio.stats())
+    if telemetry:
+        print(telemetry.stats())
+    if vitals_feed:
+        print(vitals_feed.stats())
+    if map_view:
+        print(map_view.stats())
+    if atlas:
+        print('atlas: {} images drawn from one sheet'.format(atlas.drawn))
+    for line in scheduler.stats() + sensors.stats() + views.stats() + power.stats():
+        print(line)
+    if heap:
+        for line in heap.stats():
+            print(line)
+    print('power: about {:.0f}mA, {:.0f}h on {}mAh'.format(
+        *power.estimate(BATTERY_MAH, BASE_MA, CPU_MA, BACKLIGHT_MA), BATTERY_MAH))
+
+# Seconds between runs of each task. When several are due at once the
+# lowest priority number runs first. The sensors task wakes whenever the
+# next reading expires, so its period is only an upper bound.
+TOUCH_PERIOD = 0.02
+SENSORS_PERIOD = 1
+MAP_PREFETCH_PERIOD = 0.1
+MAP_PREFETCH_TILES = 4  # tiles loaded per pass, keeps each pass short
+
+# Auto-refresh is off: each display pass applies this frame's label changes
+# and then pushes them in one refresh, TARGET_FPS times a second.
+TARGET_FPS = 10
+frames = FrameGovernor(board.DISPLAY, splash, fps=TARGET_FPS)
+frames.add(update_display)
+frames.add_after(touch.shown)
+
+scheduler = Scheduler()
+scheduler.meter = heap
+scheduler.add("touch", touch.poll, TOUCH_PERIOD, priority=0)
+scheduler.add("display", frames.frame, frames.interval, priority=1)
+scheduler.add("crew list", crew_list.animate, CREW_LIST_STEP, priority=1)
+scheduler.add("sensors", sensors.refresh, SENSORS_PERIOD, priority=2)
+scheduler.add("clock", wall_clock.sync, CLOCK_RESYNC, priority=1)
+scheduler.add("motion", motion.poll, MOTION_PERIOD, priority=2)
+scheduler.add("audio", audio.poll, AUDIO_PERIOD, priority=3)
+scheduler.add("history", record_history, HISTORY_PERIOD, priority=4)
+scheduler.add("sparklines", draw_sparklines, SPARKLINE_PERIOD, priority=5)
+if telemetry:
+    scheduler.add("telemetry", log_telemetry, TELEMETRY_PERIOD, priority=4)
+    scheduler.add("log flush", telemetry.flush, TELEMETRY_FLUSH, priority=7, delay=TELEMETRY_FLUSH)
+if imu_trace:
+    scheduler.add("imu flush", imu_trace.flush, TELEMETRY_FLUSH, priority=7, delay=TELEMETRY_FLUSH)
+scheduler.add("map tiles", prefetch_map_tiles, MAP_PREFETCH_PERIOD, priority=7)
+if vitals_feed:
+    scheduler.add("vitals", vitals_feed.poll, VITALS_STEP, priority=6)
+scheduler.add("views", run_views, VIEWS_PERIOD, priority=8, delay=VIEWS_PERIOD)
+if STATS_INTERVAL:
+    scheduler.add("stats", print_stats, STATS_INTERVAL, priority=9, delay=STATS_INTERVAL)
+
+# ------------- Power ------------- #
+# Without a touch or wrist raise the watch steps down through these states
+# (after the given seconds); either one brings it straight back to active.
+# A lowered wrist or a covered light sensor goes to idle after
+# POWER_COVERED_AFTER seconds. Tasks not listed keep their periods above.
+POWER_PERIOD = 1
+POWER_COVERED_AFTER = 5
+LIGHT_DARK = 500  # light reading of a watch under a sleeve
+LIGHT_FULL = 40000  # light reading that gets the top of BACKLIGHT_RANGE
+AWAKE_PERIODS = {"touch": TOUCH_PERIOD, "motion": MOTION_PERIOD, "sparklines": SPARKLINE_PERIOD}
+AWAKE_TTLS = {"light": LIGHT_TTL, "time": CLOCK_TTL, "tempF": TEMPERATURE_TTL}
+POWER_STATES = (
+    PowerState("active", 0, backlight=1, fps=TARGET_FPS, periods=AWAKE_PERIODS, ttls=AWAKE_TTLS),
+    PowerState("dimmed", 15, backlight=0.4, fps=5, periods=AWAKE_PERIODS, ttls=AWAKE_TTLS),
+    PowerState("idle", 45, backlight=0.15, fps=1, wake_only=True,
+               periods={"touch": 0.05, "motion": 0.5, "sparklines": None},
+               ttls={"light": 2, "time": 1, "tempF": 10}),
+    PowerState("sleep", 120, backlight=0, fps=0, wake_only=True,
+               periods={"touch": 0.1, "motion": 0.5, "sparklines": None},
+               ttls={"light": 5, "time": 1, "tempF": 30}),
+)
+# Rough current model for the battery estimate in the stats; measure your own
+BATTERY_MAH = 1200
+BASE_MA = 20  # CPU idle, backlight off
+CPU_MA = 25  # extra while the CPU is busy
+BACKLIGHT_MA = 80  # extra with the backlight at full
+
+def read_ambient():
+    return sensors.get("light")
+
+def wrist_lowered():
+    return wrist_raise.lowered
+
+def wake_on_touch(point):
+    # a tap on a dark screen only wakes it
+    woken = power.activity()
+    scheduler.wake("display")
+    return woken
+
+power = PowerManager(board.DISPLAY, scheduler, frames, sensors, POWER_STATES,
+                     light=read_ambient, lowered=wrist_lowered, backlight_range=BACKLIGHT_RANGE,
+                     light_full=LIGHT_FULL, dark=LIGHT_DARK, covered_after=POWER_COVERED_AFTER)
+touch.on_touch = wake_on_touch
+if vitals_feed:
+    # the feed paces itself while the watch is awake, and stops in sleep
+    for state in POWER_STATES:
+        state.periods["vitals"] = None if state.name == "sleep" else VITALS_STEP
+scheduler.add("power", power.update, POWER_PERIOD, priority=6)
+
+boot_timeline.mark("tasks")
+
+# ------------- Code Loop ------------- #
+boot_timeline.finish()
+scheduler.run()
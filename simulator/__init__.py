@@ -0,0 +1,16 @@
+"""Host-side simulator for the PyPortal wrist computer.
+
+Stands in for ``board``, ``busio``, ``displayio``, ``analogio``, ``neopixel``
+and the Adafruit drivers so ``code.py`` boots and loops unmodified under
+CPython::
+
+    python -m simulator --frames 300 --touch touches.json
+
+The virtual hardware is a shared I2C bus carrying register models of the
+ADT7410, SI7021, LSM9DS1 and DS3231, a headless display, a scripted
+touchscreen and a virtual clock that only advances by modelled device time.
+"""
+
+from simulator.runtime import Costs, SimulationComplete, Simulator, TouchScript, current
+
+__all__ = ["Costs", "SimulationComplete", "Simulator", "TouchScript", "current"]
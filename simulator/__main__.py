@@ -0,0 +1,97 @@
+"""Command line entry point: ``python -m simulator``."""
+
+import argparse
+import json
+import sys
+
+from simulator.devices import MOTIONS
+from simulator.runtime import Costs, Simulator
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulator",
+                                     description="Run code.py against simulated PyPortal hardware.")
+    parser.add_argument("script", nargs="?", default="code.py", help="app script, relative to --root")
+    parser.add_argument("--root", default=None, help="directory standing in for CIRCUITPY")
+    parser.add_argument("--frames", type=int, default=None, help="stop after N frames")
+    parser.add_argument("--seconds", type=float, default=None, help="stop at N simulated seconds")
+    parser.add_argument("--touch", default=None, help="JSON file with a list of scripted touches")
+    parser.add_argument("--cost", action="append", default=[], metavar="NAME=SECONDS",
+                        help="override a modelled cost, e.g. label_write=0.002")
+    parser.add_argument("--cpu-scale", type=float, default=0.0,
+                        help="add host CPU time times this factor to simulated time")
+    parser.add_argument("--rtc-drift-ppm", type=float, default=0.0)
+    parser.add_argument("--motion", choices=sorted(MOTIONS), default="still",
+                        help="scripted wrist movement fed to the IMU")
+    parser.add_argument("--sd", default=None, metavar="DIR", help="host directory to mount as the SD card")
+    parser.add_argument("--vitals", default=None, metavar="URL",
+                        help="base station URL for the crew vitals feed, e.g. http://127.0.0.1:8080/vitals")
+    parser.add_argument("--heap", type=int, default=4 * 1024 * 1024, metavar="BYTES",
+                        help="size of the modelled device heap; a collection runs whenever it fills")
+    parser.add_argument("--no-trace-memory", action="store_true", help="skip tracemalloc")
+    parser.add_argument("--screenshot", default=None, help="write the final frame as PNG")
+    parser.add_argument("--json", default=None, help="write the report to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    if args.frames is None and args.seconds is None:
+        args.frames = 100
+    touches = []
+    if args.touch:
+        with open(args.touch) as script:
+            touches = json.load(script)
+    overrides = {}
+    for item in args.cost:
+        name, _, value = item.partition("=")
+        overrides[name] = float(value)
+    options = {"touches": touches, "costs": Costs(**overrides), "cpu_scale": args.cpu_scale,
+               "rtc_drift_ppm": args.rtc_drift_ppm, "trace_memory": not args.no_trace_memory, "sd_dir": args.sd, "motion": MOTIONS[args.motion],
+               "vitals_url": args.vitals, "heap_size": args.heap}
+    if args.root:
+        options["root"] = args.root
+    sim = Simulator(**options)
+    screenshot = args.screenshot
+    report = sim.run(args.script, frames=args.frames, seconds=args.seconds)
+    if screenshot:
+        sim.display.save_png(screenshot)
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+    elif args.json:
+        sim.dump(report, args.json)
+    else:
+        _print_summary(report)
+    return 0
+
+
+def _print_summary(report):
+    boot = report["boot"] or {}
+    frames = report["frames"]
+    print("boot:            {:.3f}s simulated, {} I2C transactions, {} file opens".format(
+        boot.get("virtual_s", 0), boot.get("i2c_transactions", 0), boot.get("file_opens", 0)))
+    print("frames:          {}".format(frames["count"]))
+    print("frame time:      mean {mean:.2f}ms  p95 {p95:.2f}ms  max {max:.2f}ms (simulated)".format(
+        **frames["virtual_ms"]))
+    print("busy time:       mean {mean:.2f}ms  p95 {p95:.2f}ms  max {max:.2f}ms (simulated, not sleeping)".format(
+        **frames["busy_ms"]))
+    print("host time:       mean {mean:.2f}ms  p95 {p95:.2f}ms".format(**frames["host_ms"]))
+    print("per frame:       {} I2C transactions, {} label writes, {} alloc blocks, {} refreshes".format(
+        frames["i2c_per_frame"], frames["label_writes_per_frame"], frames["alloc_blocks_per_frame"],
+        frames["refreshes_per_frame"]))
+    print("gc collections:  {}".format(frames["gc_collections"]))
+    touch = report["touch"]
+    if touch["count"]:
+        print("touch to screen: mean {mean:.1f}ms  max {max:.1f}ms".format(**touch["latency_ms"])
+              + " over {} of {} touches".format(touch["answered"], touch["count"]))
+    for address, device in report["i2c"]["devices"].items():
+        print("  i2c {} {:<11} {:>7} transactions {:>8} bytes {:>6} nacks {:>9.1f}ms busy".format(
+            address, device["name"], device["transactions"], device["bytes"], device["nacks"],
+            device["busy_ms"]))
+    memory = report["memory"]
+    print("peak heap:       {} bytes".format(memory["peak_bytes"]))
+    print("allocated:       {} bytes ({} after boot), {} collections of a {} byte heap".format(
+        memory["allocated_bytes"], memory["loop_allocated_bytes"], memory["collections"],
+        memory["heap_size"]))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Virtual monotonic clock used by every simulated peripheral.
+
+Simulated time only moves when something on the "device" costs time: an I2C
+transfer, an ADC sample, a flash read, a display refresh or an explicit
+``time.sleep``.  That keeps benchmark numbers deterministic no matter how fast
+or loaded the host is.  Host CPU time can optionally be folded in through
+``cpu_scale`` to approximate the slower SAMD51.
+"""
+
+import time
+
+_real_monotonic = time.monotonic
+_real_monotonic_ns = time.monotonic_ns
+_real_sleep = time.sleep
+_real_perf_counter = time.perf_counter
+
+
+class VirtualClock:
+    """Monotonic clock driven by modelled device latencies.
+
+    :param float monotonic_cost: Seconds charged for each ``time.monotonic()``
+        call, so busy-wait loops still make forward progress.
+    :param float cpu_scale: Multiplier applied to host CPU time between clock
+        reads; 0 (the default) keeps the simulation fully deterministic.
+    """
+
+    def __init__(self, monotonic_cost=0.000005, cpu_scale=0.0):
+        self.now = 0.0
+        self.monotonic_cost = monotonic_cost
+        self.cpu_scale = cpu_scale
+        self.sleeps = 0
+        self.slept = 0.0
+        self._listeners = []
+        self._in_listener = False
+        self._host_mark = _real_perf_counter()
+
+    def add_listener(self, callback):
+        """Call ``callback(now)`` every time the clock advances."""
+        self._listeners.append(callback)
+
+    def _fold_cpu(self):
+        if self.cpu_scale:
+            host = _real_perf_counter()
+            self.now += (host - self._host_mark) * self.cpu_scale
+            self._host_mark = host
+
+    def advance(self, seconds):
+        """Move simulated time forward by ``seconds``."""
+        if seconds > 0:
+            self.now += seconds
+        self._fold_cpu()
+        if self._listeners and not self._in_listener:
+            self._in_listener = True
+            try:
+                for callback in self._listeners:
+                    callback(self.now)
+            finally:
+                self._in_listener = False
+
+    def monotonic(self):
+        self.advance(self.monotonic_cost)
+        return self.now
+
+    def monotonic_ns(self):
+        return int(self.monotonic() * 1000000000)
+
+    def sleep(self, seconds):
+        self.sleeps += 1
+        self.slept += max(0.0, seconds)
+        self.advance(seconds)
+
+    def install(self):
+        """Route the ``time`` module's monotonic clock and sleep through us."""
+        time.monotonic = self.monotonic
+        time.monotonic_ns = self.monotonic_ns
+        time.sleep = self.sleep
+
+    @staticmethod
+    def uninstall():
+        time.monotonic = _real_monotonic
+        time.monotonic_ns = _real_monotonic_ns
+        time.sleep = _real_sleep
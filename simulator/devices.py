@@ -0,0 +1,445 @@
+"""Register-level models of the PyPortal wrist unit's I2C peripherals.
+
+Each model exposes the same registers and timing the real part does, closely
+enough that the simulated drivers in ``simulator/modules`` generate the same
+bus traffic as the Adafruit drivers on the device.
+"""
+
+import calendar
+import math
+import struct
+import time
+
+from simulator.i2c import I2CTarget
+
+STANDARD_GRAVITY = 9.80665
+
+
+def _bcd(value):
+    return ((value // 10) << 4) | (value % 10)
+
+
+def _unbcd(value):
+    return (value >> 4) * 10 + (value & 0x0F)
+
+
+def _crc8(data):
+    """Sensirion/Silicon Labs CRC-8, polynomial 0x31."""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x31) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+class Environment:
+    """Slowly varying ambient conditions shared by all sensor models.
+
+    Every attribute is a callable taking the simulated time in seconds, so a
+    scenario can swap in recorded traces or step changes.
+    """
+
+    def __init__(self):
+        self.temperature = lambda t: 22.5 + 0.4 * math.sin(t / 45.0)
+        self.humidity = lambda t: 41.0 + 3.0 * math.sin(t / 240.0)
+        self.light = lambda t: 21000 + 6000 * math.sin(t / 20.0)
+        self.cpu_temperature = lambda t: 31.0 + 0.2 * math.sin(t / 30.0)
+
+
+class Motion:
+    """Wrist motion source for the LSM9DS1 model.
+
+    ``sample(t)`` returns ``(accel, gyro, mag)`` in m/s^2, degrees/s and gauss.
+    The default is a wrist lying still, face up; ``MOTIONS`` has scripted
+    alternatives.
+    """
+
+    def __init__(self, func=None):
+        self.func = func
+
+    def sample(self, t):
+        if self.func is not None:
+            return self.func(t)
+        return _still(t)
+
+
+_MAG = (0.21, -0.02, 0.43)
+
+
+def _still(t):
+    return ((0.0, 0.0, STANDARD_GRAVITY), (0.0, 0.0, 0.0), _MAG)
+
+
+def _hanging(t):
+    """Arm down by the side: gravity along the watch's x axis."""
+    return ((STANDARD_GRAVITY, 0.0, 0.0), (0.0, 0.0, 0.0), _MAG)
+
+
+def _walk(t, cadence=1.8):
+    """Arm down and swinging, with a bounce at every step."""
+    g = STANDARD_GRAVITY
+    bounce = 0.3 * g * math.sin(2 * math.pi * cadence * t)
+    swing = 0.15 * g * math.sin(math.pi * cadence * t)
+    return ((g + bounce, swing, 0.05 * g), (0.0, 0.0, 40.0 * math.cos(math.pi * cadence * t)), _MAG)
+
+
+def _turn(t, start, duration, up):
+    """Rotate between hanging and face up about the y axis."""
+    fraction = min(1.0, max(0.0, (t - start) / duration))
+    angle = (fraction if up else 1.0 - fraction) * math.pi / 2
+    rate = math.degrees(math.pi / 2 / duration) * (-1 if up else 1)
+    g = STANDARD_GRAVITY
+    return ((g * math.cos(angle), 0.0, g * math.sin(angle)), (0.0, rate, 0.0), _MAG)
+
+
+def _shake(t, rate=5.0):
+    """Face up, shaken hard from side to side."""
+    g = STANDARD_GRAVITY
+    return ((0.0, 1.2 * g * math.sin(2 * math.pi * rate * t), g), (0.0, 0.0, 0.0), _MAG)
+
+
+def _day(t):
+    """A 30 second loop: walk, raise the wrist to read it, shake it, drop it."""
+    t %= 30.0
+    if t < 12.0:
+        return _walk(t)
+    if t < 12.5:
+        return _turn(t, 12.0, 0.5, up=True)
+    if 20.0 <= t < 21.0:
+        return _shake(t)
+    if t < 21.0:
+        return _still(t)
+    if t < 21.5:
+        return _turn(t, 21.0, 0.5, up=False)
+    return _hanging(t)
+
+
+def _raise(t):
+    """Raise the wrist for three seconds every ten."""
+    t %= 10.0
+    if t < 6.0:
+        return _hanging(t)
+    if t < 6.5:
+        return _turn(t, 6.0, 0.5, up=True)
+    if t < 9.5:
+        return _still(t)
+    return _turn(t, 9.5, 0.5, up=False)
+
+
+# Scripted wrist movements, selectable with ``python -m simulator --motion``
+MOTIONS = {"still": _still, "hanging": _hanging, "walk": _walk, "raise": _raise, "shake": _shake, "day": _day}
+
+
+class ADT7410(I2CTarget):
+    """ADT7410 temperature sensor, 13- or 16-bit mode."""
+
+    name = "ADT7410"
+
+    def __init__(self, env, address=0x48):
+        super().__init__(address, size=0x30)
+        self.env = env
+        self.registers[0x0B] = 0xCB  # manufacturer/revision ID
+        self.registers[0x04] = 0x20  # T_HIGH default 64C
+        self.registers[0x06] = 0x05  # T_LOW default 10C
+        self.registers[0x08] = 0x49  # T_CRIT default 147C
+        self.registers[0x0A] = 0x05  # T_HYST
+
+    def read_register(self, reg):
+        if reg in (0x00, 0x01):
+            celsius = self.env.temperature(self.now)
+            if self.registers[0x03] & 0x80:
+                raw = int(round(celsius * 128)) & 0xFFFF
+            else:
+                raw = (int(round(celsius * 16)) << 3) & 0xFFFF
+            return raw >> 8 if reg == 0x00 else raw & 0xFF
+        if reg == 0x02:
+            return 0x00  # RDY is active low: a conversion is always ready
+        return super().read_register(reg)
+
+    def write_register(self, reg, value):
+        if reg == 0x2F:  # software reset
+            self.registers[0x03] = 0
+            return
+        super().write_register(reg, value)
+
+
+class SI7021(I2CTarget):
+    """SI7021 humidity/temperature sensor (command protocol, no registers).
+
+    "No hold master" measurements NACK reads until the conversion finishes,
+    which is what makes every humidity read cost ~20ms of polling.
+    """
+
+    name = "SI7021"
+    RH_TIME = 0.012 + 0.0108  # humidity conversion includes a temperature one
+    TEMP_TIME = 0.0108
+
+    def __init__(self, env, address=0x40):
+        super().__init__(address, size=1)
+        self.env = env
+        self.ready_at = 0.0
+        self.response = b""
+        self.last_temperature = 0.0
+        self.user_register = 0x3A
+
+    def ready(self):
+        return self.now >= self.ready_at
+
+    def _measurement(self, code):
+        code &= 0xFFFC
+        data = struct.pack(">H", code)
+        return data + bytes((_crc8(data),))
+
+    def write(self, data):
+        if not data:
+            return
+        command = data[0]
+        if command in (0xE5, 0xF5):
+            self.last_temperature = self.env.temperature(self.now)
+            rh = self.env.humidity(self.now)
+            self.ready_at = self.now + self.RH_TIME
+            self.response = self._measurement(int((rh + 6) * 65536 / 125))
+        elif command in (0xE3, 0xF3):
+            self.last_temperature = self.env.temperature(self.now)
+            self.ready_at = self.now + self.TEMP_TIME
+            self.response = self._measurement(int((self.last_temperature + 46.85) * 65536 / 175.72))
+        elif command == 0xE0:
+            self.response = self._measurement(int((self.last_temperature + 46.85) * 65536 / 175.72))[:2]
+        elif command == 0xFE:
+            self.ready_at = self.now + 0.015
+            self.response = b""
+        elif command == 0xE7:
+            self.response = bytes((self.user_register,))
+        elif command == 0xE6 and len(data) > 1:
+            self.user_register = data[1]
+        elif command == 0xFA:
+            self.response = bytes((0x12, 0x00, 0x34, 0x00, 0x56, 0x00, 0x78, 0x00))
+        elif command == 0xFC:
+            # SNB3 of 0x15 identifies an Si7021
+            self.response = bytes((0x15, 0xFF, 0x00, 0x00, 0x00, 0x00))
+        elif command == 0x84:
+            self.response = bytes((0x20,))
+
+    def read(self, count):
+        out = bytearray(self.response[:count])
+        out.extend(b"\xFF" * (count - len(out)))
+        return out
+
+
+class DS3231(I2CTarget):
+    """DS3231 real-time clock.
+
+    :param float drift_ppm: How fast the RTC runs relative to the simulated
+        monotonic clock, in parts per million.
+    """
+
+    name = "DS3231"
+
+    def __init__(self, start=None, address=0x68, drift_ppm=0.0):
+        super().__init__(address, size=0x13)
+        if start is None:
+            start = (2022, 3, 9, 17, 23, 0)
+        self.base = calendar.timegm(tuple(start[:6]) + (0, 0, 0))
+        self.base_now = 0.0
+        self.drift_ppm = drift_ppm
+        self.registers[0x0E] = 0x1C
+        self.latched = None
+
+    def epoch(self):
+        elapsed = self.now - self.base_now
+        return self.base + elapsed * (1 + self.drift_ppm * 1e-6)
+
+    def struct_time(self):
+        return time.gmtime(int(self.epoch()))
+
+    def write(self, data):
+        self.latched = None
+        if data and data[0] == 0x00 and len(data) >= 8:
+            sec, minute, hour = _unbcd(data[1] & 0x7F), _unbcd(data[2]), _unbcd(data[3] & 0x3F)
+            mday, month, year = _unbcd(data[5]), _unbcd(data[6] & 0x1F), 2000 + _unbcd(data[7])
+            self.base = calendar.timegm((year, month, mday, hour, minute, sec, 0, 0, 0))
+            self.base_now = self.now
+            self.pointer = 0x08
+            for value in data[8:]:
+                self.write_register(self.pointer, value)
+                self.pointer = self.next_register(self.pointer)
+            return
+        super().write(data)
+
+    def read_register(self, reg):
+        if reg <= 0x06:
+            if self.latched is None:
+                self.latched = self.struct_time()
+            now = self.latched
+            return (_bcd(now.tm_sec), _bcd(now.tm_min), _bcd(now.tm_hour), now.tm_wday + 1,
+                    _bcd(now.tm_mday), _bcd(now.tm_mon), _bcd(now.tm_year % 100))[reg]
+        if reg == 0x11:
+            return 25
+        return super().read_register(reg)
+
+    def read(self, count):
+        self.latched = None  # a read latches the time registers for its duration
+        return super().read(count)
+
+
+class LSM9DS1AccelGyro(I2CTarget):
+    """Accelerometer/gyroscope half of the LSM9DS1, including its 32-slot FIFO.
+
+    With the FIFO off, a read of the output registers latches the motion
+    sample for that instant.  With it on (FIFO_EN in CTRL_REG9 and a mode in
+    FIFO_CTRL), samples are queued at the output data rate as simulated
+    time passes: FIFO_SRC reports how many are waiting, reading the output
+    registers returns the oldest, and reading OUT_Z_H_XL pops it.  The rate
+    is the gyro's, or the accelerometer's when the gyro is powered down.  A
+    burst read from the accelerometer outputs rolls back from OUT_Z_H_XL to
+    OUT_X_L_XL, as the chip does, so one transfer drains several samples.
+    """
+
+    name = "LSM9DS1-XG"
+    ACCEL_SCALE = {0: 0.061, 2: 0.122, 3: 0.244, 1: 0.732}  # mg per LSB
+    GYRO_SCALE = {0: 8.75, 1: 17.5, 3: 70.0}  # mdps per LSB
+    GYRO_ODR = {1: 14.9, 2: 59.5, 3: 119.0, 4: 238.0, 5: 476.0, 6: 952.0}
+    ACCEL_ODR = {1: 10.0, 2: 50.0, 3: 119.0, 4: 238.0, 5: 476.0, 6: 952.0}
+    FIFO_SIZE = 32
+
+    def __init__(self, motion, address=0x6B):
+        super().__init__(address, size=0x38)
+        self.motion = motion
+        self.registers[0x0F] = 0x68  # WHO_AM_I
+        self.registers[0x22] = 0x04  # CTRL_REG8: IF_ADD_INC
+        self.fifo = []
+        self.overrun = False
+        self._fifo_next = None
+
+    def _raw(self, value):
+        return int(max(-32768, min(32767, round(value)))) & 0xFFFF
+
+    def _sample(self, t):
+        """Gyro and accelerometer output registers for time ``t``, 12 bytes."""
+        accel, gyro, _ = self.motion.sample(t)
+        a_scale = self.ACCEL_SCALE[(self.registers[0x20] >> 3) & 0x03]
+        g_scale = self.GYRO_SCALE.get((self.registers[0x10] >> 3) & 0x03, 8.75)
+        raw = [self._raw(value * 1000 / g_scale) for value in gyro]
+        raw += [self._raw(value / STANDARD_GRAVITY * 1000 / a_scale) for value in accel]
+        return struct.pack("<6H", *raw)
+
+    def _load(self, sample):
+        self.registers[0x18:0x1E] = sample[:6]
+        self.registers[0x28:0x2E] = sample[6:]
+        temp = self._raw(9)  # 25C + 9/16
+        self.registers[0x15] = temp & 0xFF
+        self.registers[0x16] = temp >> 8
+        self.registers[0x27] = 0x07  # XLDA | GDA | TDA
+
+    def latch(self):
+        """Copy the current motion sample into the output registers."""
+        self._load(self._sample(self.now))
+
+    def _fifo_mode(self):
+        if not self.registers[0x23] & 0x02:  # CTRL_REG9 FIFO_EN
+            return 0
+        return self.registers[0x2E] >> 5  # FIFO_CTRL FMODE, 0 is bypass
+
+    def _fill_fifo(self):
+        rate = self.GYRO_ODR.get(self.registers[0x10] >> 5) or self.ACCEL_ODR.get(self.registers[0x20] >> 5)
+        mode = self._fifo_mode()
+        if not mode or not rate:
+            self._fifo_next = None
+            return
+        period = 1.0 / rate
+        if self._fifo_next is None:
+            self._fifo_next = self.now + period
+        # only the last FIFO_SIZE samples can still be in a continuous FIFO
+        self._fifo_next = max(self._fifo_next, self.now - self.FIFO_SIZE * period)
+        while self._fifo_next <= self.now:
+            if len(self.fifo) >= self.FIFO_SIZE:
+                self.overrun = True
+                if mode == 1:  # FIFO mode stops when full
+                    self._fifo_next = self.now + period
+                    break
+                self.fifo.pop(0)  # continuous mode overwrites the oldest
+            self.fifo.append(self._sample(self._fifo_next))
+            self._fifo_next += period
+
+    def write(self, data):
+        if data:
+            data = bytes((data[0] & 0x7F,)) + bytes(data[1:])
+        super().write(data)
+
+    def write_register(self, reg, value):
+        if reg == 0x22 and value & 0x01:  # SW_RESET
+            value = 0x04
+        if reg == 0x2E and not value >> 5:  # bypass mode empties the FIFO
+            self.fifo = []
+            self.overrun = False
+        super().write_register(reg, value)
+
+    def read_register(self, reg):
+        if reg == 0x2F:  # FIFO_SRC: OVRN and the unread sample count
+            return (0x40 if self.overrun else 0) | len(self.fifo)
+        return super().read_register(reg)
+
+    def read(self, count):
+        start = self.pointer
+        if self._fifo_mode():
+            self._fill_fifo()
+            if 0x28 <= start <= 0x2D:
+                return self._read_fifo(start, count)
+            if 0x15 <= start <= 0x2D and self.fifo:
+                self._load(self.fifo[0])
+            data = super().read(count)
+            if start == 0x2F:
+                self.overrun = False
+            elif start <= 0x2D < start + count and self.fifo:
+                self.fifo.pop(0)
+            return data
+        if 0x15 <= start <= 0x2D:
+            self.latch()
+        return super().read(count)
+
+
+    def _read_fifo(self, start, count):
+        out = bytearray(count)
+        reg = start
+        if self.fifo:
+            self._load(self.fifo[0])
+        for i in range(count):
+            out[i] = self.registers[reg]
+            if reg == 0x2D:
+                if self.fifo:
+                    self.fifo.pop(0)
+                if self.fifo:
+                    self._load(self.fifo[0])
+                reg = 0x28
+            else:
+                reg += 1
+        self.pointer = reg
+        return out
+
+
+class LSM9DS1Mag(I2CTarget):
+    """Magnetometer half of the LSM9DS1 (MSB of the sub-address auto-increments)."""
+
+    name = "LSM9DS1-M"
+    MAG_SCALE = {0: 0.14, 1: 0.29, 2: 0.43, 3: 0.58}  # mgauss per LSB
+
+    def __init__(self, motion, address=0x1E):
+        super().__init__(address, size=0x34)
+        self.motion = motion
+        self.registers[0x0F] = 0x3D
+
+    def write(self, data):
+        if data:
+            data = bytes((data[0] & 0x7F,)) + bytes(data[1:])
+        super().write(data)
+
+    def read(self, count):
+        if 0x28 <= self.pointer <= 0x2D:
+            _, _, mag = self.motion.sample(self.now)
+            scale = self.MAG_SCALE[(self.registers[0x21] >> 5) & 0x03]
+            for i, value in enumerate(mag):
+                raw = int(round(value * 1000 / scale)) & 0xFFFF
+                self.registers[0x28 + 2 * i] = raw & 0xFF
+                self.registers[0x29 + 2 * i] = raw >> 8
+        return super().read(count)
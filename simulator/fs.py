@@ -0,0 +1,158 @@
+"""Map the device's absolute paths (``/images/...``) onto the host checkout.
+
+CircuitPython code opens files relative to the CIRCUITPY drive root.  While a
+simulation runs, ``open`` and the handful of ``os`` functions device code uses
+are routed through :class:`DeviceFS`, which rewrites those paths and charges
+flash read time to the virtual clock.
+"""
+
+import builtins
+import os
+
+_real_open = builtins.open
+_OS_FUNCS = ("stat", "listdir", "remove", "rename", "mkdir", "rmdir")
+_real_os = {name: getattr(os, name) for name in _OS_FUNCS}
+
+
+class _DeviceFile:
+    """File wrapper that charges read/write time and tracks open handles."""
+
+    def __init__(self, fs, path, handle):
+        self._fs = fs
+        self._path = path
+        self._handle = handle
+
+    def __getattr__(self, name):
+        return getattr(self._handle, name)
+
+    def __iter__(self):
+        return iter(self._handle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _charge(self, nbytes, per_byte, access=True):
+        fixed = self._fs.access_time if access else 0.0
+        self._fs.clock.advance(fixed + nbytes * per_byte)
+
+    def read(self, *args):
+        data = self._handle.read(*args)
+        self._fs.bytes_read += len(data)
+        self._charge(len(data), self._fs.read_time)
+        return data
+
+    def readinto(self, buffer):
+        count = self._handle.readinto(buffer)
+        self._fs.bytes_read += count or 0
+        self._charge(count or 0, self._fs.read_time)
+        return count
+
+    def readline(self, *args):
+        line = self._handle.readline(*args)
+        self._fs.bytes_read += len(line)
+        # readline is served from the FAT sector cache, no seek cost
+        self._charge(len(line), self._fs.read_time, access=False)
+        return line
+
+    def write(self, data):
+        count = self._handle.write(data)
+        self._fs.bytes_written += len(data)
+        self._fs.writes += 1
+        self._charge(len(data), self._fs.write_time)
+        return count
+
+    def flush(self):
+        self._handle.flush()
+
+    def close(self):
+        if not self._handle.closed:
+            self._fs.open_handles -= 1
+        self._handle.close()
+
+
+class DeviceFS:
+    """Redirects device paths to ``root`` and to any mounted volumes.
+
+    :param str root: Host directory that plays the role of CIRCUITPY.
+    :param float read_time: Seconds per byte read from flash.
+    :param float access_time: Fixed seconds per read/write call (FAT lookup).
+    """
+
+    def __init__(self, clock, root, read_time=0.4e-6, write_time=2e-6, access_time=0.0002):
+        self.clock = clock
+        self.root = os.path.abspath(root)
+        self.read_time = read_time
+        self.write_time = write_time
+        self.access_time = access_time
+        self.mounts = {}
+        self.opens = 0
+        self.open_handles = 0
+        self.peak_open_handles = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.writes = 0
+        self.open_counts = {}
+
+    def mount(self, mount_point, host_dir):
+        os.makedirs(host_dir, exist_ok=True)
+        self.mounts[mount_point.rstrip("/")] = host_dir
+
+    def host_path(self, path):
+        """Translate a device path; host paths pass through unchanged."""
+        if isinstance(path, int) or not isinstance(path, str) or not path.startswith("/"):
+            return path
+        for mount_point, host_dir in self.mounts.items():
+            if path == mount_point or path.startswith(mount_point + "/"):
+                return host_dir + path[len(mount_point):]
+        top = path[1:].split("/", 1)[0]
+        if top:
+            try:
+                _real_os["stat"](os.path.join(self.root, top))
+            except OSError:
+                return path
+            return os.path.join(self.root, path[1:])
+        return path
+
+    def open(self, file, mode="r", *args, **kwargs):
+        host = self.host_path(file)
+        if host == file:
+            return _real_open(file, mode, *args, **kwargs)
+        handle = _real_open(host, mode, *args, **kwargs)
+        self.opens += 1
+        self.open_counts[file] = self.open_counts.get(file, 0) + 1
+        self.open_handles += 1
+        self.peak_open_handles = max(self.peak_open_handles, self.open_handles)
+        self.clock.advance(self.access_time)
+        return _DeviceFile(self, file, handle)
+
+    def _wrap_os(self, name):
+        real = _real_os[name]
+
+        def call(*args, **kwargs):
+            args = [self.host_path(arg) if isinstance(arg, str) else arg for arg in args]
+            return real(*args, **kwargs)
+        return call
+
+    def install(self):
+        builtins.open = self.open
+        for name in _OS_FUNCS:
+            setattr(os, name, self._wrap_os(name))
+
+    @staticmethod
+    def uninstall():
+        builtins.open = _real_open
+        for name, func in _real_os.items():
+            setattr(os, name, func)
+
+    def stats(self):
+        return {
+            "opens": self.opens,
+            "open_handles": self.open_handles,
+            "peak_open_handles": self.peak_open_handles,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "writes": self.writes,
+        }
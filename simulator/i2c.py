@@ -0,0 +1,157 @@
+"""Simulated I2C bus with per-device traffic accounting."""
+
+
+class I2CTarget:
+    """Base class for a register-mapped I2C peripheral model.
+
+    Subclasses fill ``self.registers`` and may override :meth:`read_register`
+    or :meth:`write_register` for registers with side effects.  A transfer
+    starts with a register pointer byte, after which reads and writes
+    auto-increment from that address.
+    """
+
+    name = "device"
+
+    def __init__(self, address, size=256):
+        self.address = address
+        self.registers = bytearray(size)
+        self.pointer = 0
+        self.clock = None
+
+    def attach(self, clock):
+        self.clock = clock
+
+    @property
+    def now(self):
+        return self.clock.now if self.clock else 0.0
+
+    def read_register(self, reg):
+        return self.registers[reg % len(self.registers)]
+
+    def write_register(self, reg, value):
+        self.registers[reg % len(self.registers)] = value
+
+    def next_register(self, reg):
+        """Address that follows ``reg`` during a multi-byte transfer."""
+        return (reg + 1) % len(self.registers)
+
+    def ready(self):
+        """Return False to NACK a read (e.g. conversion still in progress)."""
+        return True
+
+    def write(self, data):
+        if not data:
+            return
+        self.pointer = data[0]
+        reg = self.pointer
+        for value in data[1:]:
+            self.write_register(reg, value)
+            reg = self.next_register(reg)
+
+    def read(self, count):
+        out = bytearray(count)
+        reg = self.pointer
+        for i in range(count):
+            out[i] = self.read_register(reg) & 0xFF
+            reg = self.next_register(reg)
+        self.pointer = reg
+        return out
+
+
+class DeviceTraffic:
+    """Counters for one address on the bus."""
+
+    def __init__(self, name):
+        self.name = name
+        self.transactions = 0
+        self.bytes = 0
+        self.nacks = 0
+        self.busy_time = 0.0
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "transactions": self.transactions,
+            "bytes": self.bytes,
+            "nacks": self.nacks,
+            "busy_ms": round(self.busy_time * 1000, 3),
+        }
+
+
+class I2CBus:
+    """Shared bus that the ``busio.I2C`` shim talks to.
+
+    :param clock: The :class:`~simulator.clock.VirtualClock` to charge.
+    :param float overhead: Fixed software cost per transaction, in seconds.
+    """
+
+    def __init__(self, clock, frequency=100000, overhead=0.00004):
+        self.clock = clock
+        self.frequency = frequency
+        self.overhead = overhead
+        self.devices = {}
+        self.traffic = {}
+        self.transactions = 0
+        self.bytes = 0
+        self.locked = False
+
+    def add(self, device):
+        device.attach(self.clock)
+        self.devices[device.address] = device
+        self.traffic[device.address] = DeviceTraffic(device.name)
+        return device
+
+    def scan(self):
+        return sorted(self.devices)
+
+    def _charge(self, address, nbytes):
+        # start + address byte + payload, 9 clocks per byte, plus stop
+        seconds = self.overhead + (nbytes + 1) * 9.0 / self.frequency
+        self.transactions += 1
+        self.bytes += nbytes
+        stats = self.traffic.get(address)
+        if stats is not None:
+            stats.transactions += 1
+            stats.bytes += nbytes
+            stats.busy_time += seconds
+        self.clock.advance(seconds)
+
+    def _device(self, address, reading=False):
+        device = self.devices.get(address)
+        if device is None or (reading and not device.ready()):
+            self._charge(address, 0)
+            if device is not None:
+                self.traffic[address].nacks += 1
+            raise OSError(19)  # ENODEV, what CircuitPython raises on NACK
+        return device
+
+    def writeto(self, address, data, start=0, end=None):
+        data = bytes(data[start:end])
+        device = self._device(address)
+        self._charge(address, len(data))
+        device.write(data)
+
+    def readfrom_into(self, address, buffer, start=0, end=None):
+        end = len(buffer) if end is None else end
+        device = self._device(address, reading=True)
+        self._charge(address, end - start)
+        buffer[start:end] = device.read(end - start)
+
+    def writeto_then_readfrom(self, address, out_buffer, in_buffer,
+                              out_start=0, out_end=None, in_start=0, in_end=None):
+        device = self._device(address)
+        data = bytes(out_buffer[out_start:out_end])
+        in_end = len(in_buffer) if in_end is None else in_end
+        self._charge(address, len(data) + in_end - in_start)
+        device.write(data)
+        if not device.ready():
+            self.traffic[address].nacks += 1
+            raise OSError(19)
+        in_buffer[in_start:in_end] = device.read(in_end - in_start)
+
+    def stats(self):
+        return {
+            "transactions": self.transactions,
+            "bytes": self.bytes,
+            "devices": {hex(addr): t.as_dict() for addr, t in sorted(self.traffic.items())},
+        }
@@ -0,0 +1,72 @@
+"""Simulated ``adafruit_adt7410`` driver (same bus traffic as the real one)."""
+
+import struct
+
+from adafruit_bus_device.i2c_device import I2CDevice
+
+_ADT7410_TEMPMSB = 0x0
+_ADT7410_STATUS = 0x2
+_ADT7410_CONFIG = 0x3
+_ADT7410_ID = 0xB
+_ADT7410_SWRST = 0x2F
+
+
+class ADT7410:
+    """ADT7410 temperature sensor."""
+
+    def __init__(self, i2c_bus, address=0x48):
+        self.i2c_device = I2CDevice(i2c_bus, address)
+        self._buf = bytearray(3)
+        if self._read_register(_ADT7410_ID)[0] & 0xF8 != 0xC8:
+            raise ValueError("Unable to find ADT7410 at i2c address " + str(hex(address)))
+        self.reset()
+
+    @property
+    def temperature(self):
+        """Temperature in degrees Celsius."""
+        while self.status & 0x80:
+            pass
+        temp = self._read_register(_ADT7410_TEMPMSB, 2)
+        value = struct.unpack(">h", temp)[0]
+        if not self.high_resolution:
+            value = value >> 3 << 3
+        return value / 128
+
+    @property
+    def status(self):
+        return self._read_register(_ADT7410_STATUS)[0]
+
+    @property
+    def configuration(self):
+        return self._read_register(_ADT7410_CONFIG)[0]
+
+    @configuration.setter
+    def configuration(self, val):
+        self._write_register(_ADT7410_CONFIG, val)
+
+    @property
+    def high_resolution(self):
+        return bool(self.configuration & 0x80)
+
+    @high_resolution.setter
+    def high_resolution(self, value):
+        config = self.configuration
+        self.configuration = (config | 0x80) if value else (config & 0x7F)
+
+    def reset(self):
+        self._write_register(_ADT7410_SWRST)
+
+    def _read_register(self, addr, num=1):
+        self._buf[0] = addr
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(self._buf, self._buf, out_end=1, in_start=1, in_end=num + 1)
+        return self._buf[1:num + 1]
+
+    def _write_register(self, addr, data=None):
+        self._buf[0] = addr
+        end = 1
+        if data is not None:
+            self._buf[1] = data
+            end = 2
+        with self.i2c_device as i2c:
+            i2c.write(self._buf, end=end)
@@ -0,0 +1,13 @@
+"""Simulated ``adafruit_bitmap_font.bitmap_font``: BDF fonts only."""
+
+from adafruit_bitmap_font.bdf import BDF
+
+
+def load_font(filename, bitmap=None):
+    """Load a BDF font; glyphs are parsed lazily, as on the device."""
+    font_file = open(filename, "rb")  # pylint: disable=consider-using-with
+    first = font_file.read(16)
+    font_file.seek(0)
+    if first.startswith(b"STARTFONT"):
+        return BDF(font_file, bitmap)
+    raise ValueError("Unknown magic number %r" % first[:4])
@@ -0,0 +1,104 @@
+"""Simulated ``adafruit_button``."""
+
+from adafruit_display_shapes.rect import Rect
+from adafruit_display_shapes.roundrect import RoundRect
+from adafruit_display_text.label import Label
+import displayio
+
+from simulator import runtime
+
+
+class Button(displayio.Group):
+    """Rectangular touch button with a centred label and a selected style."""
+
+    RECT = 0
+    ROUNDRECT = 1
+    SHADOWRECT = 2
+    SHADOWROUNDRECT = 3
+
+    def __init__(self, *, x, y, width, height, name=None, style=RECT, fill_color=0xFFFFFF,
+                 outline_color=0x0, label=None, label_font=None, label_color=0x0,
+                 selected_fill=None, selected_outline=None, selected_label=None, **kwargs):
+        super().__init__(x=x, y=y)
+        self.width = width
+        self.height = height
+        self.name = name
+        self._font = label_font
+        self._selected = False
+        self._fill_color = fill_color
+        self._outline_color = outline_color
+        self._label_color = label_color
+        self.selected_fill = selected_fill if selected_fill is not None else (~fill_color) & 0xFFFFFF
+        self.selected_outline = selected_outline if selected_outline is not None else (~outline_color) & 0xFFFFFF
+        self._selected_label = selected_label if selected_label is not None else (~label_color) & 0xFFFFFF
+        if style in (Button.ROUNDRECT, Button.SHADOWROUNDRECT):
+            self.body = RoundRect(0, 0, width, height, min(width, height) // 4,
+                                  fill=fill_color, outline=outline_color)
+        else:
+            self.body = Rect(0, 0, width, height, fill=fill_color, outline=outline_color)
+        self.append(self.body)
+        self._label = None
+        self.label = label
+
+    @property
+    def label(self):
+        return self._label.text if self._label else None
+
+    @label.setter
+    def label(self, new_label):
+        if self._label is not None:
+            self.remove(self._label)
+            self._label = None
+        if not new_label or self._font is None:
+            return
+        self._label = Label(self._font, text=new_label)
+        box = self._label.bounding_box
+        self._label.x = (self.width - box[2]) // 2
+        self._label.y = self.height // 2
+        self._label.color = self._selected_label if self._selected else self._label_color
+        self.append(self._label)
+
+    @property
+    def selected(self):
+        return self._selected
+
+    @selected.setter
+    def selected(self, value):
+        if value == self._selected:
+            return
+        self._selected = value
+        runtime.current().count("button_restyles")
+        if value:
+            self.body.fill = self.selected_fill
+            self.body.outline = self.selected_outline
+            color = self._selected_label
+        else:
+            self.body.fill = self._fill_color
+            self.body.outline = self._outline_color
+            color = self._label_color
+        if self._label is not None:
+            self._label.color = color
+
+    @property
+    def fill_color(self):
+        return self._fill_color
+
+    @fill_color.setter
+    def fill_color(self, value):
+        self._fill_color = value
+        if not self._selected:
+            self.body.fill = value
+
+    @property
+    def label_color(self):
+        return self._label_color
+
+    @label_color.setter
+    def label_color(self, value):
+        self._label_color = value
+        if not self._selected and self._label is not None:
+            self._label.color = value
+
+    def contains(self, point):
+        """True if the (x, y) ``point`` falls inside the button."""
+        return (self.x <= point[0] <= self.x + self.width) and (self.y <= point[1] <= self.y + self.height)
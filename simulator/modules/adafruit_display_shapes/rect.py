@@ -0,0 +1,41 @@
+"""Simulated ``adafruit_display_shapes.rect``."""
+
+import displayio
+
+
+class Rect(displayio.TileGrid):
+    """A filled and/or outlined rectangle backed by a 2-colour bitmap."""
+
+    def __init__(self, x, y, width, height, *, fill=None, outline=None, stroke=1):
+        self._bitmap = displayio.Bitmap(width, height, 2)
+        self._palette = displayio.Palette(2)
+        for yy in range(height):
+            for xx in range(width):
+                if xx < stroke or yy < stroke or xx >= width - stroke or yy >= height - stroke:
+                    self._bitmap._data[yy * width + xx] = 1
+        self._set_color(0, fill)
+        self._set_color(1, outline if outline is not None else fill)
+        super().__init__(self._bitmap, pixel_shader=self._palette, x=x, y=y)
+
+    def _set_color(self, index, color):
+        if color is None:
+            self._palette.make_transparent(index)
+        else:
+            self._palette[index] = color
+            self._palette.make_opaque(index)
+
+    @property
+    def fill(self):
+        return None if self._palette.is_transparent(0) else self._palette[0]
+
+    @fill.setter
+    def fill(self, color):
+        self._set_color(0, color)
+
+    @property
+    def outline(self):
+        return None if self._palette.is_transparent(1) else self._palette[1]
+
+    @outline.setter
+    def outline(self, color):
+        self._set_color(1, color)
@@ -0,0 +1,11 @@
+"""Simulated ``adafruit_display_shapes.roundrect`` (corners drawn square)."""
+
+from adafruit_display_shapes.rect import Rect
+
+
+class RoundRect(Rect):
+    """Rectangle with rounded corners; the radius is accepted but not drawn."""
+
+    def __init__(self, x, y, width, height, r, *, fill=None, outline=None, stroke=1):
+        self.r = r
+        super().__init__(x, y, width, height, fill=fill, outline=outline, stroke=stroke)
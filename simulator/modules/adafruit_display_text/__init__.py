@@ -0,0 +1,16 @@
+"""Simulated ``adafruit_display_text``."""
+
+
+def wrap_text_to_lines(string, max_chars):
+    """Split ``string`` into lines of at most ``max_chars`` characters."""
+    lines = []
+    for paragraph in string.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            if line and len(line) + 1 + len(word) > max_chars:
+                lines.append(line)
+                line = word
+            else:
+                line = word if not line else line + " " + word
+        lines.append(line)
+    return lines
@@ -0,0 +1,142 @@
+"""Simulated ``adafruit_display_text.label``.
+
+Like the real library, every ``text`` assignment discards the previous glyph
+TileGrids and lays the string out again; that work is charged per glyph.
+"""
+
+import displayio
+
+from simulator import runtime
+
+
+class Label(displayio.Group):
+    """A text label made of one TileGrid per glyph."""
+
+    def __init__(self, font, *, x=0, y=0, text="", color=0xFFFFFF, background_color=None,
+                 scale=1, line_spacing=1.25, anchor_point=None, anchored_position=None,
+                 max_glyphs=None, **kwargs):
+        super().__init__(x=x, y=y, scale=scale)
+        self._font = font
+        self._text = None
+        self._line_spacing = line_spacing
+        self._palette = displayio.Palette(2)
+        self._palette.make_transparent(0)
+        self._palette[1] = color
+        self._color = color
+        self._background_color = background_color
+        self._bounding_box = (0, 0, 0, 0)
+        self._anchor_point = anchor_point
+        self._anchored_position = anchored_position
+        self._local = displayio.Group()
+        self.append(self._local)
+        if text:
+            self.text = text
+
+    @property
+    def font(self):
+        return self._font
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        self._color = value
+        self._palette[1] = value
+
+    @property
+    def background_color(self):
+        return self._background_color
+
+    @background_color.setter
+    def background_color(self, value):
+        self._background_color = value
+
+    @property
+    def line_spacing(self):
+        return self._line_spacing
+
+    @property
+    def bounding_box(self):
+        """(x, y, width, height) of the laid-out text, relative to the label."""
+        return self._bounding_box
+
+    @property
+    def height(self):
+        return self._bounding_box[3]
+
+    @property
+    def width(self):
+        return self._bounding_box[2]
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, new_text):
+        self._layout(str(new_text))
+
+    def _layout(self, text):
+        sim = runtime.current()
+        sim.count("label_writes")
+        while len(self._local):
+            self._local.pop()
+        font = self._font
+        box_height = font.get_bounding_box()[1]
+        line_height = int(box_height * self._line_spacing)
+        y_offset = getattr(font, "ascent", box_height) // 2
+        cursor_x = cursor_y = 0
+        left = top = 0
+        right = bottom = 0
+        glyphs = 0
+        for char in text:
+            if char == "\n":
+                cursor_x = 0
+                cursor_y += line_height
+                continue
+            glyph = font.get_glyph(ord(char))
+            if glyph is None:
+                continue
+            if glyph.width and glyph.height:
+                position_y = cursor_y - glyph.height - glyph.dy + y_offset
+                tile = displayio.TileGrid(glyph.bitmap, pixel_shader=self._palette,
+                                          default_tile=glyph.tile_index,
+                                          tile_width=glyph.width, tile_height=glyph.height,
+                                          x=cursor_x + glyph.dx, y=position_y)
+                self._local.append(tile)
+                glyphs += 1
+                top = min(top, position_y)
+                bottom = max(bottom, position_y + glyph.height)
+            cursor_x += glyph.shift_x
+            right = max(right, cursor_x)
+        self._text = text
+        self._bounding_box = (left, top, right - left, bottom - top)
+        sim.count("label_glyphs", glyphs)
+        sim.clock.advance(sim.costs.label_write + glyphs * sim.costs.label_glyph)
+
+    @property
+    def anchor_point(self):
+        return self._anchor_point
+
+    @anchor_point.setter
+    def anchor_point(self, value):
+        self._anchor_point = value
+        self._apply_anchor()
+
+    @property
+    def anchored_position(self):
+        return self._anchored_position
+
+    @anchored_position.setter
+    def anchored_position(self, value):
+        self._anchored_position = value
+        self._apply_anchor()
+
+    def _apply_anchor(self):
+        if self._anchor_point is None or self._anchored_position is None:
+            return
+        box = self._bounding_box
+        self.x = int(self._anchored_position[0] - box[2] * self._anchor_point[0] * self.scale)
+        self.y = int(self._anchored_position[1] - (box[1] + box[3] * self._anchor_point[1]) * self.scale)
@@ -0,0 +1,70 @@
+"""Simulated ``adafruit_ds3231`` driver."""
+
+import time
+
+from adafruit_bus_device.i2c_device import I2CDevice
+
+
+def _bcd2bin(value):
+    return value - 6 * (value >> 4)
+
+
+def _bin2bcd(value):
+    return value + 6 * (value // 10)
+
+
+class DS3231:
+    """DS3231 real-time clock; ``datetime`` is one 7-byte BCD transfer."""
+
+    def __init__(self, i2c):
+        self.i2c_device = I2CDevice(i2c, 0x68)
+        self._buffer = bytearray(8)
+
+    @property
+    def datetime(self):
+        """The current date and time as a ``time.struct_time``."""
+        self._buffer[0] = 0x00
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(self._buffer, self._buffer, out_end=1, in_start=1)
+        buf = self._buffer
+        return time.struct_time((
+            _bcd2bin(buf[7]) + 2000,
+            _bcd2bin(buf[6] & 0x1F),
+            _bcd2bin(buf[5]),
+            _bcd2bin(buf[3]),
+            _bcd2bin(buf[2]),
+            _bcd2bin(buf[1] & 0x7F),
+            _bcd2bin(buf[4] - 1),
+            -1,
+            -1,
+        ))
+
+    @datetime.setter
+    def datetime(self, value):
+        buf = self._buffer
+        buf[0] = 0x00
+        buf[1] = _bin2bcd(value.tm_sec) & 0x7F
+        buf[2] = _bin2bcd(value.tm_min)
+        buf[3] = _bin2bcd(value.tm_hour)
+        buf[4] = _bin2bcd(value.tm_wday + 1)
+        buf[5] = _bin2bcd(value.tm_mday)
+        buf[6] = _bin2bcd(value.tm_mon)
+        buf[7] = _bin2bcd(value.tm_year - 2000)
+        with self.i2c_device as i2c:
+            i2c.write(buf)
+
+    @property
+    def temperature(self):
+        buf = bytearray(3)
+        buf[0] = 0x11
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(buf, buf, out_end=1, in_start=1)
+        return buf[1] + (buf[2] >> 6) * 0.25
+
+    @property
+    def lost_power(self):
+        buf = bytearray(2)
+        buf[0] = 0x0F
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(buf, buf, out_end=1, in_start=1)
+        return bool(buf[1] & 0x80)
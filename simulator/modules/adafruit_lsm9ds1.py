@@ -0,0 +1,179 @@
+"""Simulated ``adafruit_lsm9ds1`` driver (I2C only)."""
+
+import struct
+import time
+
+from adafruit_bus_device.i2c_device import I2CDevice
+
+_LSM9DS1_ADDRESS_ACCELGYRO = 0x6B
+_LSM9DS1_ADDRESS_MAG = 0x1E
+_LSM9DS1_XG_ID = 0b01101000
+_LSM9DS1_MAG_ID = 0b00111101
+_LSM9DS1_ACCEL_MG_LSB_2G = 0.061
+_LSM9DS1_ACCEL_MG_LSB_4G = 0.122
+_LSM9DS1_ACCEL_MG_LSB_8G = 0.244
+_LSM9DS1_ACCEL_MG_LSB_16G = 0.732
+_LSM9DS1_MAG_MGAUSS_4GAUSS = 0.14
+_LSM9DS1_MAG_MGAUSS_8GAUSS = 0.29
+_LSM9DS1_MAG_MGAUSS_12GAUSS = 0.43
+_LSM9DS1_MAG_MGAUSS_16GAUSS = 0.58
+_LSM9DS1_GYRO_DPS_DIGIT_245DPS = 0.00875
+_LSM9DS1_GYRO_DPS_DIGIT_500DPS = 0.01750
+_LSM9DS1_GYRO_DPS_DIGIT_2000DPS = 0.07000
+_LSM9DS1_TEMP_LSB_DEGREE_CELSIUS = 8
+_LSM9DS1_REGISTER_WHO_AM_I_XG = 0x0F
+_LSM9DS1_REGISTER_CTRL_REG1_G = 0x10
+_LSM9DS1_REGISTER_TEMP_OUT_L = 0x15
+_LSM9DS1_REGISTER_OUT_X_L_G = 0x18
+_LSM9DS1_REGISTER_CTRL_REG5_XL = 0x1F
+_LSM9DS1_REGISTER_CTRL_REG6_XL = 0x20
+_LSM9DS1_REGISTER_CTRL_REG8 = 0x22
+_LSM9DS1_REGISTER_OUT_X_L_XL = 0x28
+_LSM9DS1_REGISTER_WHO_AM_I_M = 0x0F
+_LSM9DS1_REGISTER_CTRL_REG1_M = 0x20
+_LSM9DS1_REGISTER_CTRL_REG2_M = 0x21
+_LSM9DS1_REGISTER_CTRL_REG3_M = 0x22
+_LSM9DS1_REGISTER_OUT_X_L_M = 0x28
+_SENSORS_GRAVITY_STANDARD = 9.80665
+
+ACCELRANGE_2G = 0b00 << 3
+ACCELRANGE_16G = 0b01 << 3
+ACCELRANGE_4G = 0b10 << 3
+ACCELRANGE_8G = 0b11 << 3
+MAGGAIN_4GAUSS = 0b00 << 5
+MAGGAIN_8GAUSS = 0b01 << 5
+MAGGAIN_12GAUSS = 0b10 << 5
+MAGGAIN_16GAUSS = 0b11 << 5
+GYROSCALE_245DPS = 0b00 << 3
+GYROSCALE_500DPS = 0b01 << 3
+GYROSCALE_2000DPS = 0b11 << 3
+
+
+def _twos_comp(val, bits):
+    if val & (1 << (bits - 1)) != 0:
+        return val - (1 << bits)
+    return val
+
+
+class LSM9DS1_I2C:  # pylint: disable=invalid-name
+    """LSM9DS1 9-DOF IMU on I2C."""
+
+    def __init__(self, i2c, mag_address=_LSM9DS1_ADDRESS_MAG, xg_address=_LSM9DS1_ADDRESS_ACCELGYRO):
+        self._mag_device = I2CDevice(i2c, mag_address)
+        self._xg_device = I2CDevice(i2c, xg_address)
+        self._BUFFER = bytearray(6)  # pylint: disable=invalid-name
+        if (self._read_u8(True, _LSM9DS1_REGISTER_WHO_AM_I_XG) != _LSM9DS1_XG_ID
+                or self._read_u8(False, _LSM9DS1_REGISTER_WHO_AM_I_M) != _LSM9DS1_MAG_ID):
+            raise RuntimeError("Could not find LSM9DS1, check wiring!")
+        self._write_u8(True, _LSM9DS1_REGISTER_CTRL_REG8, 0x05)
+        self._write_u8(False, _LSM9DS1_REGISTER_CTRL_REG2_M, 0x0C)
+        time.sleep(0.01)
+        self._write_u8(True, _LSM9DS1_REGISTER_CTRL_REG1_G, 0xC0)
+        self._write_u8(True, _LSM9DS1_REGISTER_CTRL_REG5_XL, 0x38)
+        self._write_u8(True, _LSM9DS1_REGISTER_CTRL_REG6_XL, 0xC0)
+        self._write_u8(False, _LSM9DS1_REGISTER_CTRL_REG3_M, 0x00)
+        self._accel_mg_lsb = None
+        self._mag_mgauss_lsb = None
+        self._gyro_dps_digit = None
+        self.accel_range = ACCELRANGE_2G
+        self.mag_gain = MAGGAIN_4GAUSS
+        self.gyro_scale = GYROSCALE_245DPS
+
+    @property
+    def accel_range(self):
+        return (self._read_u8(True, _LSM9DS1_REGISTER_CTRL_REG6_XL) & 0b00011000) & 0xFF
+
+    @accel_range.setter
+    def accel_range(self, val):
+        reg = self._read_u8(True, _LSM9DS1_REGISTER_CTRL_REG6_XL)
+        self._write_u8(True, _LSM9DS1_REGISTER_CTRL_REG6_XL, (reg & ~0b00011000 & 0xFF) | val)
+        self._accel_mg_lsb = {ACCELRANGE_2G: _LSM9DS1_ACCEL_MG_LSB_2G, ACCELRANGE_4G: _LSM9DS1_ACCEL_MG_LSB_4G,
+                              ACCELRANGE_8G: _LSM9DS1_ACCEL_MG_LSB_8G,
+                              ACCELRANGE_16G: _LSM9DS1_ACCEL_MG_LSB_16G}[val]
+
+    @property
+    def mag_gain(self):
+        return (self._read_u8(False, _LSM9DS1_REGISTER_CTRL_REG2_M) & 0b01100000) & 0xFF
+
+    @mag_gain.setter
+    def mag_gain(self, val):
+        reg = self._read_u8(False, _LSM9DS1_REGISTER_CTRL_REG2_M)
+        self._write_u8(False, _LSM9DS1_REGISTER_CTRL_REG2_M, (reg & ~0b01100000 & 0xFF) | val)
+        self._mag_mgauss_lsb = {MAGGAIN_4GAUSS: _LSM9DS1_MAG_MGAUSS_4GAUSS, MAGGAIN_8GAUSS: _LSM9DS1_MAG_MGAUSS_8GAUSS,
+                                MAGGAIN_12GAUSS: _LSM9DS1_MAG_MGAUSS_12GAUSS,
+                                MAGGAIN_16GAUSS: _LSM9DS1_MAG_MGAUSS_16GAUSS}[val]
+
+    @property
+    def gyro_scale(self):
+        return (self._read_u8(True, _LSM9DS1_REGISTER_CTRL_REG1_G) & 0b00011000) & 0xFF
+
+    @gyro_scale.setter
+    def gyro_scale(self, val):
+        reg = self._read_u8(True, _LSM9DS1_REGISTER_CTRL_REG1_G)
+        self._write_u8(True, _LSM9DS1_REGISTER_CTRL_REG1_G, (reg & ~0b00011000 & 0xFF) | val)
+        self._gyro_dps_digit = {GYROSCALE_245DPS: _LSM9DS1_GYRO_DPS_DIGIT_245DPS,
+                                GYROSCALE_500DPS: _LSM9DS1_GYRO_DPS_DIGIT_500DPS,
+                                GYROSCALE_2000DPS: _LSM9DS1_GYRO_DPS_DIGIT_2000DPS}[val]
+
+    def read_accel_raw(self):
+        self._read_bytes(True, 0x80 | _LSM9DS1_REGISTER_OUT_X_L_XL, 6, self._BUFFER)
+        return struct.unpack_from("<hhh", self._BUFFER[0:6])
+
+    @property
+    def acceleration(self):
+        """Acceleration in m/s^2."""
+        raw = self.read_accel_raw()
+        return tuple(x * self._accel_mg_lsb / 1000.0 * _SENSORS_GRAVITY_STANDARD for x in raw)
+
+    def read_mag_raw(self):
+        self._read_bytes(False, 0x80 | _LSM9DS1_REGISTER_OUT_X_L_M, 6, self._BUFFER)
+        return struct.unpack_from("<hhh", self._BUFFER[0:6])
+
+    @property
+    def magnetic(self):
+        """Magnetic field in gauss."""
+        raw = self.read_mag_raw()
+        return tuple(x * self._mag_mgauss_lsb / 1000.0 for x in raw)
+
+    def read_gyro_raw(self):
+        self._read_bytes(True, 0x80 | _LSM9DS1_REGISTER_OUT_X_L_G, 6, self._BUFFER)
+        return struct.unpack_from("<hhh", self._BUFFER[0:6])
+
+    @property
+    def gyro(self):
+        """Angular rate in degrees per second."""
+        raw = self.read_gyro_raw()
+        return tuple(x * self._gyro_dps_digit for x in raw)
+
+    def read_temp_raw(self):
+        self._read_bytes(True, 0x80 | _LSM9DS1_REGISTER_TEMP_OUT_L, 2, self._BUFFER)
+        temp = ((self._BUFFER[1] << 8) | self._BUFFER[0]) >> 4
+        return _twos_comp(temp, 12)
+
+    @property
+    def temperature(self):
+        temp = self.read_temp_raw()
+        return 27.5 + temp / 16
+
+    def _device(self, xg):
+        return self._xg_device if xg else self._mag_device
+
+    def _read_u8(self, xg, address):
+        device = self._device(xg)
+        with device as i2c:
+            self._BUFFER[0] = address & 0xFF
+            i2c.write_then_readinto(self._BUFFER, self._BUFFER, out_end=1, in_start=1, in_end=2)
+        return self._BUFFER[1]
+
+    def _read_bytes(self, xg, address, count, buf):
+        device = self._device(xg)
+        with device as i2c:
+            buf[0] = address & 0xFF
+            i2c.write_then_readinto(buf, buf, out_end=1, in_end=count)
+
+    def _write_u8(self, xg, address, val):
+        device = self._device(xg)
+        with device as i2c:
+            self._BUFFER[0] = address & 0xFF
+            self._BUFFER[1] = val & 0xFF
+            i2c.write(self._BUFFER, end=2)
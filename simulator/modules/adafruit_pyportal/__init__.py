@@ -0,0 +1,133 @@
+"""Simulated ``adafruit_pyportal``: graphics, sound and text helpers, and the ESP32."""
+
+import struct
+
+import audioio
+import board
+import displayio
+
+from simulator import runtime
+
+
+def wav_duration(file_name):
+    """Seconds of audio in a PCM WAV file, reading only its headers."""
+    with open(file_name, "rb") as wav:
+        header = wav.read(12)
+        if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ValueError("Not a WAV file: " + file_name)
+        rate = block = 1
+        while True:
+            chunk = wav.read(8)
+            if len(chunk) < 8:
+                return 0.0
+            kind, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+            if kind == b"fmt ":
+                fmt = wav.read(size)
+                rate = struct.unpack_from("<I", fmt, 4)[0]
+                block = struct.unpack_from("<H", fmt, 12)[0]
+            elif kind == b"data":
+                return size / (rate * block)
+            else:
+                wav.seek(size, 1)
+
+
+class Peripherals:
+    """Speaker half of the PyPortal peripherals."""
+
+    def __init__(self):
+        self._speaker_disable = True
+        self.audio = audioio.AudioOut(board.AUDIO_OUT)  # claims the pin, as the library does
+
+    @property
+    def speaker_disable(self):
+        return self._speaker_disable
+
+    @speaker_disable.setter
+    def speaker_disable(self, value):
+        self._speaker_disable = value
+
+    def play_file(self, file_name, wait_to_finish=True):
+        """Stream a WAV from flash; blocks for its full length by default."""
+        sim = runtime.current()
+        sim.count("audio_plays")
+        duration = wav_duration(file_name)
+        with open(file_name, "rb") as wav:
+            # the decoder streams the whole file through a 1kB buffer
+            buf = bytearray(1024)
+            while wav.readinto(buf):
+                pass
+        if wait_to_finish:
+            sim.clock.advance(duration)
+
+
+class _WiFi:
+    def __init__(self):
+        self.esp = runtime.current().esp
+
+
+class Network:
+    """Just the ESP32 handle; joining the network is left to the app."""
+
+    def __init__(self):
+        self._wifi = _WiFi()
+
+
+class PyPortal:
+    """The parts of ``adafruit_pyportal.PyPortal`` code.py relies on."""
+
+    def __init__(self, *, url=None, headers=None, json_path=None, regexp_path=None,
+                 default_bg=0x000000, status_neopixel=None, text_font=None, debug=False, **kwargs):
+        sim = runtime.current()
+        sim.clock.advance(sim.costs.pyportal_init)
+        self.display = board.DISPLAY
+        self.peripherals = Peripherals()
+        self.network = Network()
+        self.splash = displayio.Group()
+        self._bg_group = displayio.Group()
+        self.splash.append(self._bg_group)
+        self._bg_file = None
+        self.display._set_root(self.splash)
+        if default_bg is not None:
+            self.set_background(default_bg)
+
+    def set_background(self, file_or_color, position=None):
+        """Show a BMP file or a solid colour behind everything else."""
+        position = position or (0, 0)
+        while self._bg_group:
+            self._bg_group.pop()
+        if not file_or_color:
+            return
+        if isinstance(file_or_color, str):
+            if self._bg_file:
+                self._bg_file.close()
+            self._bg_file = open(file_or_color, "rb")  # pylint: disable=consider-using-with
+            background = displayio.OnDiskBitmap(self._bg_file)
+            sprite = displayio.TileGrid(background, pixel_shader=background.pixel_shader,
+                                        x=position[0], y=position[1])
+        else:
+            bitmap = displayio.Bitmap(1, 1, 1)
+            palette = displayio.Palette(1)
+            palette[0] = file_or_color
+            sprite = displayio.TileGrid(bitmap, pixel_shader=palette, width=1, height=1)
+        self._bg_group.append(sprite)
+
+    def play_file(self, file_name, wait_to_finish=True):
+        self.peripherals.play_file(file_name, wait_to_finish)
+
+    @staticmethod
+    def wrap_nicely(string, max_chars):
+        """Word-wrap ``string`` into lines of at most ``max_chars`` characters."""
+        string = string.replace("\n", "").replace("\r", "")
+        words = string.split(" ")
+        the_lines = []
+        the_line = ""
+        for w in words:
+            if len(the_line + " " + w) <= max_chars:
+                the_line += " " + w
+            else:
+                the_lines.append(the_line)
+                the_line = "" + w
+        if the_line:
+            the_lines.append(the_line)
+        the_lines[0] = the_lines[0][1:]
+        return the_lines
@@ -0,0 +1,94 @@
+"""Simulated ``adafruit_si7021`` driver.
+
+Uses "no hold master" measurements and polls for the result exactly like the
+Adafruit driver, so each reading keeps the bus busy for the whole conversion.
+"""
+
+import struct
+import time
+
+from adafruit_bus_device.i2c_device import I2CDevice
+
+HUMIDITY = 0xF5
+TEMPERATURE = 0xF3
+_RESET = 0xFE
+_READ_USER1 = 0xE7
+_ID2_CMD = bytearray([0xFC, 0xC9])
+
+
+def _crc(data):
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 0x80:
+                crc <<= 1
+                crc ^= 0x131
+            else:
+                crc <<= 1
+    return crc
+
+
+class SI7021:
+    """SI7021 humidity and temperature sensor."""
+
+    def __init__(self, i2c_bus, address=0x40):
+        self.i2c_device = I2CDevice(i2c_bus, address)
+        self._command(_RESET)
+        time.sleep(0.05)
+        self._measurement = 0
+        self._data()  # throw away the reset response
+        self._buf = bytearray(6)
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(_ID2_CMD, self._buf)
+        self._device_id = self._buf[0]
+
+    def _command(self, command):
+        with self.i2c_device as i2c:
+            i2c.write(struct.pack("B", command))
+
+    def _data(self):
+        data = bytearray(3)
+        data[0] = 0xFF
+        while True:
+            # While busy, the sensor doesn't respond to reads.
+            with self.i2c_device as i2c:
+                try:
+                    i2c.readinto(data)
+                except OSError:
+                    pass
+                else:
+                    if data[0] != 0xFF:  # Check if read succeeded.
+                        break
+                    if self._measurement == 0:
+                        return 0
+        value, checksum = struct.unpack(">HB", data)
+        if checksum != _crc(data[:2]):
+            raise ValueError("CRC mismatch")
+        return value
+
+    @property
+    def relative_humidity(self):
+        """The measured relative humidity in percent."""
+        self.start_measurement(HUMIDITY)
+        value = self._data()
+        self._measurement = 0
+        return min(100.0, value * 125.0 / 65536.0 - 6.0)
+
+    @property
+    def temperature(self):
+        """The measured temperature in degrees Celsius."""
+        self.start_measurement(TEMPERATURE)
+        value = self._data()
+        self._measurement = 0
+        return value * 175.72 / 65536.0 - 46.85
+
+    def start_measurement(self, what):
+        """Start a measurement; read it later with ``relative_humidity``."""
+        if what not in (HUMIDITY, TEMPERATURE):
+            raise ValueError()
+        if not self._measurement:
+            self._command(what)
+        elif self._measurement != what:
+            raise RuntimeError("other measurement in progress")
+        self._measurement = what
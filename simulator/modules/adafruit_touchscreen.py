@@ -0,0 +1,25 @@
+"""Simulated resistive touchscreen driven by the simulator's touch script."""
+
+from simulator import runtime
+
+
+class Touchscreen:
+    """Same constructor as ``adafruit_touchscreen.Touchscreen``."""
+
+    def __init__(self, x1_pin, x2_pin, y1_pin, y2_pin, *, x_resistance=None, samples=4,
+                 z_threshold=10000, calibration=None, size=None):
+        self._samples = samples
+        self._size = size or (65535, 65535)
+
+    @property
+    def touch_point(self):
+        """(x, y, pressure) of the current touch, or None."""
+        sim = runtime.current()
+        sim.count("touch_reads")
+        point = sim.touch.point(sim.clock.now)
+        sim.touch_read()
+        if point is None:
+            sim.clock.advance(sim.costs.touch_idle)
+            return None
+        sim.clock.advance(sim.costs.touch_sample * self._samples / 4)
+        return point
@@ -0,0 +1,23 @@
+"""Simulated ``analogio``; the light sensor follows the simulator environment."""
+
+from simulator import runtime
+
+
+class AnalogIn:
+    """16-bit analog input."""
+
+    def __init__(self, pin):
+        self._pin = pin
+        self.reference_voltage = 3.3
+
+    @property
+    def value(self):
+        sim = runtime.current()
+        sim.count("adc_reads")
+        sim.clock.advance(sim.costs.adc_read)
+        if getattr(self._pin, "name", None) == "LIGHT":
+            return max(0, min(65535, int(sim.env.light(sim.clock.now))))
+        return 32768
+
+    def deinit(self):
+        pass
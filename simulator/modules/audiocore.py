@@ -0,0 +1,21 @@
+"""Simulated ``audiocore``: sample sources for ``audioio.AudioOut``."""
+
+import array
+
+
+class RawSample:
+    """Samples held in RAM; playing one does no file I/O."""
+
+    def __init__(self, buffer, *, channel_count=1, sample_rate=8000):
+        if not isinstance(buffer, (array.array, bytearray, bytes, memoryview)):
+            raise TypeError("buffer must be an array")
+        self._buffer = buffer
+        self.channel_count = channel_count
+        self.sample_rate = sample_rate
+
+    @property
+    def duration(self):
+        return len(self._buffer) / (self.channel_count * self.sample_rate)
+
+    def deinit(self):
+        self._buffer = None
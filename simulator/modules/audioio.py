@@ -0,0 +1,61 @@
+"""Simulated ``audioio.AudioOut``: playback runs against the virtual clock."""
+
+from simulator import runtime
+
+_claimed = set()  # pins in use, as on the device
+
+
+class AudioOut:
+    """DAC output; ``play`` returns at once and ``playing`` goes False when done."""
+
+    def __init__(self, left_channel, *, right_channel=None, quiescent_value=0x8000):
+        if left_channel in _claimed:
+            raise ValueError("{} in use".format(getattr(left_channel, "name", left_channel)))
+        _claimed.add(left_channel)
+        self._pin = left_channel
+        self._sample = None
+        self._ends = 0.0
+        self._loop = False
+
+    def _now(self):
+        return runtime.current().clock.now
+
+    def play(self, sample, *, loop=False):
+        sim = runtime.current()
+        sim.count("audio_plays")
+        self._sample = sample
+        self._loop = loop
+        self._ends = self._now() + sample.duration
+
+    def stop(self):
+        self._sample = None
+        self._loop = False
+
+    @property
+    def playing(self):
+        if self._sample is None:
+            return False
+        if self._loop or self._now() < self._ends:
+            return True
+        self._sample = None
+        return False
+
+    def pause(self):
+        pass
+
+    def resume(self):
+        pass
+
+    @property
+    def paused(self):
+        return False
+
+    def deinit(self):
+        self.stop()
+        _claimed.discard(self._pin)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
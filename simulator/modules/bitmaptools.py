@@ -0,0 +1,75 @@
+"""Simulated ``bitmaptools``: the C helpers for filling bitmaps in bulk."""
+
+import array
+
+from simulator import runtime
+
+
+def arrayblit(bitmap, data, x1=0, y1=0, x2=-1, y2=-1, skip_index=None):
+    """Copy ``data``, one value per pixel, row by row into a rectangle of ``bitmap``."""
+    x2 = bitmap.width if x2 < 0 else x2
+    y2 = bitmap.height if y2 < 0 else y2
+    width = x2 - x1
+    if len(data) < width * (y2 - y1):
+        raise ValueError("data is too short for the rectangle")
+    pixels = bitmap._data  # pylint: disable=protected-access
+    i = 0
+    for y in range(y1, y2):
+        base = y * bitmap.width
+        for x in range(x1, x2):
+            value = data[i]
+            i += 1
+            if value != skip_index:
+                pixels[base + x] = value
+    for user in bitmap._users:  # pylint: disable=protected-access
+        user._mark_dirty(width * (y2 - y1))  # pylint: disable=protected-access
+    sim = runtime.current()
+    sim.count("bitmap_blits")
+    sim.clock.advance(width * (y2 - y1) * sim.costs.blit_pixel)
+
+
+def fill_region(dest_bitmap, x1, y1, x2, y2, value):
+    """Set every pixel of the rectangle ``x1 <= x < x2``, ``y1 <= y < y2`` to ``value``."""
+    x1, x2 = max(0, min(x1, x2)), min(dest_bitmap.width, max(x1, x2))
+    y1, y2 = max(0, min(y1, y2)), min(dest_bitmap.height, max(y1, y2))
+    pixels = dest_bitmap._data  # pylint: disable=protected-access
+    for y in range(y1, y2):
+        base = y * dest_bitmap.width
+        pixels[base + x1:base + x2] = array.array(pixels.typecode, [value]) * (x2 - x1)
+    area = max(0, x2 - x1) * max(0, y2 - y1)
+    for user in dest_bitmap._users:  # pylint: disable=protected-access
+        user._mark_dirty(area)  # pylint: disable=protected-access
+    sim = runtime.current()
+    sim.count("bitmap_fills")
+    sim.clock.advance(area * sim.costs.blit_pixel)
+
+
+def draw_line(dest_bitmap, x1, y1, x2, y2, value):
+    """Set every pixel on the line from ``(x1, y1)`` to ``(x2, y2)``, both ends included."""
+    dx = abs(x2 - x1)
+    dy = -abs(y2 - y1)
+    step_x = 1 if x1 < x2 else -1
+    step_y = 1 if y1 < y2 else -1
+    error = dx + dy
+    width = dest_bitmap.width
+    height = dest_bitmap.height
+    pixels = dest_bitmap._data  # pylint: disable=protected-access
+    drawn = 0
+    while True:
+        if 0 <= x1 < width and 0 <= y1 < height:
+            pixels[y1 * width + x1] = value
+            drawn += 1
+        if x1 == x2 and y1 == y2:
+            break
+        double = 2 * error
+        if double >= dy:
+            error += dy
+            x1 += step_x
+        if double <= dx:
+            error += dx
+            y1 += step_y
+    for user in dest_bitmap._users:  # pylint: disable=protected-access
+        user._mark_dirty(drawn)  # pylint: disable=protected-access
+    sim = runtime.current()
+    sim.count("bitmap_lines")
+    sim.clock.advance(drawn * sim.costs.blit_pixel)
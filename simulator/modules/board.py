@@ -0,0 +1,26 @@
+"""Simulated ``board`` for the Adafruit PyPortal."""
+
+from simulator import runtime
+
+
+class Pin:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "board." + self.name
+
+
+board_id = "pyportal"
+
+for _name in ("SCL", "SDA", "LIGHT", "NEOPIXEL", "TOUCH_XL", "TOUCH_XR", "TOUCH_YD", "TOUCH_YU",
+              "SPEAKER_ENABLE", "AUDIO_OUT", "SD_CS", "SD_CARD_DETECT", "SCK", "MOSI", "MISO",
+              "ESP_CS", "ESP_BUSY", "ESP_RESET", "ESP_GPIO0", "D3", "D4", "A0", "A1", "L"):
+    globals()[_name] = Pin(_name)
+
+DISPLAY = runtime.current().display
+
+
+def I2C():  # pylint: disable=invalid-name
+    import busio  # pylint: disable=import-outside-toplevel
+    return busio.I2C(SCL, SDA)
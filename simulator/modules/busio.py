@@ -0,0 +1,65 @@
+"""Simulated ``busio``; I2C goes to the simulator's shared bus."""
+
+from simulator import runtime
+
+
+class I2C:
+    """Handle onto the simulated I2C bus."""
+
+    def __init__(self, scl, sda, *, frequency=100000, timeout=255):
+        self._bus = runtime.current().bus
+        self._bus.frequency = frequency
+
+    def try_lock(self):
+        if self._bus.locked:
+            return False
+        self._bus.locked = True
+        return True
+
+    def unlock(self):
+        self._bus.locked = False
+
+    def scan(self):
+        return self._bus.scan()
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        self._bus.writeto(address, buffer, start, end)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        self._bus.readfrom_into(address, buffer, start, end)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *, out_start=0, out_end=None,
+                              in_start=0, in_end=None):
+        self._bus.writeto_then_readfrom(address, buffer_out, buffer_in,
+                                        out_start, out_end, in_start, in_end)
+
+    def deinit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
+
+
+class SPI:
+    """Placeholder SPI bus; no simulated SPI peripherals are attached."""
+
+    def __init__(self, clock, MOSI=None, MISO=None):  # pylint: disable=invalid-name
+        self._locked = False
+
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        self._locked = False
+
+    def configure(self, **kwargs):
+        pass
+
+    def deinit(self):
+        pass
@@ -0,0 +1,602 @@
+"""Headless ``displayio`` for the simulator.
+
+Every mutation of a visible object adds its area to the display's pending
+refresh cost, so auto or explicit refreshes charge a realistic amount of time.
+Pixels are only composited into ``Display.framebuffer`` when the simulator was
+started with ``render=True`` or a snapshot is requested.
+"""
+
+import array
+import struct
+
+from simulator import runtime
+
+CIRCUITPYTHON_TERMINAL = None
+
+
+def _sim():
+    return runtime.current()
+
+
+def _display():
+    return _sim().display
+
+
+def _dirty(cost):
+    display = _display()
+    if display is not None and cost:
+        display._pending += cost
+
+
+def release_displays():
+    pass
+
+
+class Colorspace:
+    RGB888 = "RGB888"
+    RGB565 = "RGB565"
+    RGB565_SWAPPED = "RGB565_SWAPPED"
+    L8 = "L8"
+
+
+class Palette:
+    """Indexed colour table; recolouring dirties every TileGrid using it."""
+
+    def __init__(self, color_count, *, dither=False):
+        self._colors = [0] * color_count
+        self._transparent = [False] * color_count
+        self._users = []
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __getitem__(self, index):
+        return self._colors[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(value, (tuple, list, bytes, bytearray)):
+            value = (value[0] << 16) | (value[1] << 8) | value[2]
+        if self._colors[index] == value:
+            return
+        self._colors[index] = value
+        for user in self._users:
+            user._mark_dirty()
+
+    def make_transparent(self, index):
+        self._transparent[index] = True
+
+    def make_opaque(self, index):
+        self._transparent[index] = False
+
+    def is_transparent(self, index):
+        return self._transparent[index]
+
+    def _color(self, value):
+        if value >= len(self._colors) or self._transparent[value]:
+            return None
+        return self._colors[value]
+
+
+class ColorConverter:
+    """Converts raw RGB888 pixel values; transparency is a single colour."""
+
+    def __init__(self, *, input_colorspace=Colorspace.RGB888, dither=False):
+        self.input_colorspace = input_colorspace
+        self.dither = dither
+        self._transparent = None
+        self._users = []
+
+    def convert(self, color):
+        return color
+
+    def make_transparent(self, color):
+        self._transparent = color
+
+    def make_opaque(self, color):
+        self._transparent = None
+
+    def _color(self, value):
+        if self._transparent is not None and value == self._transparent:
+            return None
+        return value
+
+
+class Bitmap:
+    """In-memory bitmap with up to 65536 colours per pixel."""
+
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        self._value_count = value_count
+        self._data = array.array("B" if value_count <= 256 else "H", bytes(width * height * (1 if value_count <= 256 else 2)))
+        self._users = []
+
+    def _index(self, key):
+        if isinstance(key, tuple):
+            x, y = key
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                raise IndexError("pixel out of bounds")
+            return y * self.width + x
+        return key
+
+    def __getitem__(self, key):
+        return self._data[self._index(key)]
+
+    def __setitem__(self, key, value):
+        index = self._index(key)
+        if self._data[index] != value:
+            self._data[index] = value
+            for user in self._users:
+                user._mark_dirty(1)
+
+    def fill(self, value):
+        for i in range(len(self._data)):
+            self._data[i] = value
+        for user in self._users:
+            user._mark_dirty()
+
+    def blit(self, x, y, source_bitmap, *, x1=0, y1=0, x2=None, y2=None, skip_index=None):
+        x2 = source_bitmap.width if x2 is None else x2
+        y2 = source_bitmap.height if y2 is None else y2
+        for sy in range(y1, y2):
+            for sx in range(x1, x2):
+                value = source_bitmap[sx, sy]
+                if value != skip_index:
+                    tx, ty = x + sx - x1, y + sy - y1
+                    if 0 <= tx < self.width and 0 <= ty < self.height:
+                        self._data[ty * self.width + tx] = value
+        for user in self._users:
+            user._mark_dirty()
+
+    def _pixel(self, x, y):
+        return self._data[y * self.width + x]
+
+
+class OnDiskBitmap:
+    """BMP read from the filesystem; pixels stay on flash.
+
+    Accepts an open binary file (CircuitPython 6) or a path (7+).  As on the
+    device, the file must remain open for as long as the bitmap is shown.
+    """
+
+    def __init__(self, file):
+        if isinstance(file, str):
+            file = open(file, "rb")  # pylint: disable=consider-using-with
+        self._file = file
+        file.seek(0)
+        header = file.read(54)
+        if header[:2] != b"BM":
+            raise ValueError("Invalid BMP file")
+        self._offset = struct.unpack_from("<I", header, 10)[0]
+        width, height, _, bpp = struct.unpack_from("<iiHH", header, 18)
+        compression, _, _, _, colors = struct.unpack_from("<IIiiI", header, 30)
+        self.width = width
+        self._bottom_up = height > 0
+        self.height = abs(height)
+        self._bpp = bpp
+        self._stride = ((width * bpp + 31) // 32) * 4
+        self._users = []
+        if bpp <= 8:
+            colors = colors or (1 << bpp)
+            table = file.read(colors * 4)
+            self._pixel_shader = Palette(colors)
+            for i in range(colors):
+                b, g, r = table[i * 4], table[i * 4 + 1], table[i * 4 + 2]
+                self._pixel_shader[i] = (r << 16) | (g << 8) | b
+        else:
+            self._pixel_shader = ColorConverter(
+                input_colorspace=Colorspace.RGB565 if bpp == 16 else Colorspace.RGB888)
+        self._rows = None
+
+    @property
+    def pixel_shader(self):
+        return self._pixel_shader
+
+    def _load(self):
+        handle = getattr(self._file, "_handle", self._file)
+        handle.seek(self._offset)
+        data = handle.read(self._stride * self.height)
+        self._rows = data
+
+    def __getitem__(self, key):
+        return self._pixel(*key)
+
+    def _pixel(self, x, y):
+        if self._rows is None:
+            self._load()
+        row = self.height - 1 - y if self._bottom_up else y
+        base = row * self._stride
+        if self._bpp == 24 or self._bpp == 32:
+            step = self._bpp // 8
+            b, g, r = self._rows[base + x * step: base + x * step + 3]
+            return (r << 16) | (g << 8) | b
+        if self._bpp == 16:
+            value = self._rows[base + 2 * x] | (self._rows[base + 2 * x + 1] << 8)
+            r, g, b = (value >> 10) & 0x1F, (value >> 5) & 0x1F, value & 0x1F
+            return (r << 19) | (g << 11) | (b << 3)
+        bit = x * self._bpp
+        byte = self._rows[base + bit // 8]
+        shift = 8 - self._bpp - bit % 8
+        return (byte >> shift) & ((1 << self._bpp) - 1)
+
+
+class _Layer:
+    """Position/visibility shared by Group and TileGrid."""
+
+    def __init__(self, x, y):
+        self._x = x
+        self._y = y
+        self._hidden = False
+        self._parent = None
+
+    def _set_position(self, name, value):
+        if getattr(self, name) != value:
+            self._mark_dirty()
+            setattr(self, name, value)
+            self._mark_dirty()
+
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        self._set_position("_x", value)
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        self._set_position("_y", value)
+
+    @property
+    def hidden(self):
+        return self._hidden
+
+    @hidden.setter
+    def hidden(self, value):
+        value = bool(value)
+        if value != self._hidden:
+            self._hidden = value
+            self._mark_dirty(force=True)
+
+    def _shown(self):
+        node = self
+        display = _display()
+        root = display.root_group if display is not None else None
+        while node is not None:
+            if node._hidden:
+                return False
+            if node is root:
+                return True
+            node = node._parent
+        return False
+
+    def _scale(self):
+        scale = 1
+        node = self._parent
+        while node is not None:
+            scale *= node.scale
+            node = node._parent
+        return scale
+
+    def _mark_dirty(self, pixels=None, force=False):
+        if not (force or self._shown()):
+            return
+        _dirty(self._cost(pixels))
+
+
+class Group(_Layer):
+    """List of layers drawn in order at an offset and integer scale."""
+
+    def __init__(self, *, x=0, y=0, scale=1, max_size=None):
+        super().__init__(x, y)
+        self._scale_factor = scale
+        self._children = []
+
+    @property
+    def scale(self):
+        return self._scale_factor
+
+    @scale.setter
+    def scale(self, value):
+        if value != self._scale_factor:
+            self._mark_dirty()
+            self._scale_factor = value
+            self._mark_dirty()
+
+    def _adopt(self, layer):
+        if not isinstance(layer, _Layer):
+            raise TypeError("Layer must be a Group or TileGrid subclass")
+        if layer._parent is not None:
+            raise ValueError("Layer already in a group.")
+        layer._parent = self
+        _sim().count("group_ops")
+        layer._mark_dirty()
+
+    def append(self, layer):
+        self._adopt(layer)
+        self._children.append(layer)
+
+    def insert(self, index, layer):
+        self._adopt(layer)
+        self._children.insert(index, layer)
+
+    def index(self, layer):
+        return self._children.index(layer)
+
+    def remove(self, layer):
+        index = self._children.index(layer)  # ValueError when absent, as on device
+        self.pop(index)
+
+    def pop(self, i=-1):
+        layer = self._children[i]
+        layer._mark_dirty()
+        del self._children[i]
+        layer._parent = None
+        _sim().count("group_ops")
+        return layer
+
+    def sort(self, key=None, reverse=False):
+        self._children.sort(key=key, reverse=reverse)
+        self._mark_dirty()
+
+    def __len__(self):
+        return len(self._children)
+
+    def __getitem__(self, index):
+        return self._children[index]
+
+    def __setitem__(self, index, layer):
+        old = self._children[index]
+        old._mark_dirty()
+        old._parent = None
+        layer._parent = None
+        self._adopt(layer)
+        self._children[index] = layer
+
+    def __delitem__(self, index):
+        self.pop(index)
+
+    def __contains__(self, layer):
+        return layer in self._children
+
+    def __iter__(self):
+        return iter(self._children)
+
+    def _cost(self, pixels=None):
+        scale = self._scale() * self._scale_factor
+        return sum(child._subtree_cost(scale) for child in self._children)
+
+    def _subtree_cost(self, scale):
+        if self._hidden:
+            return 0
+        scale *= self._scale_factor
+        return sum(child._subtree_cost(scale) for child in self._children)
+
+    def _render(self, frame, ox, oy, scale):
+        if self._hidden:
+            return
+        ox += self._x * scale
+        oy += self._y * scale
+        scale *= self._scale_factor
+        for child in self._children:
+            child._render(frame, ox, oy, scale)
+
+
+class TileGrid(_Layer):
+    """Grid of tiles taken from one bitmap."""
+
+    def __init__(self, bitmap, *, pixel_shader, width=1, height=1, tile_width=None,
+                 tile_height=None, default_tile=0, x=0, y=0):
+        super().__init__(x, y)
+        self._bitmap = bitmap
+        self._pixel_shader = pixel_shader
+        self.width = width
+        self.height = height
+        self.tile_width = tile_width or bitmap.width
+        self.tile_height = tile_height or bitmap.height
+        self._tiles = bytearray([default_tile]) * (width * height)
+        self.flip_x = False
+        self.flip_y = False
+        self.transpose_xy = False
+        bitmap._users.append(self)
+        pixel_shader._users.append(self)
+        _sim().count("tilegrids_created")
+
+    @property
+    def bitmap(self):
+        return self._bitmap
+
+    @bitmap.setter
+    def bitmap(self, value):
+        self._bitmap._users.remove(self)
+        self._bitmap = value
+        value._users.append(self)
+        self._mark_dirty()
+
+    @property
+    def pixel_shader(self):
+        return self._pixel_shader
+
+    @pixel_shader.setter
+    def pixel_shader(self, value):
+        self._pixel_shader._users.remove(self)
+        self._pixel_shader = value
+        value._users.append(self)
+        self._mark_dirty()
+
+    def _tile_index(self, key):
+        if isinstance(key, tuple):
+            return key[1] * self.width + key[0]
+        return key
+
+    def __getitem__(self, key):
+        return self._tiles[self._tile_index(key)]
+
+    def __setitem__(self, key, value):
+        index = self._tile_index(key)
+        _sim().count("tile_writes")
+        if self._tiles[index] != value:
+            self._tiles[index] = value
+            self._mark_dirty(self.tile_width * self.tile_height)
+
+    def _pixel_cost(self):
+        costs = _sim().costs
+        per_pixel = costs.refresh_pixel
+        if isinstance(self._bitmap, OnDiskBitmap):
+            per_pixel += costs.ondisk_pixel
+        if isinstance(self._pixel_shader, ColorConverter):
+            per_pixel += costs.convert_pixel
+        return per_pixel
+
+    def _cost(self, pixels=None):
+        if pixels is None:
+            return self._subtree_cost(self._scale())
+        scale = self._scale()
+        return pixels * scale * scale * self._pixel_cost()
+
+    def _subtree_cost(self, scale):
+        if self._hidden:
+            return 0
+        area = self.width * self.tile_width * self.height * self.tile_height * scale * scale
+        return area * self._pixel_cost()
+
+    def _render(self, frame, ox, oy, scale):
+        if self._hidden:
+            return
+        ox += self._x * scale
+        oy += self._y * scale
+        tiles_across = max(1, self._bitmap.width // self.tile_width)
+        shader = self._pixel_shader
+        for ty in range(self.height):
+            for tx in range(self.width):
+                tile = self._tiles[ty * self.width + tx]
+                sx0 = (tile % tiles_across) * self.tile_width
+                sy0 = (tile // tiles_across) * self.tile_height
+                for py in range(self.tile_height):
+                    for px in range(self.tile_width):
+                        sx = self.tile_width - 1 - px if self.flip_x else px
+                        sy = self.tile_height - 1 - py if self.flip_y else py
+                        color = shader._color(self._bitmap._pixel(sx0 + sx, sy0 + sy))
+                        if color is None:
+                            continue
+                        frame.fill_rect(ox + (tx * self.tile_width + px) * scale,
+                                        oy + (ty * self.tile_height + py) * scale,
+                                        scale, color)
+
+
+class _Frame:
+    """RGB888 framebuffer."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height * 3)
+
+    def fill_rect(self, x, y, size, color):
+        r, g, b = (color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF
+        for yy in range(max(0, y), min(self.height, y + size)):
+            for xx in range(max(0, x), min(self.width, x + size)):
+                i = (yy * self.width + xx) * 3
+                self.pixels[i] = r
+                self.pixels[i + 1] = g
+                self.pixels[i + 2] = b
+
+
+class Display:
+    """The PyPortal's ILI9341 as seen by app code (``board.DISPLAY``)."""
+
+    def __init__(self, *, width=320, height=240, auto_refresh=True, rotation=0):
+        self.width = width
+        self.height = height
+        self.rotation = rotation
+        self.auto_refresh = auto_refresh
+        self.auto_brightness = False
+        self.brightness = 1.0
+        self.root_group = None
+        self.framebuffer = _Frame(width, height)
+        self.refreshes = 0
+        self.auto_refreshes = 0
+        self.skipped_refreshes = 0
+        self.refresh_time = 0.0
+        self._pending = 0.0
+        self._next_auto = 0.0
+        self._last_refresh = None
+
+    def _full_cost(self):
+        costs = _sim().costs
+        return self.width * self.height * (costs.refresh_pixel + costs.ondisk_pixel + costs.convert_pixel)
+
+    def _set_root(self, group):
+        if group is self.root_group:
+            return
+        if group is not None and group._parent is not None:
+            raise ValueError("Group already used")
+        self.root_group = group
+        self._pending = self._full_cost()
+
+    def show(self, group):
+        """Make ``group`` the root; counts as a frame boundary for the simulator."""
+        self._set_root(group)
+        _sim().frame()
+
+    def _draw(self):
+        cost = min(self._pending, self._full_cost())
+        self._pending = 0.0
+        self.refreshes += 1
+        self.refresh_time += cost
+        if _sim().render:
+            self.render()
+        _sim().clock.advance(cost)
+
+    def refresh(self, *, target_frames_per_second=None, minimum_frames_per_second=0):
+        """Explicit refresh; returns False if skipped to hold the target rate."""
+        now = _sim().clock.now
+        if target_frames_per_second and self._last_refresh is not None:
+            due = self._last_refresh + 1.0 / target_frames_per_second
+            if now < due:
+                _sim().clock.sleep(due - now)  # waiting, not working
+        self._last_refresh = _sim().clock.now
+        self._draw()
+        _sim().frame()
+        return True
+
+    def _background(self, now):
+        if self.auto_refresh and self._pending and now >= self._next_auto:
+            self.auto_refreshes += 1
+            self._next_auto = now + 1.0 / 60
+            self._draw()
+
+    def render(self):
+        """Composite the current root group into ``framebuffer``."""
+        frame = self.framebuffer
+        frame.pixels[:] = bytes(len(frame.pixels))
+        if self.root_group is not None:
+            self.root_group._render(frame, 0, 0, 1)
+        return frame
+
+    def save_png(self, path):
+        """Render and write the framebuffer as a PNG file."""
+        import zlib  # pylint: disable=import-outside-toplevel
+        frame = self.render()
+        raw = b"".join(b"\x00" + bytes(frame.pixels[y * frame.width * 3:(y + 1) * frame.width * 3])
+                       for y in range(frame.height))
+
+        def chunk(kind, data):
+            body = kind + data
+            return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+        header = struct.pack(">IIBBBBB", frame.width, frame.height, 8, 2, 0, 0, 0)
+        with open(path, "wb") as out:
+            out.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+                      + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+    def stats(self):
+        return {
+            "refreshes": self.refreshes,
+            "auto_refreshes": self.auto_refreshes,
+            "refresh_ms": round(self.refresh_time * 1000, 3),
+        }
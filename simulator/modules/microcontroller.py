@@ -0,0 +1,19 @@
+"""Simulated ``microcontroller``."""
+
+from simulator import runtime
+
+
+class _Processor:
+    frequency = 120000000
+
+    @property
+    def temperature(self):
+        sim = runtime.current()
+        return sim.env.cpu_temperature(sim.clock.now)
+
+
+cpu = _Processor()
+
+
+def reset():
+    raise SystemExit("microcontroller.reset()")
@@ -0,0 +1,45 @@
+"""Simulated ``neopixel``."""
+
+from simulator import runtime
+
+RGB = "RGB"
+GRB = "GRB"
+RGBW = "RGBW"
+GRBW = "GRBW"
+
+
+class NeoPixel:
+    """A strand of ``n`` pixels; ``show`` charges the WS2812 write time."""
+
+    def __init__(self, pin, n, *, bpp=3, brightness=1.0, auto_write=True, pixel_order=None):
+        self._pixels = [(0, 0, 0)] * n
+        self.brightness = brightness
+        self.auto_write = auto_write
+
+    def __len__(self):
+        return len(self._pixels)
+
+    def __getitem__(self, index):
+        return self._pixels[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(value, int):
+            value = ((value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+        self._pixels[index] = tuple(value)
+        if self.auto_write:
+            self.show()
+
+    def fill(self, color):
+        auto_write, self.auto_write = self.auto_write, False
+        for i in range(len(self._pixels)):
+            self[i] = color
+        self.auto_write = auto_write
+        if auto_write:
+            self.show()
+
+    def show(self):
+        sim = runtime.current()
+        sim.clock.advance(sim.costs.neopixel_write)
+
+    def deinit(self):
+        pass
@@ -0,0 +1,11 @@
+"""Simulated ``secrets.py``: network settings given with ``--vitals``.
+
+Without them the import fails, as on a device with no ``secrets.py``.
+"""
+
+from simulator import runtime
+
+if runtime.current().secrets is None:
+    raise ImportError("no secrets.py")
+
+secrets = dict(runtime.current().secrets)
@@ -0,0 +1,137 @@
+"""Simulated ESP32 WiFi co-processor, speaking to real servers on the host.
+
+The app talks to the PyPortal's ESP32 through ``adafruit_esp32spi``'s
+``ESP_SPIcontrol``; this model answers the same socket calls with host TCP
+sockets, so ``tools/vitals_server.py`` on localhost can play the base
+station.  Every call charges one SPI command to the virtual clock, plus
+per-byte transfer time, and opening a connection charges the time the real
+co-processor spends connecting before it answers.
+
+Host networking runs in real time and the app in virtual time, so an answer
+only becomes visible ``net_rtt`` virtual seconds after its request was sent.
+At that point the model waits (in real time) up to ``REAL_WAIT`` for the
+host server to have answered, once per request; a server slower than that
+looks like one that has stalled.
+"""
+
+import select
+import socket
+
+WL_IDLE_STATUS = 0
+WL_CONNECTED = 3
+SOCKET_CLOSED = 0
+SOCKET_ESTABLISHED = 4
+MAX_SOCKETS = 4
+REAL_WAIT = 0.5
+
+
+class _Socket:
+    def __init__(self, host_socket):
+        self.host = host_socket
+        self.ready_at = None  # virtual time an answer may be seen
+        self.waited = False
+        self.closed = False
+
+
+class ESP32:
+    """The ``ESP_SPIcontrol`` calls ``wrist.vitals`` makes."""
+
+    def __init__(self, clock, costs):
+        self._clock = clock
+        self._costs = costs
+        self._joined_at = None
+        self._sockets = {}
+        self.commands = 0
+        self.connections = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def _command(self, nbytes=0, extra=0.0):
+        self.commands += 1
+        self._clock.advance(self._costs.esp_command + nbytes * self._costs.esp_byte + extra)
+
+    @property
+    def status(self):
+        self._command()
+        if self._joined_at is not None and self._clock.now >= self._joined_at:
+            return WL_CONNECTED
+        return WL_IDLE_STATUS
+
+    def wifi_set_passphrase(self, ssid, passphrase):
+        self._command(len(ssid) + len(passphrase))
+        self._joined_at = self._clock.now + self._costs.wifi_join
+
+    def get_socket(self):
+        self._command()
+        for number in range(MAX_SOCKETS):
+            if number not in self._sockets:
+                return number
+        raise RuntimeError("No sockets available")
+
+    def socket_open(self, socket_num, dest, port, conn_mode=0):
+        self._command(len(dest) + 2, self._costs.esp_connect)
+        host_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        host_socket.settimeout(REAL_WAIT)
+        entry = _Socket(host_socket)
+        self._sockets[socket_num] = entry
+        try:
+            host_socket.connect((dest if isinstance(dest, str) else dest.decode(), port))
+        except OSError:
+            entry.closed = True
+            return
+        self.connections += 1
+
+    def socket_status(self, socket_num):
+        self._command()
+        entry = self._sockets.get(socket_num)
+        if entry is None or entry.closed:
+            return SOCKET_CLOSED
+        if entry.ready_at is None or self._clock.now >= entry.ready_at:
+            try:
+                readable = select.select([entry.host], [], [], 0)[0]
+                if readable and not entry.host.recv(1, socket.MSG_PEEK):
+                    entry.closed = True  # the server hung up
+                    return SOCKET_CLOSED
+            except OSError:
+                entry.closed = True
+                return SOCKET_CLOSED
+        return SOCKET_ESTABLISHED
+
+    def socket_write(self, socket_num, buffer, conn_mode=0):
+        self._command(len(buffer))
+        entry = self._sockets[socket_num]
+        entry.host.sendall(bytes(buffer))
+        entry.ready_at = self._clock.now + self._costs.net_rtt
+        entry.waited = False
+        self.bytes_sent += len(buffer)
+
+    def socket_available(self, socket_num):
+        self._command()
+        entry = self._sockets.get(socket_num)
+        if entry is None or entry.closed or entry.ready_at is None or self._clock.now < entry.ready_at:
+            return 0
+        wait = 0 if entry.waited else REAL_WAIT
+        entry.waited = True
+        try:
+            if not select.select([entry.host], [], [], wait)[0]:
+                return 0
+            return len(entry.host.recv(4096, socket.MSG_PEEK))
+        except OSError:
+            return 0
+
+    def socket_read(self, socket_num, size):
+        entry = self._sockets[socket_num]
+        data = entry.host.recv(size)
+        self._command(len(data))
+        self.bytes_received += len(data)
+        return data
+
+    def socket_close(self, socket_num):
+        self._command()
+        entry = self._sockets.pop(socket_num, None)
+        if entry is not None:
+            entry.host.close()
+
+    def stats(self):
+        return {"commands": self.commands, "connections": self.connections,
+                "bytes_sent": self.bytes_sent, "bytes_received": self.bytes_received}
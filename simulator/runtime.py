@@ -0,0 +1,435 @@
+"""The simulator harness: wires the virtual hardware together and runs code.py."""
+
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+from simulator.clock import VirtualClock, _real_perf_counter
+from simulator.devices import ADT7410, DS3231, SI7021, LSM9DS1AccelGyro, LSM9DS1Mag, Environment, Motion
+from simulator.fs import DeviceFS
+from simulator.i2c import I2CBus
+from simulator.network import ESP32
+
+MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# counters of changes to the display tree: groups swapped, buttons restyled
+DISPLAY_CHANGES = ("group_ops", "button_restyles")
+
+_current = None
+
+
+def _depth(frame):
+    depth = 0
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+def current():
+    """Return the :class:`Simulator` that is currently installed."""
+    if _current is None:
+        raise RuntimeError("No simulator is running; start code.py through `python -m simulator`")
+    return _current
+
+
+class SimulationComplete(BaseException):
+    """Raised from inside the app to end a run.
+
+    Derives from BaseException so ``except Exception`` blocks in app code do
+    not swallow it.
+    """
+
+
+class Costs:
+    """Modelled on-device cost, in seconds, of operations that do not go
+    through the I2C bus or the filesystem.  Estimates for a PyPortal (SAMD51 at
+    120MHz, ILI9341 on an 8-bit parallel bus); override per run as needed.
+    """
+
+    def __init__(self, **overrides):
+        self.adc_read = 0.00003
+        self.touch_idle = 0.0003
+        self.touch_sample = 0.0012
+        self.label_write = 0.0012
+        self.label_glyph = 0.0004
+        self.glyph_parse = 0.0015
+        self.bdf_line = 0.00008
+        self.refresh_pixel = 0.00000035
+        self.ondisk_pixel = 0.0000006
+        self.convert_pixel = 0.0000002
+        self.pyportal_init = 0.9
+        self.neopixel_write = 0.00005
+        self.shape_create = 0.0004
+        self.shape_pixel = 0.00002
+        self.blit_pixel = 0.00000005
+        self.esp_command = 0.0004
+        self.esp_byte = 0.000002
+        self.esp_connect = 0.05
+        self.net_rtt = 0.04
+        self.wifi_join = 2.5
+        self.gc_collect = 0.006
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise AttributeError("Unknown cost " + name)
+            setattr(self, name, value)
+
+
+class TouchScript:
+    """Scripted touches: each is ``{"at": s, "x": px, "y": px, "hold": s}``.
+
+    A touch with ``"to": [x, y]`` is a drag: the finger moves in a straight
+    line from ``x, y`` to there over the hold time.
+    """
+
+    def __init__(self, touches=()):
+        self.touches = sorted(touches, key=lambda t: t["at"])
+
+    def point(self, now):
+        for touch in self.touches:
+            hold = touch.get("hold", 0.15)
+            if touch["at"] <= now < touch["at"] + hold:
+                x, y = touch["x"], touch["y"]
+                if "to" in touch:
+                    done = (now - touch["at"]) / hold
+                    x = int(x + (touch["to"][0] - x) * done)
+                    y = int(y + (touch["to"][1] - y) * done)
+                return (x, y, touch.get("pressure", 30000))
+            if touch["at"] > now:
+                break
+        return None
+
+
+def _summary(values):
+    if not values:
+        return {"mean": 0, "p50": 0, "p95": 0, "max": 0}
+    ordered = sorted(values)
+    return {
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "p50": round(ordered[len(ordered) // 2], 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+class Simulator:
+    """A virtual PyPortal wrist unit.
+
+    :param str root: Directory standing in for the CIRCUITPY drive.
+    :param list touches: Scripted touches, see :class:`TouchScript`.
+    :param Costs costs: Latency model for non-bus operations.
+    :param bool trace_memory: Track Python heap use with ``tracemalloc``.
+    :param float cpu_scale: Fold host CPU time into simulated time.
+    :param str sd_dir: Host directory mounted as the SD card at ``/sd``;
+        None runs with no card inserted.
+    :param motion: Function of time giving the IMU's ``(accel, gyro, mag)``,
+        such as one of ``devices.MOTIONS``; None holds the wrist still.
+    :param str vitals_url: Base station URL handed to the app in
+        ``secrets.py``, with the WiFi network it joins through the
+        simulated ESP32; None leaves the app without network settings.
+    :param int heap_size: Size of the modelled device heap, in host bytes.
+
+    The heap is modelled the way CircuitPython's works, where nothing is
+    freed until a collection: ``gc.mem_alloc()`` only grows as the app
+    allocates, and once it passes ``heap_size`` a collection runs, costing
+    ``Costs.gc_collect``, and drops it back to the live data.  CPython frees
+    most objects at once, so allocations are seen through ``tracemalloc``'s
+    peak between clock ticks; that is a lower bound, but it is exact about
+    code that allocates nothing.  Without ``trace_memory`` the heap never
+    grows.
+    """
+
+    def __init__(self, root=REPO_ROOT, touches=(), costs=None, trace_memory=True,
+                 cpu_scale=0.0, rtc_start=None, rtc_drift_ppm=0.0, heap_size=4 * 1024 * 1024,
+                 render=False, sd_dir=None, motion=None, vitals_url=None):
+        self.root = os.path.abspath(root)
+        self.clock = VirtualClock(cpu_scale=cpu_scale)
+        self.costs = costs or Costs()
+        self.env = Environment()
+        self.motion = Motion(motion)
+        self.touch = TouchScript(touches)
+        self.bus = I2CBus(self.clock)
+        self.bus.add(ADT7410(self.env))
+        self.bus.add(SI7021(self.env))
+        self.bus.add(DS3231(start=rtc_start, drift_ppm=rtc_drift_ppm))
+        self.bus.add(LSM9DS1AccelGyro(self.motion))
+        self.bus.add(LSM9DS1Mag(self.motion))
+        self.esp = ESP32(self.clock, self.costs)
+        self.secrets = None
+        if vitals_url is not None:
+            self.secrets = {"ssid": "simulator", "password": "simulator", "vitals_url": vitals_url}
+        self.fs = DeviceFS(self.clock, self.root)
+        if sd_dir is not None:
+            self.fs.mount("/sd", sd_dir)
+        self.trace_memory = trace_memory
+        self.heap_size = heap_size
+        self.render = render
+        self.counters = {}
+        self.frames = []
+        self.display = None
+        self.boot = None
+        self.max_frames = None
+        self.max_seconds = None
+        self.peak_memory = 0
+        self._start = None
+        self._mark = None
+        self._gc_collections = 0
+        self._heap_used = 0
+        self._heap_mark = 0
+        self._heap_allocated = 0
+        self._heap_boot = 0  # allocated by the end of boot, compiling imports included
+        self._heap_live = 0
+        self._saved_path = None
+        self._saved_gc = None
+        self._next_touch = 0
+        self._responses = []  # [touch, display changes it caused, seconds to respond or None]
+        self._touch_reader = None  # (code, stack depth) of the call that last read the touchscreen
+
+    # -- hooks used by the shim modules ---------------------------------
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+        if name in DISPLAY_CHANGES and self._touch_reader is not None and self._responses:
+            self._heap_update()
+            if self._from_touch_reader():
+                self._responses[-1][1] += n
+            self._heap_skip()
+
+    def touch_read(self):
+        """Called by the touchscreen shim: remember which call read it, so
+        changes that call goes on to make count as the touch's answer, be
+        they made on contact or, for a tap, on lifting."""
+        # the frame itself is not kept: holding it would make it outlive
+        # its call and copy its locals, allocating on the app's account
+        self._heap_update()
+        frame = sys._getframe(2)  # pylint: disable=protected-access
+        self._touch_reader = (frame.f_code, _depth(frame))
+        self._heap_skip()
+
+    def _from_touch_reader(self):
+        code, depth = self._touch_reader
+        frame = sys._getframe(2)  # pylint: disable=protected-access
+        above = _depth(frame) - depth
+        if above < 0:
+            return False
+        for _ in range(above):
+            frame = frame.f_back
+        return frame.f_code is code
+
+    def _snapshot(self):
+        return {
+            "virtual": self.clock.now,
+            "slept": self.clock.slept,
+            "host": _real_perf_counter(),
+            "i2c": self.bus.transactions,
+            "label_writes": self.counters.get("label_writes", 0),
+            "blocks": sys.getallocatedblocks(),
+            "gc": self._gc_collections,
+            "refreshes": self.display.refreshes if self.display else 0,
+        }
+
+    def frame(self):
+        """Called by the display shim at every explicit ``show``/``refresh``."""
+        self._heap_update()
+        snap = self._snapshot()
+        self._check_responses(snap["virtual"])
+        if self.boot is None:
+            self._heap_boot = self._heap_allocated
+            self.boot = {
+                "virtual_s": round(snap["virtual"], 4),
+                "host_s": round(snap["host"] - self._start["host"], 4),
+                "i2c_transactions": snap["i2c"],
+                "file_opens": self.fs.opens,
+                "label_writes": snap["label_writes"],
+            }
+        else:
+            prev = self._mark
+            self.frames.append({
+                "virtual_ms": (snap["virtual"] - prev["virtual"]) * 1000,
+                "busy_ms": (snap["virtual"] - prev["virtual"] - snap["slept"] + prev["slept"]) * 1000,
+                "host_ms": (snap["host"] - prev["host"]) * 1000,
+                "i2c": snap["i2c"] - prev["i2c"],
+                "label_writes": snap["label_writes"] - prev["label_writes"],
+                "alloc_blocks": snap["blocks"] - prev["blocks"],
+                "gc": snap["gc"] - prev["gc"],
+                "refreshes": snap["refreshes"] - prev["refreshes"],
+            })
+        self._mark = snap
+        self._heap_skip()
+        if self.max_frames is not None and len(self.frames) >= self.max_frames:
+            raise SimulationComplete()
+
+    def _on_tick(self, now):
+        self._heap_update()
+        self._watch_touches(now)
+        if self.display is not None:
+            self.display._background(now)
+        self._heap_skip()
+        if self.max_seconds is not None and now >= self.max_seconds:
+            raise SimulationComplete()
+
+    def _watch_touches(self, now):
+        touches = self.touch.touches
+        while self._next_touch < len(touches) and touches[self._next_touch]["at"] <= now:
+            self._responses.append([touches[self._next_touch], 0, None])
+            self._next_touch += 1
+
+    def _check_responses(self, now):
+        """A touch is answered by the first refresh after the display tree
+        changed in answer to it, which is when the new view or selection
+        reaches the screen.  Only changes made inside the call that read the
+        contact from the touchscreen count, so a clock or sparkline redrawn
+        meanwhile answers nothing."""
+        for response in self._responses:
+            if response[2] is None and response[1]:
+                response[2] = now - response[0]["at"]
+
+    def _heap_update(self):
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if peak > self._heap_mark:
+            self._heap_used += peak - self._heap_mark
+            self._heap_allocated += peak - self._heap_mark
+        self._heap_live = current
+        self._heap_skip()
+        if self._heap_used > self.heap_size:
+            self.collect()
+            self.clock.advance(self.costs.gc_collect)
+
+    def _heap_skip(self):
+        """Leave what was allocated since the last reading out of the model
+        heap, for the simulator's own bookkeeping."""
+        if not tracemalloc.is_tracing():
+            return
+        # reading the peak allocates, so reset it again once that is freed
+        tracemalloc.reset_peak()
+        self._heap_mark = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+
+    def collect(self):
+        """A collection: the model heap drops back to the live data."""
+        self._gc_collections += 1
+        self._heap_used = self._heap_live
+
+    def mem_alloc(self):
+        self._heap_update()
+        return self._heap_used
+
+    def mem_free(self):
+        return max(0, self.heap_size - self.mem_alloc())
+
+    def _gc_collect(self):
+        self._saved_gc[2]()
+        self._heap_update()
+        self.collect()
+        self.clock.advance(self.costs.gc_collect)
+
+    # -- lifecycle ------------------------------------------------------
+    def _purge_modules(self):
+        shims = set()
+        for entry in os.listdir(MODULES_DIR):
+            shims.add(entry[:-3] if entry.endswith(".py") else entry)
+        for name in list(sys.modules):
+            top = name.split(".", 1)[0]
+            if top in shims or top == "wrist":
+                del sys.modules[name]
+
+    def install(self):
+        global _current  # pylint: disable=global-statement
+        _current = self
+        self._saved_path = list(sys.path)
+        sys.path[:0] = [MODULES_DIR, self.root]
+        self._purge_modules()
+        self.clock.install()
+        self.clock.add_listener(self._on_tick)
+        self.fs.install()
+        self._saved_gc = (getattr(gc, "mem_free", None), getattr(gc, "mem_alloc", None), gc.collect)
+        gc.mem_free = self.mem_free
+        gc.mem_alloc = self.mem_alloc
+        gc.collect = self._gc_collect
+        if self.trace_memory:
+            tracemalloc.start()
+            self._heap_update()
+            self._heap_used = self._heap_live
+            self._heap_allocated = 0
+        import displayio  # pylint: disable=import-outside-toplevel
+        self.display = displayio.Display(width=320, height=240)
+
+    def uninstall(self):
+        global _current  # pylint: disable=global-statement
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        for name, func in zip(("mem_free", "mem_alloc", "collect"), self._saved_gc):
+            if func is None:
+                delattr(gc, name)
+            else:
+                setattr(gc, name, func)
+        DeviceFS.uninstall()
+        VirtualClock.uninstall()
+        self._purge_modules()
+        sys.path[:] = self._saved_path
+        _current = None
+
+    def run(self, script="code.py", frames=None, seconds=None):
+        """Boot ``script`` and run its main loop until a limit is reached.
+
+        :param int frames: Stop after this many frames following the first one.
+        :param float seconds: Stop once simulated time reaches this value.
+        :return: The run report, see :meth:`report`.
+        """
+        if frames is None and seconds is None:
+            raise ValueError("Give a frame or time limit, code.py never returns")
+        self.max_frames = frames
+        self.max_seconds = seconds
+        path = os.path.join(self.root, script)
+        with open(path) as source:
+            code = compile(source.read(), path, "exec")
+        self.install()
+        self._start = self._snapshot()
+        self._mark = self._start
+        try:
+            exec(code, {"__name__": "__main__", "__file__": path})  # pylint: disable=exec-used
+        except SimulationComplete:
+            pass
+        finally:
+            self.uninstall()
+        return self.report()
+
+    def report(self):
+        frames = self.frames
+        count = len(frames) or 1
+        latencies = [response[2] * 1000 for response in self._responses if response[2] is not None]
+        return {
+            "boot": self.boot,
+            "frames": {
+                "count": len(frames),
+                "virtual_ms": _summary([f["virtual_ms"] for f in frames]),
+                "busy_ms": _summary([f["busy_ms"] for f in frames]),
+                "host_ms": _summary([f["host_ms"] for f in frames]),
+                "i2c_per_frame": round(sum(f["i2c"] for f in frames) / count, 3),
+                "label_writes_per_frame": round(sum(f["label_writes"] for f in frames) / count, 3),
+                "alloc_blocks_per_frame": round(sum(f["alloc_blocks"] for f in frames) / count, 3),
+                "gc_collections": sum(f["gc"] for f in frames),
+                "refreshes_per_frame": round(sum(f["refreshes"] for f in frames) / count, 3),
+            },
+            "virtual_s": round(self.clock.now, 4),
+            "i2c": self.bus.stats(),
+            "fs": self.fs.stats(),
+            "network": self.esp.stats(),
+            "display": self.display.stats() if self.display else {},
+            "counters": dict(sorted(self.counters.items())),
+            "touch": {"count": len(self._responses), "answered": len(latencies),
+                      "latency_ms": _summary(latencies)},
+            "memory": {"peak_bytes": self.peak_memory, "heap_size": self.heap_size,
+                       "allocated_bytes": self._heap_allocated,
+                       "loop_allocated_bytes": self._heap_allocated - self._heap_boot,
+                       "collections": self._gc_collections},
+        }
+
+    def dump(self, report, path):
+        with open(path, "w") as out:
+            json.dump(report, out, indent=2, sort_keys=True)
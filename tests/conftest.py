@@ -0,0 +1,23 @@
+"""Run the ``wrist`` modules on the host against the simulator's hardware shims."""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)  # after the standard library, which has its own ``code``
+
+from simulator.runtime import Simulator  # pylint: disable=wrong-import-position
+
+
+@pytest.fixture
+def sim():
+    """An installed :class:`Simulator`, so ``displayio``, ``time`` and the
+    other device modules resolve to its shims."""
+    simulator = Simulator(trace_memory=False)
+    simulator.install()
+    try:
+        yield simulator
+    finally:
+        simulator.uninstall()
@@ -0,0 +1,41 @@
+"""``wrist.clock.RtcClock``: the first sync finds the tick without a second of polling."""
+
+import time
+
+import pytest
+
+START = 1646812800  # 2022-03-09 08:00:00
+
+
+class FakeRTC:
+    """A DS3231 whose seconds tick ``phase`` seconds into each monotonic second."""
+
+    def __init__(self, phase):
+        self.phase = phase
+
+    @property
+    def datetime(self):
+        return time.localtime(START + int(time.monotonic() - self.phase))
+
+
+def first_sync(sim, phase, boot):
+    from wrist.clock import SYNCED, RtcClock  # pylint: disable=import-outside-toplevel
+    sim.clock.advance(2)
+    clock = RtcClock(FakeRTC(phase))
+    sim.clock.advance(boot)  # the rest of boot, before the scheduler first runs the task
+    for _ in range(500):
+        delay = clock.sync()
+        if clock.state == SYNCED and clock.syncs:
+            return clock
+        sim.clock.advance(delay + 0.0009)  # each read is an I2C transaction
+    raise AssertionError("never synced")
+
+
+@pytest.mark.parametrize("phase", [0.0, 0.13, 0.5, 0.87, 0.99])
+@pytest.mark.parametrize("boot", [0.0, 0.3, 1.2])
+def test_first_sync_is_exact_and_cheap(sim, phase, boot):
+    clock = first_sync(sim, phase, boot)
+    assert clock.reads <= 1 + 2 / clock.search + 2 * clock.lead / clock.poll + 4
+    edge = time.monotonic() - (time.monotonic() - phase) % 1
+    offset = clock.seconds(edge) % 1
+    assert min(offset, 1 - offset) <= clock.poll
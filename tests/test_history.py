@@ -0,0 +1,62 @@
+"""``wrist.history.Sparkline``: drawn only when the line would change."""
+
+
+def make(points=5):
+    from wrist.history import History, Sparkline  # pylint: disable=import-outside-toplevel
+    return History("h", levels=((1, 10),)), Sparkline(9, 5, points)
+
+
+def lit(sparkline):
+    bitmap = sparkline.bitmap
+    return [(x, y) for y in range(bitmap.height) for x in range(bitmap.width) if bitmap[x, y]]
+
+
+def fill(history, values, start=0):
+    for second, value in enumerate(values, start):
+        history.add(second, value)
+    history.add(start + len(values), 0)  # closes the last slot
+
+
+def test_line_runs_from_the_oldest_point_to_the_newest(sim):
+    history, sparkline = make()
+    fill(history, [0, 4, 8, 4, 0])
+    sparkline.plot(history)
+    pixels = lit(sparkline)
+    assert (0, 4) in pixels and (4, 0) in pixels and (8, 4) in pixels
+    assert sparkline.draws == 1
+
+
+def test_no_new_slot_is_not_drawn(sim):
+    history, sparkline = make()
+    fill(history, [1, 2, 3])
+    bitmap = sparkline.bitmap
+    sparkline.plot(history)
+    before = lit(sparkline)
+    sparkline.plot(history)
+    assert (sparkline.draws, sparkline.skips) == (1, 1)
+    assert sparkline.bitmap is bitmap
+    assert lit(sparkline) == before
+
+
+def test_same_shape_is_not_drawn_again(sim):
+    history, sparkline = make(points=3)
+    for second in range(4):
+        history.add(second, 5)
+    sparkline.plot(history)
+    history.add(4, 5)
+    sparkline.plot(history)  # the ring moved on, the flat line did not
+    assert (sparkline.draws, sparkline.skips) == (1, 1)
+    history.add(5, 9)
+    history.add(6, 9)
+    sparkline.plot(history)
+    assert sparkline.draws == 2
+
+
+def test_clear_blanks_and_draws_again(sim):
+    history, sparkline = make()
+    fill(history, [1, 2, 3])
+    sparkline.plot(history)
+    sparkline.clear()
+    assert lit(sparkline) == []
+    sparkline.plot(history)
+    assert sparkline.draws == 2 and lit(sparkline)
@@ -0,0 +1,84 @@
+"""``wrist.scrolllist.ScrollList``: rows placed for every scroll position."""
+
+ROW = 40
+HEIGHT = 200
+
+
+def make_list(count):
+    import displayio  # pylint: disable=import-outside-toplevel
+    from wrist.scrolllist import ScrollList  # pylint: disable=import-outside-toplevel
+
+    bound = {}
+
+    def bind_row(row, index):
+        bound[id(row)] = index
+
+    rows = ScrollList(count, lambda slot: displayio.Group(), bind_row, 213, 0, 106, HEIGHT, ROW)
+    return rows, bound
+
+
+def visible(rows, bound):
+    """``(y, index)`` of every row that is shown, top first."""
+    return sorted((row.y, bound[id(row)]) for row in rows.rows if not row.hidden)
+
+
+def check_rows(rows, bound):
+    shown = visible(rows, bound)
+    for (top, index), (next_top, next_index) in zip(shown, shown[1:]):
+        assert next_top >= top + ROW, "rows overlap: {}".format(shown)
+        assert next_index == index + 1
+    for top, index in shown:
+        assert top == index * ROW - rows.scroll
+    # the viewport is covered from its top edge to its bottom edge
+    assert shown[0][0] <= 0
+    assert shown[-1][0] + ROW >= min(HEIGHT, rows.count * ROW - rows.scroll)
+
+
+def test_rows_at_max_scroll_do_not_overlap(sim):
+    rows, bound = make_list(32)
+    rows.scroll_to(rows.max_scroll)
+    assert rows.scroll == 32 * ROW - HEIGHT
+    check_rows(rows, bound)
+    assert visible(rows, bound)[-1][1] == 31
+
+
+def test_rows_stay_in_place_scrolling_through_the_list(sim):
+    rows, bound = make_list(32)
+    for scroll in list(range(0, rows.max_scroll + 1, 7)) + list(range(rows.max_scroll, -1, -13)):
+        rows.scroll_to(scroll)
+        check_rows(rows, bound)
+
+
+def test_pool_does_not_grow_with_the_list(sim):
+    assert len(make_list(32)[0].rows) == len(make_list(300)[0].rows) == HEIGHT // ROW + 1
+
+
+def test_short_list_does_not_scroll(sim):
+    rows, bound = make_list(3)
+    rows.scroll_to(100)
+    assert rows.scroll == 0
+    assert visible(rows, bound) == [(0, 0), (40, 1), (80, 2)]
+
+
+def test_drag_does_not_select(sim):
+    rows, _ = make_list(32)
+    selected = []
+    rows.on_select = lambda index, point: selected.append(index)
+    rows.press("rows", (260, 100))
+    sim.clock.advance(0.05)
+    rows.move("rows", (260, 60))
+    sim.clock.advance(0.05)
+    rows.release("rows", (260, 60))
+    assert selected == []
+    assert rows.scroll == 40
+
+
+def test_tap_selects_on_release(sim):
+    rows, _ = make_list(32)
+    selected = []
+    rows.on_select = lambda index, point: selected.append(index)
+    rows.press("rows", (260, 100))
+    assert selected == []
+    sim.clock.advance(0.1)
+    rows.release("rows", (260, 100))
+    assert selected == [2]
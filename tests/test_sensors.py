@@ -0,0 +1,31 @@
+"""``wrist.sensors.SensorCache``: a sensor with a conversion is never read from ``get``."""
+
+
+def make_cache():
+    from wrist.sensors import SensorCache  # pylint: disable=import-outside-toplevel
+    calls = []
+    cache = SensorCache()
+    cache.add("humidity", lambda: calls.append("read") or len(calls), 30,
+              start=lambda: calls.append("start"), settle=0.025)
+    return cache, calls
+
+
+def test_first_get_reads(sim):
+    cache, calls = make_cache()
+    assert cache.get("humidity") == 1
+    assert calls == ["read"]
+
+
+def test_expired_get_answers_from_cache_until_refresh(sim):
+    cache, calls = make_cache()
+    cache.get("humidity")
+    sim.clock.advance(31)
+    assert cache.get("humidity") == 1  # expired, but refresh has not started it
+    assert calls == ["read"]
+    cache.refresh()
+    assert calls == ["read", "start"]
+    assert cache.get("humidity") == 1
+    sim.clock.advance(0.03)
+    cache.refresh()
+    assert calls == ["read", "start", "read"]
+    assert cache.get("humidity") == 3
@@ -0,0 +1,18 @@
+"""The simulator's touch-to-screen measurement counts only the touch's own answer."""
+
+import contextlib
+import io
+
+from conftest import ROOT
+from simulator.runtime import Simulator
+
+
+def test_touch_is_answered_only_by_what_it_changed():
+    touches = [{"at": 3.0, "x": 100, "y": 100, "hold": 0.1},  # nothing there
+               {"at": 5.0, "x": 260, "y": 220, "hold": 0.1}]  # map button, answers on press
+    sim = Simulator(root=ROOT, touches=touches, trace_memory=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = sim.run("code.py", seconds=7)
+    assert report["touch"]["count"] == 2
+    assert report["touch"]["answered"] == 1
+    assert report["touch"]["latency_ms"]["max"] < 150
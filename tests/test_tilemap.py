@@ -0,0 +1,49 @@
+"""``wrist.tilemap.TileMap``: a broken tile file is refused with ValueError."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+import build_tiles  # pylint: disable=wrong-import-position
+
+TILE = 16
+
+
+def write_map(path, width=64, height=48):
+    pixels = [((x * 8) % 256, (y * 8) % 256, 0) for y in range(height) for x in range(width)]
+    levels = build_tiles.pyramid(width, height, pixels, 32)
+    palette, index = build_tiles.build_palette(pixels, 16)
+    return build_tiles.write(str(path), levels, palette, index, TILE)
+
+
+def open_map(path):
+    from wrist.tilemap import TileMap  # pylint: disable=import-outside-toplevel
+    return TileMap(str(path), 48, 32)
+
+
+def test_whole_file_opens(sim, tmp_path):
+    path = tmp_path / "map.tiles"
+    write_map(path)
+    tile_map = open_map(path)
+    assert len(tile_map.levels) == 2
+    tile_map.close()
+
+
+@pytest.mark.parametrize("keep", [0, 3, 20, 60, -1])
+def test_truncated_file_is_a_value_error(sim, tmp_path, keep):
+    path = tmp_path / "map.tiles"
+    size = write_map(path)
+    with open(path, "r+b") as tiles:
+        tiles.truncate(keep if keep >= 0 else size - 1)
+    with pytest.raises(ValueError):
+        open_map(path)
+
+
+def test_other_file_is_a_value_error(sim, tmp_path):
+    path = tmp_path / "map.tiles"
+    path.write_bytes(b"BM" + bytes(200))
+    with pytest.raises(ValueError):
+        open_map(path)
@@ -0,0 +1,21 @@
+"""``wrist.views.Views``: idle prefetch builds only the views that allow it."""
+
+
+def test_prefetch_skips_views_that_opt_out(sim):
+    import displayio  # pylint: disable=import-outside-toplevel
+    from wrist.views import Views  # pylint: disable=import-outside-toplevel
+
+    built = []
+
+    def builder(name):
+        return lambda: built.append(name) or displayio.Group()
+
+    views = Views()
+    views.add("crew", builder("crew"))
+    big = views.add("map", builder("map"), prefetch=False)
+    views.add("settings", builder("settings"))
+    for _ in range(4):
+        views.prefetch()
+    assert built == ["crew", "settings"]
+    views.switch(big)
+    assert built == ["crew", "settings", "map"]
@@ -0,0 +1,89 @@
+"""``wrist.vitals.VitalsFeed``: a malformed answer fails the request, not the app."""
+
+import pytest
+
+from wrist.vitals import SOCKET_ESTABLISHED, VitalsFeed
+
+
+class FakeESP:
+    """An ESP32 whose one socket is connected and answers with ``answer``."""
+
+    status = 3
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.pending = b""
+
+    def get_socket(self):
+        return 0
+
+    def socket_open(self, socket, host, port):
+        pass
+
+    def socket_status(self, socket):
+        return SOCKET_ESTABLISHED
+
+    def socket_write(self, socket, data):
+        self.pending = self.answer
+
+    def socket_available(self, socket):
+        return len(self.pending)
+
+    def socket_read(self, socket, size):
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+    def socket_close(self, socket):
+        pass
+
+
+def answer(body, status="200 OK"):
+    return "HTTP/1.1 {}\r\nContent-Length: {}\r\n\r\n{}".format(status, len(body), body).encode()
+
+
+def request(esp):
+    """Run the feed through one request; returns it."""
+    feed = VitalsFeed(esp, "http://base:8080/vitals", ("ford",))
+    updates = []
+    feed.on_update = lambda name, values: updates.append((name, values))
+    for _ in range(10):
+        feed.poll()
+        if feed.requests and feed.state == 0:
+            break
+    feed.updates_seen = updates
+    return feed
+
+
+def test_answer_updates_the_feed():
+    feed = request(FakeESP(answer('{"version": 42, "feeds": {"ford": {"pulse": 68, "resp": 14}}}')))
+    assert feed.errors == 0
+    assert feed.version == 42
+    assert feed.get("ford") == {"pulse": 68, "resp": 14}
+    assert feed.updates_seen == [("ford", {"pulse": 68, "resp": 14})]
+
+
+@pytest.mark.parametrize("body", [
+    '{"feeds": {"ford": {"pulse": 68}}}',
+    '{"version": 42}',
+    '{"version": 42, "feeds": ["ford"]}',
+    '{"version": 42, "feeds": {"ford": 68}}',
+    '{"version": 42, "feeds": {"ford": {"pulse": "68"}}}',
+    '{"version": "42", "feeds": {}}',
+    '[42]',
+    '42',
+    '{"version": 42, "feeds": {"ford": {"pulse": 6',
+    '{"version": 42, "feeds": {"ford": {"pulse": 300, "resp": 14}}}',
+    '{"version": 42, "feeds": {"ford": {"pulse": 68, "resp": -1}}}',
+])
+def test_malformed_body_is_a_failed_request(body):
+    feed = request(FakeESP(answer(body)))
+    assert feed.errors == 1
+    assert feed.version is None
+    assert feed.values == {}
+    assert feed.updates_seen == []
+    assert feed.confirmed is None
+
+
+def test_malformed_status_line_is_a_failed_request():
+    feed = request(FakeESP(b"HTTP/1.1\r\nContent-Length: 0\r\n\r\n"))
+    assert feed.errors == 1
@@ -0,0 +1,149 @@
+"""Benchmark code.py on the simulator and compare against a stored baseline.
+
+Runs on the host with plain CPython::
+
+    python tools/benchmark.py
+    python tools/benchmark.py --json bench.json
+    python tools/benchmark.py --update
+
+Each scenario boots ``code.py`` on the simulator in ``simulator/``, with its
+modelled I2C, display and flash latencies and its virtual clock, and runs the
+main loop for a fixed stretch of simulated time.  ``idle`` leaves the watch
+alone; ``touch`` taps a crew button, the map and the first crew button again.
+Every time is simulated, so the same tree gives the same numbers on any
+machine.  Allocation is counted from the end of boot, as boot imports and,
+without cached bytecode, compiles every module, which can double it; the
+heap figures still move a little with the Python version.
+
+The metrics are compared against ``tools/benchmark_baseline.json``.  A
+metric regressed when it grew by more than its relative tolerance plus a
+small absolute slack, and then the exit status is 1, so a build can run this
+as a check.  ``--update`` stores the current numbers as the new baseline;
+commit it along with the change that moved them.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from simulator.runtime import Simulator  # pylint: disable=wrong-import-position
+
+BASELINE = os.path.join(ROOT, "tools", "benchmark_baseline.json")
+
+# name: (touches, simulated seconds)
+SCENARIOS = {
+    "idle": ((), 12),
+    "touch": (({"at": 4.0, "x": 260, "y": 60, "hold": 0.1},
+               {"at": 6.0, "x": 260, "y": 220, "hold": 0.1},
+               {"at": 8.0, "x": 260, "y": 20, "hold": 0.1}), 12),
+}
+
+# name: (scenario, path into its report, relative tolerance, absolute slack);
+# lower is better for all of them
+METRICS = {
+    "boot_s": ("idle", ("boot", "virtual_s"), 0.05, 0.01),
+    "frame_ms_mean": ("idle", ("frames", "virtual_ms", "mean"), 0.05, 0.5),
+    "loop_busy_ms_mean": ("idle", ("frames", "busy_ms", "mean"), 0.05, 0.5),
+    "loop_busy_ms_p95": ("idle", ("frames", "busy_ms", "p95"), 0.05, 0.5),
+    "touch_latency_ms_mean": ("touch", ("touch", "latency_ms", "mean"), 0.10, 5),
+    "touch_latency_ms_max": ("touch", ("touch", "latency_ms", "max"), 0.10, 5),
+    "label_writes_per_frame": ("idle", ("frames", "label_writes_per_frame"), 0.10, 0.02),
+    "i2c_per_frame": ("idle", ("frames", "i2c_per_frame"), 0.05, 0.1),
+    "peak_heap_bytes": ("idle", ("memory", "peak_bytes"), 0.10, 16384),
+    "loop_allocated_bytes": ("idle", ("memory", "loop_allocated_bytes"), 0.10, 16384),
+}
+
+
+def run(name):
+    """Run one scenario and return the simulator's report."""
+    touches, seconds = SCENARIOS[name]
+    sim = Simulator(root=ROOT, touches=list(touches))
+    # CPython's cycle collector runs after a count of allocations that
+    # includes importing and compiling, and a cycle freed early or late moves
+    # the traced heap peaks; with it off, allocations repeat exactly
+    gc.disable()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):  # the app's own prints
+            return sim.run("code.py", seconds=seconds)
+    finally:
+        gc.enable()
+        gc.collect()
+
+
+def measure():
+    """``{metric: value}`` over every scenario."""
+    reports = {name: run(name) for name in SCENARIOS}
+    results = {}
+    for metric, (scenario, path, _, _) in METRICS.items():
+        value = reports[scenario]
+        for key in path:
+            value = value[key]
+        results[metric] = value
+    return results
+
+
+def compare(results, baseline):
+    """``{metric: {value, baseline, change, regressed}}``; change is relative."""
+    comparison = {}
+    for metric, (_, _, tolerance, slack) in METRICS.items():
+        value = results[metric]
+        before = baseline.get(metric)
+        entry = {"value": value, "baseline": before, "change": None, "regressed": False}
+        if before is not None:
+            entry["change"] = round((value - before) / before, 4) if before else None
+            entry["regressed"] = value > before * (1 + tolerance) + slack
+        comparison[metric] = entry
+    return comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--update", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--json", metavar="PATH", help="write results and comparison as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    results = measure()
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as source:
+            baseline = json.load(source)
+    comparison = compare(results, baseline)
+    regressed = [metric for metric, entry in comparison.items() if entry["regressed"]]
+
+    if args.json:
+        output = {"results": results, "comparison": comparison, "regressions": regressed}
+        if args.json == "-":
+            json.dump(output, sys.stdout, indent=2, sort_keys=True)
+            print()
+        else:
+            with open(args.json, "w", encoding="utf-8") as out:
+                json.dump(output, out, indent=2, sort_keys=True)
+    if args.json != "-":
+        print("{:<24} {:>12} {:>12} {:>8}".format("metric", "value", "baseline", "change"))
+        for metric, entry in comparison.items():
+            print("{:<24} {:>12} {:>12} {:>8}{}".format(
+                metric, entry["value"], "-" if entry["baseline"] is None else entry["baseline"],
+                "-" if entry["change"] is None else "{:+.1%}".format(entry["change"]),
+                "  REGRESSED" if entry["regressed"] else ""))
+
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as out:
+            json.dump(results, out, indent=2, sort_keys=True)
+            out.write("\n")
+        return 0
+    if regressed:
+        print("regressed: " + ", ".join(regressed), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Compare two boot timelines from ``wrist.boottime``.
+
+Runs on the host with plain CPython::
+
+    python tools/boot_diff.py before.log after.log
+    python tools/boot_diff.py before.json after.json --fail-over 50
+
+Each input is either a JSON timeline saved by ``BootTimeline.finish`` or a
+captured serial console log containing its ``boot ...`` lines.  Phases are
+matched by name; the table shows time and heap for both runs and the change.
+With ``--fail-over`` the exit status is 1 when total boot time grew by more
+than that many milliseconds, so the check can run in CI.
+"""
+
+import argparse
+import json
+import re
+import sys
+
+LINE = re.compile(r"^boot (?P<name>.+?) (?P<ms>-?[\d.]+)ms (?P<used>[+-]\d+)B free (?P<free>\d+)\s*$")
+
+
+def load(path):
+    """Return ``[(name, ms, bytes used)]`` from a JSON timeline or console log."""
+    with open(path, encoding="utf-8", errors="replace") as source:
+        text = source.read()
+    try:
+        phases = json.loads(text)["phases"]
+    except ValueError:
+        phases = None
+    if phases is not None:
+        return [(p["name"], p["ms"], -p["mem_delta"]) for p in phases]
+    timeline = []
+    for line in text.splitlines():
+        match = LINE.match(line.strip())
+        if match:
+            timeline.append((match["name"], float(match["ms"]), int(match["used"])))
+    if not timeline:
+        raise ValueError("No boot timeline in {}".format(path))
+    return timeline
+
+
+def diff(before, after):
+    """Rows of ``(name, ms before, ms after, bytes before, bytes after)``.
+
+    A phase only present in one run has None for the other.
+    """
+    old = {name: (ms, used) for name, ms, used in before}
+    new = {name: (ms, used) for name, ms, used in after}
+    names = [name for name, _, _ in after]
+    names += [name for name, _, _ in before if name not in new]
+    rows = []
+    for name in names:
+        ms_before, used_before = old.get(name, (None, None))
+        ms_after, used_after = new.get(name, (None, None))
+        rows.append((name, ms_before, ms_after, used_before, used_after))
+    return rows
+
+
+def _cell(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def _change(before, after, spec):
+    if before is None or after is None:
+        return "new" if before is None else "gone"
+    return format(after - before, "+" + spec)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("before", help="baseline timeline (JSON or console log)")
+    parser.add_argument("after", help="timeline to compare against it")
+    parser.add_argument("--fail-over", type=float, metavar="MS",
+                        help="exit 1 if total boot time grew by more than MS milliseconds")
+    args = parser.parse_args(argv)
+    rows = diff(load(args.before), load(args.after))
+    print("{:<16} {:>9} {:>9} {:>9}  {:>8} {:>8} {:>8}".format(
+        "phase", "ms", "ms", "change", "bytes", "bytes", "change"))
+    total_before = total_after = 0.0
+    for name, ms_before, ms_after, used_before, used_after in rows:
+        total_before += ms_before or 0
+        total_after += ms_after or 0
+        print("{:<16} {:>9} {:>9} {:>9}  {:>8} {:>8} {:>8}".format(
+            name, _cell(ms_before, ".1f"), _cell(ms_after, ".1f"), _change(ms_before, ms_after, ".1f"),
+            _cell(used_before, "d"), _cell(used_after, "d"), _change(used_before, used_after, "d")))
+    print("{:<16} {:>9.1f} {:>9.1f} {:>+9.1f}".format("total", total_before, total_after,
+                                                      total_after - total_before))
+    if args.fail_over is not None and total_after - total_before > args.fail_over:
+        print("boot time regressed by {:.1f}ms (limit {:.1f}ms)".format(
+            total_after - total_before, args.fail_over))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
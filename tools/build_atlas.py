@@ -0,0 +1,200 @@
+"""Pack the icon and portrait BMPs into one palette-indexed sprite atlas.
+
+Runs on the host with plain CPython::
+
+    python tools/build_atlas.py images
+
+Every BMP in the directory whose sides are whole multiples of the tile size
+(and no bigger than ``--max-tiles`` tiles) is packed onto a sheet of
+``--tile`` pixel cells.  The sheet is written as one 8-bit indexed BMP, so the
+device opens one file and shares one palette for every icon, and a JSON
+manifest maps each source path to the atlas tiles that draw it::
+
+    {"atlas": "/images/atlas.bmp", "tile_width": 32, "tile_height": 32,
+     "images": {"/images/nav.bmp": {"width": 1, "height": 1, "tiles": [4]}}}
+
+``wrist.atlas.Atlas`` reads the manifest on the device.  If the sources hold
+more than 256 colours the palette is reduced with a median cut.
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+
+ATLAS_NAME = "atlas.bmp"
+MANIFEST_NAME = "atlas.json"
+
+
+def read_bmp(path):
+    """Return ``(width, height, pixels)`` with pixels as row-major RGB tuples."""
+    with open(path, "rb") as bmp:
+        data = bmp.read()
+    if data[:2] != b"BM":
+        raise ValueError("{} is not a BMP file".format(path))
+    offset = struct.unpack_from("<I", data, 10)[0]
+    header_size, width, height, _, bpp, compression = struct.unpack_from("<IiiHHI", data, 14)
+    if compression not in (0, 3):
+        raise ValueError("{}: compressed BMPs are not supported".format(path))
+    bottom_up = height > 0
+    height = abs(height)
+    stride = ((width * bpp + 31) // 32) * 4
+    palette = None
+    if bpp <= 8:
+        colors = struct.unpack_from("<I", data, 46)[0] or (1 << bpp)
+        table = 14 + header_size
+        palette = [(data[table + 4 * i + 2], data[table + 4 * i + 1], data[table + 4 * i])
+                   for i in range(colors)]
+    elif bpp not in (24, 32):
+        raise ValueError("{}: {}-bit BMPs are not supported".format(path, bpp))
+    pixels = []
+    for y in range(height):
+        row = offset + (height - 1 - y if bottom_up else y) * stride
+        for x in range(width):
+            if palette is not None:
+                bit = x * bpp
+                index = (data[row + bit // 8] >> (8 - bpp - bit % 8)) & ((1 << bpp) - 1)
+                pixels.append(palette[index])
+            else:
+                i = row + x * (bpp // 8)
+                pixels.append((data[i + 2], data[i + 1], data[i]))
+    return width, height, pixels
+
+
+def write_indexed_bmp(path, width, height, palette, indices):
+    """Write an 8-bit palette BMP; ``indices`` is row-major, top row first."""
+    stride = (width + 3) & ~3
+    table = b"".join(struct.pack("<BBBB", b, g, r, 0) for r, g, b in palette)
+    offset = 14 + 40 + len(table)
+    size = offset + stride * height
+    with open(path, "wb") as bmp:
+        bmp.write(b"BM" + struct.pack("<IHHI", size, 0, 0, offset))
+        bmp.write(struct.pack("<IiiHHIIiiII", 40, width, height, 1, 8, 0, stride * height,
+                              2835, 2835, len(palette), 0))
+        bmp.write(table)
+        padding = bytes(stride - width)
+        for y in range(height - 1, -1, -1):  # bottom-up
+            bmp.write(bytes(indices[y * width:(y + 1) * width]) + padding)
+
+
+def median_cut(colors, count):
+    """Reduce ``colors`` (a dict of RGB tuple -> pixel count) to ``count`` colours.
+
+    :return: ``(palette, mapping)`` where ``mapping`` sends every source
+        colour to its palette index.
+    """
+    boxes = [list(colors)]
+    while len(boxes) < count:
+        spans = []
+        for box in boxes:
+            if len(box) < 2:
+                spans.append((-1, 0))
+                continue
+            ranges = [max(c[ch] for c in box) - min(c[ch] for c in box) for ch in range(3)]
+            spans.append((max(ranges), ranges.index(max(ranges))))
+        widest = max(range(len(boxes)), key=lambda i: spans[i][0])
+        if spans[widest][0] <= 0:
+            break
+        channel = spans[widest][1]
+        box = sorted(boxes[widest], key=lambda c: c[channel])
+        boxes[widest:widest + 1] = [box[:len(box) // 2], box[len(box) // 2:]]
+    palette = []
+    mapping = {}
+    for box in boxes:
+        weight = sum(colors[c] for c in box)
+        palette.append(tuple(sum(c[ch] * colors[c] for c in box) // weight for ch in range(3)))
+        for color in box:
+            mapping[color] = len(palette) - 1
+    return palette, mapping
+
+
+def build_palette(images):
+    counts = {}
+    for _, _, _, pixels in images:
+        for color in pixels:
+            counts[color] = counts.get(color, 0) + 1
+    if len(counts) <= 256:
+        palette = sorted(counts, key=lambda c: -counts[c])
+        return palette, {color: i for i, color in enumerate(palette)}
+    print("{} colours, reducing to 256 with a median cut".format(len(counts)))
+    return median_cut(counts, 256)
+
+
+def pack(images, tile, columns):
+    """Place each image on a grid of ``columns`` cells, biggest first.
+
+    :return: ``{name: (column, row, width, height)}`` in cells, and the
+        number of rows used.
+    """
+    used = []
+    placed = {}
+    order = sorted(images, key=lambda image: (-image[1] * image[2], image[0]))
+    for name, width, height, _ in order:
+        w, h = width // tile, height // tile
+        row = 0
+        while name not in placed:
+            while len(used) < row + h:
+                used.append([False] * columns)
+            for col in range(columns - w + 1):
+                if all(not used[row + dy][col + dx] for dy in range(h) for dx in range(w)):
+                    for dy in range(h):
+                        for dx in range(w):
+                            used[row + dy][col + dx] = True
+                    placed[name] = (col, row, w, h)
+                    break
+            row += 1
+    return placed, len(used)
+
+
+def build(source, tile=32, columns=8, max_tiles=2, prefix="/images/"):
+    """Pack the BMPs in ``source``; returns the sheet and its manifest."""
+    images = []
+    for filename in sorted(os.listdir(source)):
+        if not filename.lower().endswith(".bmp") or filename == ATLAS_NAME:
+            continue
+        width, height, pixels = read_bmp(os.path.join(source, filename))
+        if width % tile or height % tile or width > tile * max_tiles or height > tile * max_tiles:
+            continue
+        images.append((prefix + filename, width, height, pixels))
+    if not images:
+        raise ValueError("No {}px-tiled BMPs in {}".format(tile, source))
+    palette, mapping = build_palette(images)
+    placed, rows = pack(images, tile, columns)
+    sheet_width = columns * tile
+    indices = bytearray(sheet_width * rows * tile)
+    manifest = {"atlas": prefix + ATLAS_NAME, "tile_width": tile, "tile_height": tile, "images": {}}
+    for name, width, height, pixels in images:
+        col, row, w, h = placed[name]
+        for y in range(height):
+            base = (row * tile + y) * sheet_width + col * tile
+            for x in range(width):
+                indices[base + x] = mapping[pixels[y * width + x]]
+        tiles = [(row + dy) * columns + col + dx for dy in range(h) for dx in range(w)]
+        manifest["images"][name] = {"width": w, "height": h, "tiles": tiles}
+    return sheet_width, rows * tile, palette, indices, manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("source", help="directory of BMPs, e.g. images")
+    parser.add_argument("--tile", type=int, default=32, help="tile size in pixels (default 32)")
+    parser.add_argument("--columns", type=int, default=8, help="atlas width in tiles (default 8)")
+    parser.add_argument("--max-tiles", type=int, default=2,
+                        help="largest image side to pack, in tiles (default 2)")
+    parser.add_argument("--prefix", default="/images/", help="device path of the source directory")
+    args = parser.parse_args(argv)
+    width, height, palette, indices, manifest = build(args.source, args.tile, args.columns,
+                                                      args.max_tiles, args.prefix)
+    atlas = os.path.join(args.source, ATLAS_NAME)
+    write_indexed_bmp(atlas, width, height, palette, indices)
+    with open(os.path.join(args.source, MANIFEST_NAME), "w") as out:
+        json.dump(manifest, out, sort_keys=True)
+        out.write("\n")
+    print("{} images -> {} ({}x{}, {} colours, {} bytes)".format(
+        len(manifest["images"]), atlas, width, height, len(palette), os.path.getsize(atlas)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
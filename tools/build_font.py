@@ -0,0 +1,164 @@
+"""Compile the subset of a BDF font the app actually shows into a glyph pack.
+
+Runs on the host with plain CPython::
+
+    python tools/build_font.py fonts/Helvetica-Bold-16.bdf
+
+The characters are collected from the string literals in ``code.py`` and
+``wrist/*.py`` (leaving out docstrings and ``print`` arguments, which never
+reach the screen) and from every string in ``roster.json``, plus digits,
+space and anything given with ``--extra``.  Only those glyphs are written,
+next to the BDF as ``<name>.glyphs``, which ``wrist.glyphpack.GlyphPack``
+loads without any text parsing.
+
+Pack layout, all little-endian::
+
+    header  "WGLY", version (B), ascent, descent (h h),
+            bounding box width, height, x, y (h h h h), glyph count (H)
+    entry   code point (H), width, height (B B), dx, dy, shift_x, shift_y
+            (b b b b), bitmap offset (I)             -- one per glyph
+    bitmaps one bit per pixel, MSB first, rows padded to whole bytes
+"""
+
+import argparse
+import ast
+import glob
+import json
+import os
+import struct
+import sys
+
+MAGIC = b"WGLY"
+VERSION = 1
+HEADER = "<4sBhhhhhhH"
+ENTRY = "<HBBbbbbI"
+ALWAYS = "0123456789 "
+
+
+def _python_strings(path):
+    with open(path, encoding="utf-8") as source:
+        tree = ast.parse(source.read(), path)
+    skip = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            skip.add(id(node.value))  # docstrings and bare string statements
+        elif isinstance(node, ast.Call) and getattr(node.func, "id", None) == "print":
+            for arg in ast.walk(node):
+                skip.add(id(arg))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and id(node) not in skip:
+            yield node.value
+
+
+def _json_strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _json_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _json_strings(item)
+
+
+def app_characters(root, extra=""):
+    """Every printable character the app can put in a label."""
+    chars = set(ALWAYS + extra)
+    sources = [os.path.join(root, "code.py")] + sorted(glob.glob(os.path.join(root, "wrist", "*.py")))
+    for path in sources:
+        for text in _python_strings(path):
+            chars.update(text)
+    roster = os.path.join(root, "roster.json")
+    if os.path.exists(roster):
+        with open(roster, encoding="utf-8") as roster_file:
+            for text in _json_strings(json.load(roster_file)):
+                chars.update(text)
+    return {c for c in chars if ord(c) >= 32 and ord(c) != 127}
+
+
+def read_bdf(path):
+    """Return ``(properties, glyphs)``; glyphs map code point to metrics and rows."""
+    properties = {}
+    glyphs = {}
+    glyph = None
+    with open(path, encoding="utf-8") as bdf:
+        for line in bdf:
+            words = line.split()
+            if not words:
+                continue
+            key = words[0]
+            if glyph is None:
+                if key in ("FONTBOUNDINGBOX", "FONT_ASCENT", "FONT_DESCENT"):
+                    properties[key] = [int(v) for v in words[1:]]
+                elif key == "STARTCHAR":
+                    glyph = {"rows": None}
+                continue
+            if key == "ENCODING":
+                glyph["code"] = int(words[1])
+            elif key == "DWIDTH":
+                glyph["shift"] = (int(words[1]), int(words[2]))
+            elif key == "BBX":
+                glyph["bbx"] = tuple(int(v) for v in words[1:5])
+            elif key == "BITMAP":
+                glyph["rows"] = []
+            elif key == "ENDCHAR":
+                if glyph.get("code", -1) >= 0:
+                    glyphs[glyph["code"]] = glyph
+                glyph = None
+            elif glyph["rows"] is not None:
+                glyph["rows"].append(key)
+    return properties, glyphs
+
+
+def _pack_bitmap(width, rows):
+    # BDF rows are already hex bytes, MSB first and padded to whole bytes
+    row_bytes = (width + 7) // 8
+    data = bytearray()
+    for row in rows:
+        data += bytes.fromhex(row)[:row_bytes].ljust(row_bytes, b"\0")
+    return data
+
+
+def build(bdf_path, chars):
+    """Return the glyph pack bytes and the characters the font lacks."""
+    properties, glyphs = read_bdf(bdf_path)
+    codes = sorted(ord(c) for c in chars)
+    missing = [chr(code) for code in codes if code not in glyphs]
+    codes = [code for code in codes if code in glyphs]
+    entries = bytearray()
+    bitmaps = bytearray()
+    for code in codes:
+        glyph = glyphs[code]
+        width, height, dx, dy = glyph["bbx"]
+        shift_x, shift_y = glyph["shift"]
+        entries += struct.pack(ENTRY, code, width, height, dx, dy, shift_x, shift_y, len(bitmaps))
+        bitmaps += _pack_bitmap(width, glyph["rows"])
+    box = properties["FONTBOUNDINGBOX"]
+    header = struct.pack(HEADER, MAGIC, VERSION, properties["FONT_ASCENT"][0],
+                         properties["FONT_DESCENT"][0], box[0], box[1], box[2], box[3], len(codes))
+    return bytes(header + entries + bitmaps), missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("bdf", help="source BDF font, e.g. fonts/Helvetica-Bold-16.bdf")
+    parser.add_argument("--root", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help="app directory to scan for strings (default: the repo)")
+    parser.add_argument("--extra", default="", help="more characters to include")
+    parser.add_argument("--out", help="output path (default: the BDF path with .glyphs)")
+    args = parser.parse_args(argv)
+    chars = app_characters(args.root, args.extra)
+    pack, missing = build(args.bdf, chars)
+    out = args.out or os.path.splitext(args.bdf)[0] + ".glyphs"
+    with open(out, "wb") as pack_file:
+        pack_file.write(pack)
+    count = struct.unpack_from(HEADER, pack)[-1]
+    print("{} glyphs -> {} ({} bytes, BDF is {} bytes)".format(
+        count, out, len(pack), os.path.getsize(args.bdf)))
+    if missing:
+        print("not in the font: {}".format(" ".join(repr(c) for c in missing)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Cut a large map BMP into a tile pyramid for ``wrist.tilemap.TileMap``.
+
+Runs on the host with plain CPython::
+
+    python tools/build_tiles.py images/map2.bmp -o images/map.tiles
+    python tools/build_tiles.py survey.bmp -o /media/SD/map.tiles --colors 16
+
+Level 0 is the source at full size; every further level halves the one
+before (a 2x2 box filter) until the whole map fits in ``--min-size`` pixels.
+All levels share one palette of ``--colors`` colours, reduced from the
+source with a median cut; index 0 is kept black for the area around the
+map.  16 colours keep the device's tile cache at 4 bits per pixel.
+
+Every tile takes the same number of bytes, so the device finds any tile
+from its level, column and row with one multiply and one seek, and needs
+no index in memory however big the map is.  Layout, all little-endian::
+
+    header  "WMAP", version (B), levels (B), tile side (H), colours (H)
+    palette r, g, b (B B B)                          -- one per colour
+    level   width, height (H H), first tile offset (I) -- one per level
+    tiles   one byte per pixel, row-major, rows of tiles left to right and
+            top to bottom; tiles on the map's right and bottom edges are
+            padded with index 0
+"""
+
+import argparse
+import os
+import struct
+import sys
+
+from build_atlas import median_cut, read_bmp
+
+MAGIC = b"WMAP"
+VERSION = 1
+HEADER = "<4sBBHH"
+LEVEL = "<HHI"
+
+
+def halve(width, height, pixels):
+    """Return the image at half size, each pixel the mean of a 2x2 block."""
+    half_width = (width + 1) // 2
+    half_height = (height + 1) // 2
+    smaller = []
+    for y in range(half_height):
+        rows = (2 * y, min(2 * y + 1, height - 1))
+        for x in range(half_width):
+            columns = (2 * x, min(2 * x + 1, width - 1))
+            block = [pixels[row * width + column] for row in rows for column in columns]
+            smaller.append(tuple(sum(color[ch] for color in block) // 4 for ch in range(3)))
+    return half_width, half_height, smaller
+
+
+def pyramid(width, height, pixels, min_size):
+    """Every level as ``(width, height, pixels)``, full size first."""
+    levels = [(width, height, pixels)]
+    while width > min_size or height > min_size:
+        width, height, pixels = halve(width, height, pixels)
+        levels.append((width, height, pixels))
+    return levels
+
+
+def build_palette(pixels, colors):
+    """A palette of ``colors`` with black at index 0, and a colour lookup."""
+    counts = {}
+    for color in pixels:
+        counts[color] = counts.get(color, 0) + 1
+    if len(counts) < colors:
+        palette = [(0, 0, 0)] + sorted(counts, key=lambda c: -counts[c])
+    else:
+        palette = [(0, 0, 0)] + median_cut(counts, colors - 1)[0]
+    cache = {}
+
+    def index(color):
+        found = cache.get(color)
+        if found is None:
+            found = min(range(1, len(palette)), key=lambda i: sum(
+                (palette[i][ch] - color[ch]) ** 2 for ch in range(3)))
+            cache[color] = found
+        return found
+    return palette, index
+
+
+def tiles(width, height, pixels, tile, index):
+    """Yield each tile of one level as bytes, row by row of tiles."""
+    for tile_row in range((height + tile - 1) // tile):
+        for tile_column in range((width + tile - 1) // tile):
+            data = bytearray(tile * tile)
+            for y in range(tile):
+                source_y = tile_row * tile + y
+                if source_y >= height:
+                    break
+                for x in range(tile):
+                    source_x = tile_column * tile + x
+                    if source_x >= width:
+                        break
+                    data[y * tile + x] = index(pixels[source_y * width + source_x])
+            yield bytes(data)
+
+
+def write(path, levels, palette, index, tile):
+    """Write the tile file; returns its size in bytes."""
+    offset = struct.calcsize(HEADER) + 3 * len(palette) + struct.calcsize(LEVEL) * len(levels)
+    with open(path, "wb") as out:
+        out.write(struct.pack(HEADER, MAGIC, VERSION, len(levels), tile, len(palette)))
+        for color in palette:
+            out.write(struct.pack("<BBB", *color))
+        for width, height, _ in levels:
+            out.write(struct.pack(LEVEL, width, height, offset))
+            offset += ((width + tile - 1) // tile) * ((height + tile - 1) // tile) * tile * tile
+        for width, height, pixels in levels:
+            for data in tiles(width, height, pixels, tile, index):
+                out.write(data)
+    return offset
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("source", help="map image, a BMP of any size")
+    parser.add_argument("--output", "-o", help="tile file to write (default: next to the source)")
+    parser.add_argument("--tile", type=int, default=32, help="tile side in pixels (default 32)")
+    parser.add_argument("--colors", type=int, default=16,
+                        help="palette size including black, at most 256 (default 16)")
+    parser.add_argument("--min-size", type=int, default=240,
+                        help="stop halving once the map fits in this many pixels (default 240)")
+    args = parser.parse_args(argv)
+    if not 2 <= args.colors <= 256:
+        parser.error("--colors must be between 2 and 256")
+    output = args.output or os.path.splitext(args.source)[0] + ".tiles"
+    width, height, pixels = read_bmp(args.source)
+    if width > 0xFFFF or height > 0xFFFF:
+        parser.error("{}x{} is too big for the tile format".format(width, height))
+    levels = pyramid(width, height, pixels, args.min_size)
+    palette, index = build_palette(pixels, args.colors)
+    size = write(output, levels, palette, index, args.tile)
+    print("{} -> {}: {} levels from {}x{} to {}x{}, {}px tiles, {} colours, {} bytes".format(
+        args.source, output, len(levels), width, height, levels[-1][0], levels[-1][1],
+        args.tile, len(palette), size))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
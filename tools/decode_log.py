@@ -0,0 +1,169 @@
+"""Decode telemetry logs written by ``wrist.telemetry`` on the SD card.
+
+Runs on the host with plain CPython::
+
+    python tools/decode_log.py /media/SD/log/wrist-20220309-0.bin > day.csv
+    python tools/decode_log.py /media/SD/log/*.bin --output week.csv
+    python tools/decode_log.py /media/SD/log/*.bin --numpy week.npy
+
+Every file describes its own records in its header, so logs from different
+versions of the app can be decoded together as long as they have the same
+fields.  Files are streamed a chunk at a time, so the CSV output works for
+logs of any size.  Fields stored scaled (named like ``tempF/10``) come out in
+real units under their plain name.  ``--numpy`` needs NumPy and saves a
+structured array with one named column per field.
+
+From Python, ``read(path)`` yields one tuple per record and ``to_numpy(paths)``
+returns the structured array.
+"""
+
+import argparse
+import csv
+import struct
+import sys
+
+MAGIC = b"WLOG"
+HEADER = "<4sBBHHH"
+CHUNK_RECORDS = 4096
+# struct codes to NumPy dtype codes; struct's sizes match NumPy's for "<"
+NUMPY_TYPES = {"b": "i1", "B": "u1", "h": "i2", "H": "u2", "i": "i4", "I": "u4",
+               "l": "i4", "L": "u4", "q": "i8", "Q": "u8", "f": "f4", "d": "f8"}
+
+
+class LogFormat:
+    """The record layout read from a log's header."""
+
+    def __init__(self, record, fields, data_offset):
+        self.record = record
+        self.struct = struct.Struct(record)
+        self.data_offset = data_offset
+        self.names = []
+        self.divisors = []
+        for field in fields.split(","):
+            name, _, divisor = field.partition("/")
+            self.names.append(name)
+            self.divisors.append(float(divisor) if divisor else None)
+
+    def convert(self, values):
+        """Apply the field divisors to one unpacked record."""
+        return tuple(v / d if d else v for v, d in zip(values, self.divisors))
+
+
+def read_header(log):
+    """Return the ``LogFormat`` of an open log file, leaving it at the first record."""
+    size = struct.calcsize(HEADER)
+    magic, version, record_size, offset, fmt_len, names_len = struct.unpack(HEADER, log.read(size))
+    if magic != MAGIC:
+        raise ValueError("{} is not a telemetry log".format(getattr(log, "name", "input")))
+    if version != 1:
+        raise ValueError("unsupported telemetry log version {}".format(version))
+    text = log.read(fmt_len + names_len)
+    fmt = LogFormat(text[:fmt_len].decode(), text[fmt_len:].decode(), offset)
+    if fmt.struct.size != record_size:
+        raise ValueError("record format {} does not match size {}".format(fmt.record, record_size))
+    log.seek(offset)
+    return fmt
+
+
+def _chunks(path):
+    with open(path, "rb") as log:
+        fmt = read_header(log)
+        yield fmt
+        size = fmt.struct.size
+        while True:
+            data = log.read(size * CHUNK_RECORDS)
+            whole = len(data) // size * size  # a power cut can leave half a record
+            if whole:
+                yield data[:whole]
+            if len(data) < size * CHUNK_RECORDS:
+                return
+
+
+def read(path, raw=False):
+    """Yield each record of ``path`` as a tuple, in real units unless ``raw``."""
+    chunks = _chunks(path)
+    fmt = next(chunks)
+    for chunk in chunks:
+        for values in fmt.struct.iter_unpack(chunk):
+            yield values if raw else fmt.convert(values)
+
+
+def names(path):
+    """Field names of ``path``'s records, without their divisors."""
+    with open(path, "rb") as log:
+        return read_header(log).names
+
+
+def to_numpy(paths):
+    """Load logs into one NumPy structured array, one named field per column."""
+    import numpy  # pylint: disable=import-outside-toplevel
+    parts = []
+    dtype = None
+    for path in paths:
+        chunks = _chunks(path)
+        fmt = next(chunks)
+        order = fmt.record[0] if fmt.record[0] in "<>!=@" else "<"
+        raw = numpy.dtype([(name, ("<" if order in "<=@" else ">") + NUMPY_TYPES[code])
+                           for name, code in zip(fmt.names, fmt.record.lstrip("<>!=@"))])
+        real = numpy.dtype([(name, "f8" if divisor else raw[name])
+                            for name, divisor in zip(fmt.names, fmt.divisors)])
+        if dtype is None:
+            dtype = real
+        elif dtype.names != real.names:
+            raise ValueError("{} has fields {}, not {}".format(path, real.names, dtype.names))
+        for chunk in chunks:
+            records = numpy.frombuffer(chunk, dtype=raw)
+            converted = numpy.empty(len(records), dtype=real)
+            for name, divisor in zip(fmt.names, fmt.divisors):
+                converted[name] = records[name] / divisor if divisor else records[name]
+            parts.append(converted)
+    if dtype is None:
+        raise ValueError("no logs given")
+    return numpy.concatenate(parts) if parts else numpy.empty(0, dtype=dtype)
+
+
+def write_csv(paths, out):
+    """Stream every record of ``paths`` to ``out`` as CSV with a header row."""
+    writer = csv.writer(out)
+    header = None
+    count = 0
+    for path in paths:
+        fields = names(path)
+        if header is None:
+            header = fields
+            writer.writerow(header)
+        elif fields != header:
+            raise ValueError("{} has fields {}, not {}".format(path, fields, header))
+        for values in read(path):
+            writer.writerow(values)
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("logs", nargs="+", help="log files, decoded in the order given")
+    parser.add_argument("--output", "-o", help="CSV file to write (default: stdout)")
+    parser.add_argument("--numpy", metavar="NPY", help="save a NumPy structured array instead of CSV")
+    args = parser.parse_args(argv)
+    if args.numpy:
+        try:
+            import numpy  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            print("--numpy needs NumPy: pip install numpy", file=sys.stderr)
+            return 2
+        records = to_numpy(args.logs)
+        numpy.save(args.numpy, records)
+        print("{} records, fields {}".format(len(records), ", ".join(records.dtype.names)), file=sys.stderr)
+        return 0
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            count = write_csv(args.logs, out)
+    else:
+        count = write_csv(args.logs, sys.stdout)
+    print("{} records".format(count), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
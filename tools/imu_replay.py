@@ -0,0 +1,128 @@
+"""Replay accelerometer traces through the ``wrist.motion`` detectors.
+
+Runs on the host with plain CPython::
+
+    python tools/imu_replay.py /media/SD/imu/imu-0.bin
+    python tools/imu_replay.py walk.csv --rate 50 --budget-us 20
+    python tools/imu_replay.py --synthetic day --seconds 60 --save day.csv
+
+A trace is a log recorded on the watch with ``IMU_TRACE = True`` in
+``code.py`` (decoded with ``tools/decode_log.py``'s reader), or a CSV with
+``ax,ay,az`` columns in milli-g.  ``--synthetic`` makes one from the
+simulator's scripted wrist movements instead.
+
+Each detector is run over the whole trace on its own, with the same
+per-sample inputs ``MotionService`` gives it, and the table shows the events
+it found, when, and its host time per sample.  Host times are far below the
+device's, but they rank the detectors and show regressions; with
+``--budget-us`` the exit status is 1 when any detector costs more.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from decode_log import read as read_log  # pylint: disable=wrong-import-position
+from wrist.motion import Shake, Steps, WristRaise  # pylint: disable=wrong-import-position
+
+DETECTORS = (WristRaise, Shake, Steps)
+
+
+def load(path):
+    """Return ``[(x, y, z)]`` in milli-g from a trace log or CSV."""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as source:
+            return [(int(float(row["ax"])), int(float(row["ay"])), int(float(row["az"])))
+                    for row in csv.DictReader(source)]
+    return [(int(x), int(y), int(z)) for x, y, z in read_log(path)]
+
+
+def synthesize(name, seconds, rate):
+    """Sample one of the simulator's ``MOTIONS`` at ``rate`` for ``seconds``."""
+    from simulator.devices import MOTIONS, STANDARD_GRAVITY  # pylint: disable=import-outside-toplevel
+    motion = MOTIONS[name]
+    trace = []
+    for i in range(int(seconds * rate)):
+        accel = motion(i / rate)[0]
+        trace.append(tuple(int(a / STANDARD_GRAVITY * 1000) for a in accel))
+    return trace
+
+
+def inputs(trace):
+    """``(x, y, z, dyn)`` per sample, as ``MotionService.poll`` computes them."""
+    return [(x, y, z, (x * x + y * y + z * z - 1000000) // 2000) for x, y, z in trace]
+
+
+def replay(detector, samples):
+    """Run ``detector`` over ``samples``; return (event sample numbers, seconds)."""
+    events = []
+    update = detector.update
+    start = time.perf_counter()
+    for i, (x, y, z, dyn) in enumerate(samples):
+        if update(x, y, z, dyn):
+            events.append(i)
+    return events, time.perf_counter() - start
+
+
+def baseline(samples):
+    """Seconds the replay loop takes with a detector that does nothing."""
+    class Idle:  # pylint: disable=too-few-public-methods
+        @staticmethod
+        def update(x, y, z, dyn):
+            return False
+    return replay(Idle(), samples)[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("trace", nargs="?", help="trace log (.bin) or CSV in milli-g")
+    parser.add_argument("--rate", type=int, default=50, help="samples per second in the trace")
+    parser.add_argument("--synthetic", metavar="MOTION", help="use a simulator motion instead of a file")
+    parser.add_argument("--seconds", type=float, default=60, help="length of a synthetic trace")
+    parser.add_argument("--save", metavar="CSV", help="write the trace replayed to this CSV")
+    parser.add_argument("--budget-us", type=float, help="exit 1 if a detector costs more per sample")
+    args = parser.parse_args(argv)
+    if args.synthetic:
+        trace = synthesize(args.synthetic, args.seconds, args.rate)
+    elif args.trace:
+        trace = load(args.trace)
+    else:
+        parser.error("give a trace file or --synthetic")
+    if not trace:
+        print("empty trace")
+        return 1
+    if args.save:
+        with open(args.save, "w", newline="", encoding="utf-8") as out:
+            writer = csv.writer(out)
+            writer.writerow(("ax", "ay", "az"))
+            writer.writerows(trace)
+    samples = inputs(trace)
+    overhead = baseline(samples)
+    print("{} samples, {:.1f}s at {}/s".format(len(samples), len(samples) / args.rate, args.rate))
+    print("{:<8} {:>7} {:>10}  {}".format("detector", "events", "us/sample", "at (s)"))
+    over = []
+    for detector_class in DETECTORS:
+        detector = detector_class(args.rate)
+        events, seconds = replay(detector, samples)
+        cost = max(0.0, seconds - overhead) * 1e6 / len(samples)
+        times = " ".join("{:.1f}".format(i / args.rate) for i in events[:12])
+        if len(events) > 12:
+            times += " ..."
+        print("{:<8} {:>7} {:>10.2f}  {}".format(detector.name, len(events), cost, times))
+        if args.budget_us is not None and cost > args.budget_us:
+            over.append(detector.name)
+        if isinstance(detector, Steps):
+            print("{:<8} {:>7}".format("steps", detector.count))
+    if over:
+        print("over {:.1f}us/sample: {}".format(args.budget_us, ", ".join(over)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""A stand-in base station serving crew vitals to ``wrist.vitals.VitalsFeed``.
+
+Runs on the host with plain CPython::
+
+    python tools/vitals_server.py
+    python tools/vitals_server.py --port 8080 --update 3 --stall-every 10 --stall 8
+
+Every crew feed in ``roster.json`` starts at the roster's pulse and
+respiration and drifts a little every ``--update`` seconds.  Each change bumps
+a version number.  ``GET /vitals?feeds=a,b&since=N`` answers with the feeds
+changed after version N, and ``If-None-Match: "N"`` gets ``304 Not Modified``
+when none of the requested feeds changed.  Connections are kept open between
+requests (HTTP/1.1 keep-alive).
+
+To try the watch's handling of a poor link, ``--stall-every N`` holds every
+Nth answer back for ``--stall`` seconds, ``--fail-every N`` answers every Nth
+request with a 503, and ``--close-every N`` closes the connection after every
+Nth answer.  Each request is logged with its connection number, so reuse
+shows in the log.
+
+Point the simulator at it with ``python -m simulator --vitals
+http://127.0.0.1:8080/vitals``, or a watch at it with ``vitals_url`` in
+``secrets.py``.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Crew:
+    """Vitals per feed, each with the version of its last change."""
+
+    def __init__(self, roster, seed=None):
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.version = 1
+        self.feeds = {}
+        for member in roster:
+            vitals = member.get("vitals", {})
+            if "feed" in vitals:
+                self.feeds[vitals["feed"]] = {"pulse": vitals.get("pulse", 70), "resp": vitals.get("resp", 14),
+                                              "version": 1}
+
+    def drift(self):
+        """Move one feed's vitals a step, as a new version."""
+        with self.lock:
+            name = self.random.choice(sorted(self.feeds))
+            feed = self.feeds[name]
+            feed["pulse"] = max(40, min(180, feed["pulse"] + self.random.choice((-2, -1, 1, 2))))
+            feed["resp"] = max(6, min(40, feed["resp"] + self.random.choice((-1, 0, 0, 1))))
+            self.version += 1
+            feed["version"] = self.version
+
+    def changes(self, names, since):
+        """``(version, {name: values})`` of the named feeds changed after ``since``."""
+        with self.lock:
+            changed = {}
+            latest = 0
+            for name in names:
+                feed = self.feeds.get(name)
+                if feed is None:
+                    continue
+                latest = max(latest, feed["version"])
+                if feed["version"] > since:
+                    changed[name] = {"pulse": feed["pulse"], "resp": feed["resp"]}
+            return max(latest, since), changed
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    server_version = "VitalsStandIn/1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+            self.connection_number = self.server.connections
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            number = server.requests
+        url = urlparse(self.path)
+        if url.path != "/vitals":
+            self._reply(404, b"", number)
+            return
+        query = parse_qs(url.query)
+        names = [name for name in query.get("feeds", [""])[0].split(",") if name]
+        since = int(query.get("since", ["0"])[0])
+        options = server.options
+        if options.stall_every and number % options.stall_every == 0:
+            time.sleep(options.stall)
+        if options.fail_every and number % options.fail_every == 0:
+            self._reply(503, b"", number)
+            return
+        version, changed = server.crew.changes(names, since)
+        if self.headers.get("If-None-Match") == '"{}"'.format(version) and not changed:
+            self._reply(304, b"", number, version)
+            return
+        body = json.dumps({"version": version, "feeds": changed}, separators=(",", ":")).encode()
+        self._reply(200, body, number, version)
+
+    def _reply(self, status, body, number, version=None):
+        close = bool(self.server.options.close_every and number % self.server.options.close_every == 0)
+        try:
+            self.send_response(status)
+            if version is not None:
+                self.send_header("ETag", '"{}"'.format(version))
+            if status != 304:
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+            if close:
+                self.send_header("Connection", "close")
+                self.close_connection = True
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # the watch gave up waiting, as it should after a stall
+            print("conn {:>3} gone before answer {}".format(self.connection_number, number), flush=True)
+            self.close_connection = True
+
+    def log_request(self, code="-", size="-"):
+        print("conn {:>3} {} {}".format(self.connection_number, code, self.path), flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (0.0.0.0 for a real watch)")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--roster", default=os.path.join(ROOT, "roster.json"))
+    parser.add_argument("--update", type=float, default=3, help="seconds between vitals changes")
+    parser.add_argument("--stall-every", type=int, default=0, metavar="N", help="hold back every Nth answer")
+    parser.add_argument("--stall", type=float, default=10, help="seconds a held answer waits")
+    parser.add_argument("--fail-every", type=int, default=0, metavar="N", help="answer every Nth request with 503")
+    parser.add_argument("--close-every", type=int, default=0, metavar="N",
+                        help="close the connection after every Nth answer")
+    parser.add_argument("--seed", type=int, default=None, help="seed for repeatable drift")
+    args = parser.parse_args(argv)
+    with open(args.roster, encoding="utf-8") as roster:
+        crew = Crew(json.load(roster)["crew"], args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    server.crew = crew
+    server.options = args
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.requests = 0
+
+    def drift():
+        while True:
+            time.sleep(args.update)
+            crew.drift()
+    threading.Thread(target=drift, daemon=True).start()
+    print("serving {} feeds on http://{}:{}/vitals".format(len(crew.feeds), args.host, args.port), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print("{} requests on {} connections".format(server.requests, server.connections))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Helpers for the PyPortal wrist computer's code.py."""
@@ -0,0 +1,55 @@
+"""Icons and portraits drawn as tiles of one palette-indexed sprite atlas.
+
+``tools/build_atlas.py`` packs the small BMPs in ``images/`` into
+``images/atlas.bmp`` and writes ``images/atlas.json``, which maps each source
+path to the atlas tiles that draw it.  ``Atlas`` opens the sheet once and
+every TileGrid it makes shares the sheet's bitmap and palette, so showing an
+icon costs no file open and no colour conversion.
+"""
+
+import json
+
+import displayio
+
+
+class Atlas:
+    """A sprite atlas and its manifest.
+
+    Usage::
+
+        atlas = Atlas("/images/atlas.json")
+        if "/images/nav.bmp" in atlas:
+            group.append(atlas.tilegrid("/images/nav.bmp"))
+
+    :param str manifest: Path of the JSON manifest written by the build tool.
+    """
+
+    def __init__(self, manifest):
+        with open(manifest, "r") as manifest_file:
+            index = json.load(manifest_file)
+        self.images = index["images"]
+        self.tile_width = index["tile_width"]
+        self.tile_height = index["tile_height"]
+        # CircuitPython 6 & 7 compatible: the file stays open while tiles are shown
+        self._file = open(index["atlas"], "rb")
+        self.bitmap = displayio.OnDiskBitmap(self._file)
+        self.pixel_shader = getattr(self.bitmap, "pixel_shader", None) or displayio.ColorConverter()
+        self.drawn = 0
+
+    def __contains__(self, path):
+        return path in self.images
+
+    def tilegrid(self, path, **kwargs):
+        """Return a TileGrid showing the image packed from ``path``.
+
+        Extra keyword arguments are passed on to ``displayio.TileGrid``.
+        """
+        image = self.images[path]
+        sprite = displayio.TileGrid(self.bitmap, pixel_shader=self.pixel_shader,
+                                    width=image["width"], height=image["height"],
+                                    tile_width=self.tile_width, tile_height=self.tile_height,
+                                    **kwargs)
+        for i, tile in enumerate(image["tiles"]):
+            sprite[i] = tile
+        self.drawn += 1
+        return sprite
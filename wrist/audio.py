@@ -0,0 +1,183 @@
+"""Sound effects preloaded into RAM and played without blocking.
+
+``PyPortal.play_file`` opens and decodes a WAV from flash and, by default,
+waits for it to finish.  ``Audio`` reads each effect once at startup into a
+``RawSample`` and starts it on the DAC straight away, so a button press
+never waits on file I/O or on the sound itself.
+
+Sounds that arrive while another is playing go into a short voice queue.
+Per-sound rules decide what happens on a clash: an ``interrupt`` sound cuts
+off whatever is playing, and a ``coalesce`` window drops repeats of a sound
+started or queued that recently, so fast taps give one beep, not a backlog.
+"""
+
+import array
+import struct
+import time
+
+import audiocore
+
+
+CHUNK_FRAMES = 256  # frames read at a time when decimating
+
+
+class _Zeros:
+    """``count`` zeros whose length is known up front, so ``array`` makes a
+    sample array of the right size in one allocation and no zero bytes
+    object is made just to be copied."""
+
+    def __init__(self, count):
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for _ in range(self.count):
+            yield 0
+
+
+def load_wav(path, step=1):
+    """Read a 16-bit PCM WAV into a mono ``array('h')``.
+
+    Only the returned array is sized by the sound: a decimated or stereo
+    file is read through a small buffer, a chunk at a time.
+
+    :param int step: Keep every ``step``-th frame, dividing the sample rate
+        and the memory used by ``step``.
+    :return: ``(samples, sample_rate)``.  Stereo files keep the left channel.
+    """
+    with open(path, "rb") as wav:
+        header = wav.read(12)
+        if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ValueError("{} is not a WAV file".format(path))
+        channels = rate = bits = None
+        while True:
+            chunk = wav.read(8)
+            if len(chunk) < 8:
+                raise ValueError("{} has no data chunk".format(path))
+            size = struct.unpack("<I", chunk[4:])[0]
+            if chunk[:4] == b"fmt ":
+                fmt = wav.read(size)
+                _, channels, rate = struct.unpack_from("<HHI", fmt)
+                bits = struct.unpack_from("<H", fmt, 14)[0]
+            elif chunk[:4] == b"data":
+                break
+            else:
+                wav.seek(size, 1)
+        if bits != 16:
+            raise ValueError("{}: only 16-bit WAVs are supported".format(path))
+        stride = channels * step
+        count = size // 2 // stride
+        samples = array.array("h", _Zeros(count))
+        if stride == 1:
+            wav.readinto(samples)
+            return samples, rate
+        buffer = array.array("h", bytes(2 * stride * CHUNK_FRAMES))
+        done = 0
+        while done < count:
+            wav.readinto(buffer)  # the last one may run past the data; only what is needed is kept
+            take = min(CHUNK_FRAMES, count - done)
+            for i in range(take):
+                samples[done + i] = buffer[i * stride]
+            done += take
+    return samples, rate // step
+
+
+class Sound:
+    """One preloaded effect and how it behaves when sounds overlap."""
+
+    def __init__(self, name, sample, duration, interrupt, coalesce):
+        self.name = name
+        self.sample = sample
+        self.duration = duration
+        self.interrupt = interrupt
+        self.coalesce = coalesce
+        self.last_start = None
+        self.plays = 0
+        self.dropped = 0
+
+
+class Audio:
+    """Non-blocking player for preloaded sounds.
+
+    Usage::
+
+        audio = Audio(pyportal.peripherals.audio)
+        audio.load("beep", "/sounds/beep.wav", interrupt=True, coalesce=0.15)
+        audio.play("beep")                  # returns at once
+        scheduler.add("audio", audio.poll, 0.05)
+
+    :param out: An ``audioio.AudioOut``, such as the one ``PyPortal`` opens
+        on ``board.AUDIO_OUT``; the pin cannot be opened twice.
+    :param int queue_size: Sounds that may wait behind the one playing.
+    """
+
+    def __init__(self, out, queue_size=3):
+        self.out = out
+        self.queue_size = queue_size
+        self._sounds = {}
+        self._queue = []
+        self.current = None
+        self.bytes = 0
+
+    def load(self, name, path, step=1, interrupt=False, coalesce=0.0):
+        """Read ``path`` into RAM as sound ``name``.
+
+        :param int step: Sample-rate divider, see :func:`load_wav`.
+        :param bool interrupt: Stop whatever is playing to play this at once.
+        :param float coalesce: Drop a play of this sound if it was started
+            less than this many seconds ago or is already queued.
+        """
+        samples, rate = load_wav(path, step)
+        sample = audiocore.RawSample(samples, sample_rate=rate)
+        self._sounds[name] = Sound(name, sample, len(samples) / rate, interrupt, coalesce)
+        self.bytes += 2 * len(samples)
+
+    def play(self, name):
+        """Play ``name`` now or after the queue ahead of it; never blocks."""
+        sound = self._sounds[name]
+        now = time.monotonic()
+        if sound.coalesce and (sound in self._queue or (
+                sound.last_start is not None and now - sound.last_start < sound.coalesce)):
+            sound.dropped += 1
+            return
+        if sound.interrupt or not self.out.playing:
+            self._start(sound, now)
+        elif len(self._queue) < self.queue_size:
+            self._queue.append(sound)
+        else:
+            sound.dropped += 1
+
+    def _start(self, sound, now):
+        if self.out.playing:
+            self.out.stop()
+        self.out.play(sound.sample)
+        sound.last_start = now
+        sound.plays += 1
+        self.current = sound
+
+    def poll(self):
+        """Start the next queued sound once the current one has finished.
+
+        :return: Seconds until the current sound ends, for a scheduler task.
+        """
+        if self.out.playing:
+            return None
+        self.current = None
+        if self._queue:
+            sound = self._queue.pop(0)
+            self._start(sound, time.monotonic())
+            return sound.duration
+        return None
+
+    def stop(self):
+        """Silence the current sound and forget the queue."""
+        self._queue = []
+        self.out.stop()
+        self.current = None
+
+    def stats(self):
+        """One line: plays and drops per sound, and RAM held by samples."""
+        parts = ["{} {}/{}".format(s.name, s.plays, s.dropped) for s in self._sounds.values()]
+        return "audio: {} bytes, played/dropped {}".format(self.bytes, " ".join(parts))
@@ -0,0 +1,95 @@
+"""Opt-in boot timeline: time and free heap at named points during startup.
+
+``code.py`` calls ``mark`` at the end of each setup phase.  With profiling
+off every call is a no-op, so the marks can stay in place.  With it on,
+``finish`` prints one line per phase, in a form ``tools/boot_diff.py`` can
+read back from a console log, and can also save the timeline as JSON.
+The printed lines look like::
+
+    boot imports 412.0ms +20480B free 98304
+    boot font 88.5ms +6144B free 92160
+
+where the byte count is heap taken by the phase.
+
+The clock starts when this module is imported, so import it before
+anything slow.  A ``gc.collect()`` runs before each heap reading so the
+numbers are comparable.  Its time is left out of the phases and out of
+``at_ms``, which is the sum of the phases so far, and is printed on a line
+of its own after the total, so the total is what boot takes unprofiled.
+"""
+
+import gc
+import json
+import time
+
+_IMPORTED = time.monotonic()
+
+
+class BootTimeline:
+    """Records ``(phase, seconds, free bytes)`` at each ``mark``.
+
+    :param bool enabled: Record anything at all.
+    :param str path: Optional file to save the timeline to as JSON.
+    """
+
+    def __init__(self, enabled=True, path=None):
+        self.enabled = enabled
+        self.path = path
+        self.phases = []
+        self._start = _IMPORTED
+        self._phase_start = _IMPORTED
+        self._elapsed = 0.0  # phases so far, without the profiler's own time
+        self._overhead = 0.0
+        self._free = None
+        if enabled:
+            self._free = self._mem_free()
+
+    @staticmethod
+    def _mem_free():
+        gc.collect()
+        return gc.mem_free()
+
+    def mark(self, name):
+        """End the phase called ``name`` here; the next one starts now."""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        free = self._mem_free()
+        phase = now - self._phase_start
+        self._elapsed += phase
+        self.phases.append({
+            "name": name,
+            "ms": round(phase * 1000, 1),
+            "at_ms": round(self._elapsed * 1000, 1),
+            "mem_free": free,
+            "mem_delta": free - self._free,
+        })
+        self._free = free
+        self._phase_start = time.monotonic()  # leave the collect out of the next phase
+        self._overhead += self._phase_start - now
+
+    def lines(self):
+        """The timeline as the console lines ``tools/boot_diff.py`` reads."""
+        lines = []
+        for phase in self.phases:
+            lines.append("boot {} {:.1f}ms {:+d}B free {}".format(
+                phase["name"], phase["ms"], -phase["mem_delta"], phase["mem_free"]))
+        if self.phases:
+            lines.append("boot total {:.1f}ms".format(self.phases[-1]["at_ms"]))
+            lines.append("boot profiling {:.1f}ms (gc.collect before each reading, not in the total)".format(
+                1000 * self._overhead))
+        return lines
+
+    def finish(self):
+        """Print the timeline, and save it if a path was given."""
+        if not self.enabled:
+            return
+        for line in self.lines():
+            print(line)
+        if self.path:
+            try:
+                with open(self.path, "w") as out:
+                    json.dump({"phases": self.phases, "overhead_ms": round(1000 * self._overhead, 1)}, out)
+            except OSError as error:
+                # CIRCUITPY is read-only to code.py unless boot.py remounts it
+                print("boot timeline not saved:", error)
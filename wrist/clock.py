@@ -0,0 +1,266 @@
+"""Wall-clock time without reading the RTC every frame, and a clock face that
+redraws only the digits that changed.
+
+``RtcClock`` reads the DS3231 once at a second boundary and from then on
+extrapolates from ``time.monotonic()``.  Every ``resync`` seconds it finds the
+boundary again: it polls the RTC from just before the tick it expects until
+the seconds register changes, so the new anchor is good to a few
+milliseconds and not to the RTC's whole-second resolution.  Before the
+first sync the tick could be anywhere in the second, so it is first found
+roughly, with reads ``search`` apart, and then exactly at the next tick,
+rather than by polling the bus every few milliseconds for up to a second.  Comparing the
+RTC against the monotonic clock across syncs gives their rate, which is how
+far the board's oscillator is off; extrapolation uses it, so the displayed
+time stays within milliseconds of the RTC between syncs.
+
+Times are kept as seconds since the anchor day's midnight.  Epoch seconds
+need more than 30 bits, and CircuitPython allocates every such int and
+loses them in a single-precision float, so they only appear at syncs and
+in ``datetime``.
+
+``SevenSegmentClock`` shows ``HH:MM:SS`` as a TileGrid of eight tiles over a
+strip of seven-segment digits drawn once at startup.  A new second is one
+or two tile index writes, with no glyph layout at all.
+"""
+
+import time
+
+import bitmaptools
+import displayio
+
+SEEKING = 0
+SYNCED = 1
+DAY = 86400
+SEEK_TIMEOUT = 5  # seconds to look for a tick before giving up until the next sync
+
+# segments a-g of each digit, bit 0 being a:
+#  aaa
+# f   b
+#  ggg
+# e   c
+#  ddd
+SEGMENTS = (0x3F, 0x06, 0x5B, 0x4F, 0x66, 0x6D, 0x7D, 0x07, 0x7F, 0x6F)
+COLON = 10
+BLANK = 11
+
+
+def _seconds_of_day(when):
+    return when.tm_hour * 3600 + when.tm_min * 60 + when.tm_sec
+
+
+class RtcClock:
+    """Time of day extrapolated from a DS3231 between drift-corrected syncs.
+
+    Usage::
+
+        clock = RtcClock(rtc, resync=600)
+        scheduler.add("clock", clock.sync, 1)
+        face.show(clock.seconds())
+        print(clock.datetime())
+
+    :param rtc: An ``adafruit_ds3231.DS3231``, or anything with a
+        ``datetime`` struct_time.
+    :param float resync: Seconds between syncs with the RTC.
+    :param float poll: Seconds between RTC reads while looking for a tick.
+    :param float lead: How long before the expected tick to start looking.
+    :param float search: Seconds between RTC reads while looking for the
+        first tick, before its place in the second is known.
+    :param float max_error: Error at a sync, in seconds, beyond which the
+        RTC is taken to have been set and the drift is measured afresh.
+    """
+
+    def __init__(self, rtc, resync=600, poll=0.005, lead=0.05, search=0.05, max_error=2):
+        self.rtc = rtc
+        self.resync = resync
+        self.poll = poll
+        self.lead = lead
+        self.search = search
+        self.max_error = max_error
+        self.rate = 1.0  # RTC seconds per monotonic second
+        self.syncs = 0
+        self.reads = 0
+        self.misses = 0
+        self.late = 0
+        self.jumps = 0
+        self.last_error = 0.0
+        self.worst_error = 0.0
+        self._reference = None  # (epoch, monotonic) of the first sync, to measure the rate over
+        self._cached = None
+        self._cached_second = None
+        now = time.monotonic()
+        current = rtc.datetime
+        self.reads += 1
+        # half a second in, the best guess until the first tick is seen
+        self._anchor(current, now, 0.5)
+        self.state = SEEKING
+        self._searching = True
+        self._seek_start = now
+        self._last_second = current.tm_sec
+        self._last_read = now
+
+    def _anchor(self, current, at, fraction=0.0):
+        seconds = _seconds_of_day(current)
+        self._day_start = time.mktime(current) - seconds
+        self._anchor_seconds = seconds + fraction
+        self._anchor_time = at
+
+    def seconds(self, at=None):
+        """Seconds since midnight of the day of the last sync, a float.
+
+        It runs past ``86400`` after midnight until the next sync.
+        """
+        if at is None:
+            at = time.monotonic()
+        return self._anchor_seconds + (at - self._anchor_time) * self.rate
+
+    def datetime(self):
+        """The current time as a ``time.struct_time``, made once per second."""
+        second = int(self.seconds())
+        if second != self._cached_second:
+            self._cached = time.localtime(self._day_start + second)
+            self._cached_second = second
+        return self._cached
+
+    def sync(self):
+        """Scheduler task: find the RTC's next tick; returns seconds until the next run."""
+        now = time.monotonic()
+        if self.state == SYNCED:
+            self.state = SEEKING
+            self._seek_start = now
+            self._last_second = None
+            wait = 1 - self.seconds(now) % 1 - self.lead
+            if wait > 0:
+                return wait
+        current = self.rtc.datetime
+        self.reads += 1
+        if self._last_second is not None and current.tm_sec != self._last_second:
+            if now - self._last_read <= 2 * self.poll:
+                # the tick came between the last read and this one
+                self._synced(current, (self._last_read + now) / 2)
+                self.state = SYNCED
+                return self.resync
+            if self._searching:
+                if now - self._last_read > 2 * self.search:
+                    # too long since the last read (boot, say) to tell where it fell
+                    self._last_second = current.tm_sec
+                    self._last_read = now
+                    return self.search
+                # found roughly; the best guess until the next tick places it
+                self._searching = False
+                self._anchor(current, (self._last_read + now) / 2)
+            else:
+                # other tasks held this run back too long to place the tick; try the next one
+                self.late += 1
+            self._last_second = None
+            return max(self.poll, 1 - (now - self._last_read) - self.lead)
+        if now - self._seek_start > SEEK_TIMEOUT:
+            # no usable tick: keep extrapolating and try again later
+            self.misses += 1
+            self.state = SYNCED
+            return self.resync
+        self._last_second = current.tm_sec
+        self._last_read = now
+        return self.search if self._searching else self.poll
+
+    def _synced(self, current, edge):
+        epoch = time.mktime(current)
+        error = self.seconds(edge) - (epoch - self._day_start)
+        self.syncs += 1
+        if self._reference is None or abs(error) > self.max_error:
+            if self._reference is not None:
+                self.jumps += 1
+                self.rate = 1.0
+            self._reference = (epoch, edge)
+            error = 0.0
+        elif edge - self._reference[1] > 0:
+            self.rate = (epoch - self._reference[0]) / (edge - self._reference[1])
+        self.last_error = error
+        if abs(error) > self.worst_error:
+            self.worst_error = abs(error)
+        self._anchor(current, edge)
+
+    @property
+    def drift_ppm(self):
+        """How much faster the RTC runs than the monotonic clock, in ppm."""
+        return (self.rate - 1) * 1000000
+
+    def stats(self):
+        """One line: syncs, RTC reads, errors found at syncs and measured drift."""
+        return "clock: {} syncs, {} reads, {} late, {} misses, {} jumps, last error {:+.1f}ms, worst {:.1f}ms, drift {:+.0f}ppm".format(
+            self.syncs, self.reads, self.late, self.misses, self.jumps, 1000 * self.last_error,
+            1000 * self.worst_error, self.drift_ppm)
+
+
+class SevenSegmentClock:
+    """``HH:MM:SS`` in seven-segment digits, one tile per character.
+
+    Usage::
+
+        face = SevenSegmentClock(x=5, y=2, color=0x00FF00)
+        group.append(face.grid)
+        face.show(clock.seconds())
+
+    :param int x: Left edge.
+    :param int y: Top edge.
+    :param int width: Width of each character cell in pixels.
+    :param int height: Height of a digit in pixels.
+    :param int thickness: Segment thickness in pixels.
+    :param int color: Segment colour; the background is transparent.
+    """
+
+    def __init__(self, x=0, y=0, width=14, height=26, thickness=3, color=0xFFFFFF):
+        self.strip = displayio.Bitmap(width * (BLANK + 1), height, 2)
+        for digit, segments in enumerate(SEGMENTS):
+            self._draw_digit(digit * width + 1, width - 3, height, thickness, segments)
+        middle = width * COLON + (width - thickness) // 2
+        for top in (height // 3 - thickness // 2, 2 * height // 3 - thickness // 2):
+            bitmaptools.fill_region(self.strip, middle, top, middle + thickness, top + thickness, 1)
+        self.palette = displayio.Palette(2)
+        self.palette[1] = color
+        self.palette.make_transparent(0)
+        self.grid = displayio.TileGrid(self.strip, pixel_shader=self.palette, width=8, height=1,
+                                       tile_width=width, tile_height=height, default_tile=BLANK, x=x, y=y)
+        self._shown = bytearray([BLANK] * 8)
+        self._second = None
+        self.writes = 0
+
+    def _draw_digit(self, left, width, height, thickness, segments):
+        right = left + width
+        middle = height // 2
+        strip = self.strip
+        rectangles = (
+            (left + thickness, 0, right - thickness, thickness),                     # a
+            (right - thickness, thickness, right, middle),                           # b
+            (right - thickness, middle, right, height - thickness),                  # c
+            (left + thickness, height - thickness, right - thickness, height),       # d
+            (left, middle, left + thickness, height - thickness),                    # e
+            (left, thickness, left + thickness, middle),                             # f
+            (left + thickness, middle - thickness // 2, right - thickness, middle - thickness // 2 + thickness),  # g
+        )
+        for bit, (x1, y1, x2, y2) in enumerate(rectangles):
+            if segments & (1 << bit):
+                bitmaptools.fill_region(strip, x1, y1, x2, y2, 1)
+
+    def _set(self, position, tile):
+        if self._shown[position] != tile:
+            self._shown[position] = tile
+            self.grid[position] = tile
+            self.writes += 1
+
+    def show(self, seconds):
+        """Show the time ``seconds`` after midnight, touching only changed tiles."""
+        second = int(seconds) % DAY
+        if second == self._second:
+            return
+        self._second = second
+        hour = second // 3600
+        minute = second // 60 % 60
+        second %= 60
+        self._set(0, hour // 10)
+        self._set(1, hour % 10)
+        self._set(2, COLON)
+        self._set(3, minute // 10)
+        self._set(4, minute % 10)
+        self._set(5, COLON)
+        self._set(6, second // 10)
+        self._set(7, second % 10)
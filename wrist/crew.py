@@ -0,0 +1,107 @@
+"""Crew roster loading and the single crew view every member is shown in.
+
+The roster lives in a JSON file so adding a crew member is a data change::
+
+    {"crew": [{"name": "Johnson",
+               "portrait": "/images/....bmp",
+               "items": ["/images/nav.bmp", ...],
+               "vitals": {"feed": "johnson", "pulse": 52, "resp": 12}}]}
+
+``CrewView`` builds one set of widgets and repopulates it for whichever
+member is selected, so RAM use does not grow with the roster.
+"""
+
+import json
+
+import displayio
+from adafruit_display_text.label import Label
+
+from wrist.clock import SevenSegmentClock
+from wrist.history import Sparkline
+
+TABS_X = 5
+TABS_Y = 5
+TEXT_COLOR = 0xc29542
+NAME_COLOR = 0xFFFFFF
+PORTRAIT_POSITION = (0, 50)
+# Up to five item icons: four across next to the portrait, one below
+ITEM_POSITIONS = ((65, 55), (100, 55), (135, 55), (170, 55), (65, 85))
+# One sparkline beside each of the four vitals lines
+SPARK_X = 140
+SPARK_Y = (122, 143, 164, 185)
+SPARK_WIDTH = 66
+SPARK_HEIGHT = 16
+SPARK_POINTS = 30
+
+
+def load_roster(path):
+    """Read the crew list from a roster JSON file."""
+    with open(path, "r") as roster_file:
+        roster = json.load(roster_file)
+    crew = roster["crew"]
+    for member in crew:
+        member.setdefault("items", [])
+        member.setdefault("vitals", {})
+        if len(member["items"]) > len(ITEM_POSITIONS):
+            raise ValueError("{} has more than {} items".format(member["name"], len(ITEM_POSITIONS)))
+    return crew
+
+
+class CrewView:
+    """Portrait, item icons, clock, vitals, their sparklines and name for one
+    crew member.
+
+    :param font: Font for all of the view's labels.
+    :param set_image: ``set_image(group, filename)`` used to (re)fill the
+        portrait and icon groups.
+    """
+
+    def __init__(self, font, set_image):
+        self._set_image = set_image
+        self.member = None
+        self.group = displayio.Group()
+        self.portrait = displayio.Group(x=PORTRAIT_POSITION[0], y=PORTRAIT_POSITION[1])
+        self.group.append(self.portrait)
+        self.items = []
+        for x, y in ITEM_POSITIONS:
+            item = displayio.Group(x=x, y=y)
+            self.items.append(item)
+            self.group.append(item)
+        self.clock = SevenSegmentClock(x=TABS_X, y=TABS_Y - 3, color=TEXT_COLOR)
+        self.group.append(self.clock.grid)
+        self.date = Label(font, x=TABS_X, y=TABS_Y+30, color=TEXT_COLOR)
+        self.group.append(self.date)
+        self.vitals = Label(font, x=TABS_X, y=130, color=TEXT_COLOR)
+        self.group.append(self.vitals)
+        self.sparklines = []
+        for y in SPARK_Y:
+            sparkline = Sparkline(SPARK_WIDTH, SPARK_HEIGHT, SPARK_POINTS, x=SPARK_X, y=y, color=TEXT_COLOR)
+            self.sparklines.append(sparkline)
+            self.group.append(sparkline.grid)
+        self.status = Label(font, x=TABS_X, y=90, color=TEXT_COLOR)
+        self.group.append(self.status)
+        self.name = Label(font, x=5, y=45, color=NAME_COLOR)
+        self.group.append(self.name)
+
+    def show_member(self, member):
+        """Repopulate the view's images for ``member``.
+
+        Text fields are left to the caller's label updater, which skips
+        writes whose text has not changed.
+        """
+        if member is self.member:
+            return
+        self.member = member
+        self._set_image(self.portrait, member["portrait"])
+        for i, item in enumerate(self.items):
+            filename = member["items"][i] if i < len(member["items"]) else None
+            self._set_image(item, filename)
+
+    def clear(self):
+        """Drop the member's images, so the view holds no bitmaps."""
+        self.member = None
+        self._set_image(self.portrait, None)
+        for item in self.items:
+            self._set_image(item, None)
+        for sparkline in self.sparklines:
+            sparkline.clear()
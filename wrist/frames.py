@@ -0,0 +1,97 @@
+"""Frame pacing: one explicit display refresh per frame at a target rate.
+
+With ``auto_refresh`` on, displayio pushes pixels over SPI whenever anything
+changes, in the middle of touch sampling or a sensor read.  ``FrameGovernor``
+turns it off, runs the frame's update functions so all label and group
+changes of one frame land together, then refreshes once.  It runs as a
+scheduler task every ``1 / fps`` seconds, so redraws only take the CPU
+between the other tasks.
+
+A frame whose updates overrun the frame time skips its refresh and lets the
+next frame carry the changes, and frames the task was too late to run at
+all are counted as dropped too.  A frame is never skipped twice in a row,
+so the screen cannot freeze under constant load.
+"""
+
+import time
+
+
+class FrameGovernor:
+    """Batches display changes into paced, explicit refreshes.
+
+    Usage::
+
+        frames = FrameGovernor(board.DISPLAY, splash, fps=10)
+        frames.add(update_display)
+        scheduler.add("display", frames.frame, frames.interval)
+
+    :param display: The ``displayio.Display``.
+    :param root: Group to show; shown once here, never again per frame.
+    :param float fps: Target frames per second.
+    """
+
+    def __init__(self, display, root=None, fps=10):
+        self.display = display
+        self.interval = 1 / fps
+        self._updates = []
+        self._after = []
+        display.auto_refresh = False
+        if root is not None:
+            display.show(root)
+        self._due = None
+        self._skipped_last = False
+        self.frames = 0
+        self.dropped = 0
+        self.refresh_time = 0.0
+        self.longest_refresh = 0.0
+        self._window = (time.monotonic(), 0)
+
+    def set_fps(self, fps):
+        """Change the target rate; the display task's period must follow ``interval``."""
+        self.interval = 1 / fps
+        self._due = None
+
+    def add(self, update):
+        """Run ``update()`` at the start of every frame, before the refresh."""
+        self._updates.append(update)
+
+    def add_after(self, shown):
+        """Run ``shown()`` after every refresh, once the frame is on screen."""
+        self._after.append(shown)
+
+    def frame(self):
+        """Run the updates and refresh the display once."""
+        start = time.monotonic()
+        if self._due is not None and start - self._due >= self.interval:
+            self.dropped += int((start - self._due) / self.interval)
+        self._due = start + self.interval
+        for update in self._updates:
+            update()
+        now = time.monotonic()
+        if now - start > self.interval and not self._skipped_last:
+            # over budget: leave the refresh to the next frame
+            self.dropped += 1
+            self._skipped_last = True
+            return
+        self._skipped_last = False
+        self.display.refresh()
+        took = time.monotonic() - now
+        self.refresh_time += took
+        if took > self.longest_refresh:
+            self.longest_refresh = took
+        self.frames += 1
+        for shown in self._after:
+            shown()
+
+    def fps(self):
+        """Frames refreshed per second since the last call."""
+        now = time.monotonic()
+        start, frames = self._window
+        self._window = (now, self.frames)
+        return (self.frames - frames) / ((now - start) or 1)
+
+    def stats(self):
+        """One line: achieved rate against target, refresh time and drops."""
+        return "frames: {:.1f} fps (target {:.0f}), refresh avg {:.1f}ms max {:.1f}ms, {} dropped".format(
+            self.fps(), 1 / self.interval, 1000 * self.refresh_time / max(self.frames, 1),
+            1000 * self.longest_refresh, self.dropped)
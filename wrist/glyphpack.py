@@ -0,0 +1,80 @@
+"""Fonts loaded from a glyph pack instead of a BDF file.
+
+``tools/build_font.py`` compiles just the glyphs the app shows into a small
+binary pack.  ``GlyphPack`` reads it in one go, keeps the packed bitmaps,
+and builds a glyph's ``displayio.Bitmap`` the first time it is asked for,
+so there is no BDF text to scan on the device.  It offers the same
+``get_glyph``/``get_bounding_box``/``load_glyphs`` interface as the fonts
+from ``adafruit_bitmap_font`` and can be handed straight to a Label.
+"""
+
+import struct
+
+import displayio
+from fontio import Glyph
+
+MAGIC = b"WGLY"
+HEADER = "<4sBhhhhhhH"
+ENTRY = "<HBBbbbbI"
+
+
+class GlyphPack:
+    """A font read from a ``.glyphs`` pack.
+
+    :param str path: Pack written by ``tools/build_font.py``.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as pack:
+            data = pack.read()
+        magic, _, self.ascent, self.descent, width, height, x, y, count = struct.unpack_from(HEADER, data)
+        if magic != MAGIC:
+            raise ValueError("{} is not a glyph pack".format(path))
+        self._boundingbox = (width, height, x, y)
+        header_size = struct.calcsize(HEADER)
+        entry_size = struct.calcsize(ENTRY)
+        self._bitmaps = memoryview(data)[header_size + count * entry_size:]
+        self._entries = {}
+        for i in range(count):
+            entry = struct.unpack_from(ENTRY, data, header_size + i * entry_size)
+            self._entries[entry[0]] = entry
+        self._glyphs = {}
+        self.misses = 0
+
+    def get_bounding_box(self):
+        """Return the font's maximum (width, height, x offset, y offset)."""
+        return self._boundingbox
+
+    def get_glyph(self, code_point):
+        """Return the glyph for ``code_point``, or None if it was not packed."""
+        glyph = self._glyphs.get(code_point)
+        if glyph is None:
+            if code_point not in self._entries:
+                self.misses += 1
+                return None
+            glyph = self._build(self._entries[code_point])
+            self._glyphs[code_point] = glyph
+        return glyph
+
+    def _build(self, entry):
+        _, width, height, dx, dy, shift_x, shift_y, offset = entry
+        bitmap = displayio.Bitmap(width, height, 2)
+        row_bytes = (width + 7) // 8
+        bits = self._bitmaps
+        for y in range(height):
+            row = offset + y * row_bytes
+            for x in range(width):
+                if bits[row + (x >> 3)] & (0x80 >> (x & 7)):
+                    bitmap[x, y] = 1
+        return Glyph(bitmap, 0, width, height, dx, dy, shift_x, shift_y)
+
+    def load_glyphs(self, code_points=None):
+        """Build glyph bitmaps ahead of use; all packed glyphs by default."""
+        if code_points is None:
+            code_points = self._entries
+        elif isinstance(code_points, int):
+            code_points = (code_points,)
+        elif isinstance(code_points, (str, bytes)):
+            code_points = [c if isinstance(c, int) else ord(c) for c in code_points]
+        for code_point in code_points:
+            self.get_glyph(code_point)
@@ -0,0 +1,124 @@
+"""Heap allocation and garbage collections, metered per task and per loop pass.
+
+CircuitPython never frees memory until the heap fills up; then a collection
+stops everything for several milliseconds while it marks and sweeps, and the
+clock visibly stutters.  How often that happens depends only on how many bytes
+the loop allocates, so ``HeapMeter`` reads ``gc.mem_alloc()`` around every
+scheduler task run and charges the difference to the task.  The sum over one
+pass of the scheduler is the allocation per loop iteration.
+
+A reading that went down means a collection ran during the task.  That run
+counts as a collection and its bytes as unknown, since what the collection
+freed cannot be told apart from what the task allocated.
+
+Budgets are in bytes per second per task, checked over each stats window.
+A task over its budget is flagged in ``stats``, and with ``strict`` set the
+check raises instead, which is how a hot path is held to zero allocations
+while developing.
+"""
+
+import gc
+import time
+
+RUNS = 0
+BYTES = 1
+MOST = 2
+COLLECTIONS = 3
+WINDOW = 4
+OVER = 5
+
+
+class HeapMeter:
+    """Bytes allocated and collections seen, for each task and each pass.
+
+    Usage::
+
+        heap = HeapMeter({"display": 0, "touch": 0})
+        scheduler.meter = heap
+        for line in heap.stats():
+            print(line)
+
+    :param dict budgets: Bytes per second each named task may allocate.
+    :param bool strict: Raise ``RuntimeError`` when a budget is exceeded,
+        instead of only flagging it.
+    """
+
+    def __init__(self, budgets=None, strict=False):
+        self.budgets = dict(budgets or {})
+        self.strict = strict
+        self._usage = {}  # task name -> [runs, bytes, most, collections, window bytes, overs]
+        self._mark = 0
+        self._pass = 0
+        self.passes = 0
+        self.bytes = 0
+        self.most = 0  # largest single pass
+        self.collections = 0
+        self._window = (time.monotonic(), 0, 0)
+
+    def start(self):
+        """Take a heap reading before a task runs."""
+        self._mark = gc.mem_alloc()
+
+    def stop(self, name):
+        """Charge what was allocated since ``start`` to the task ``name``."""
+        used = gc.mem_alloc() - self._mark
+        usage = self._usage.get(name)
+        if usage is None:
+            usage = self._usage[name] = [0, 0, 0, 0, 0, 0]
+        usage[RUNS] += 1
+        if used < 0:
+            usage[COLLECTIONS] += 1
+            self.collections += 1
+            return
+        usage[BYTES] += used
+        usage[WINDOW] += used
+        if used > usage[MOST]:
+            usage[MOST] = used
+        self._pass += used
+
+    def end_pass(self):
+        """Close one pass of the scheduler loop."""
+        self.passes += 1
+        self.bytes += self._pass
+        if self._pass > self.most:
+            self.most = self._pass
+        self._pass = 0
+
+    def check(self, elapsed):
+        """Compare every task's window against its budget and start a new window.
+
+        :return: Names of the tasks over budget.
+        """
+        over = []
+        for name, usage in self._usage.items():
+            budget = self.budgets.get(name)
+            if budget is not None and usage[WINDOW] > budget * elapsed:
+                usage[OVER] += 1
+                over.append(name)
+            usage[WINDOW] = 0
+        if over and self.strict:
+            raise RuntimeError("over heap budget: " + ", ".join(over))
+        return over
+
+    def stats(self):
+        """One line for the loop, then one per task that allocated, with rates
+        over the time since the last call and budgets checked against them."""
+        now = time.monotonic()
+        start, passes, total = self._window
+        elapsed = (now - start) or 1
+        window = [(name, usage[WINDOW]) for name, usage in self._usage.items()]
+        over = self.check(elapsed)
+        self._window = (now, self.passes, self.bytes)
+        count = self.passes - passes
+        lines = ["heap: {:.0f} B/s, {:.1f} B/pass over {} passes, max {} B/pass, {} collections, {} free".format(
+            (self.bytes - total) / elapsed, (self.bytes - total) / max(count, 1), count, self.most,
+            self.collections, gc.mem_free())]
+        for name, used in sorted(window, key=lambda item: -item[1]):
+            usage = self._usage[name]
+            if not usage[BYTES] and not usage[COLLECTIONS] and name not in self.budgets:
+                continue
+            budget = self.budgets.get(name)
+            lines.append("heap {:<12} {:>7.0f} B/s  max {:>5} B/run  {:>2} collections  budget {}{}".format(
+                name, used / elapsed, usage[MOST], usage[COLLECTIONS],
+                "-" if budget is None else budget, "  OVER x{}".format(usage[OVER]) if name in over else ""))
+        return lines
@@ -0,0 +1,211 @@
+"""Fixed-size vitals history with per-second, per-minute and per-hour rollups.
+
+Every metric gets one ``History``: a few resolution levels, each a ring of
+min/max/mean slots held in ``array`` buffers allocated up front.  ``add``
+folds a reading into the open bucket of every level and, when a bucket's
+period is over, writes it to that level's ring, so the rollups are always
+current and nothing is recomputed on read.  Memory per history is fixed at
+construction and reported by ``nbytes``; no objects are created per sample
+when values are integers (use ``typecode="h"`` with a scale for readings
+with a fractional part).
+
+``Sparkline`` draws the newest slots of one level into a bitmap of its own,
+and only when the ring has moved on and the line has changed shape.
+"""
+
+import array
+import struct
+
+import bitmaptools
+import displayio
+
+# (seconds per slot, slots): a minute of seconds, two hours of minutes, two days of hours
+LEVELS = ((1, 60), (60, 120), (3600, 48))
+
+
+class Ring:
+    """``capacity`` slots of min, max and mean in three arrays."""
+
+    def __init__(self, capacity, typecode):
+        self.capacity = capacity
+        self.itemsize = struct.calcsize(typecode)
+        self.min = array.array(typecode, bytes(capacity * self.itemsize))
+        self.max = array.array(typecode, bytes(capacity * self.itemsize))
+        self.mean = array.array(typecode, bytes(capacity * self.itemsize))
+        self.head = 0  # next slot to write
+        self.count = 0
+        self.pushes = 0  # slots ever written, to tell when the ring has moved on
+
+    def push(self, low, high, mean):
+        i = self.head
+        self.min[i] = low
+        self.max[i] = high
+        self.mean[i] = mean
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self.pushes += 1
+
+    def latest(self, n, series=None):
+        """Yield up to ``n`` of the newest values of ``series``, oldest first."""
+        if series is None:
+            series = self.mean
+        n = min(n, self.count)
+        start = self.head - n
+        for i in range(n):
+            yield series[(start + i) % self.capacity]
+
+    @property
+    def nbytes(self):
+        return 3 * self.capacity * self.itemsize
+
+
+class History:
+    """One metric's rollups at every level of ``levels``.
+
+    Usage::
+
+        temperature = History("h", scale=10)
+        temperature.add(time.monotonic(), 73.4)      # stored as 734
+        for value in temperature.latest(0, 30):      # last 30 seconds
+            ...
+
+    :param str typecode: ``array`` typecode for stored values, such as
+        ``"h"``, ``"H"`` or ``"f"``.
+    :param scale: Readings are multiplied by this before storing and divided
+        by it when read back, to keep a decimal place in an ``"h"`` array.
+    :param levels: ``(seconds per slot, slots)`` pairs, finest first.
+    """
+
+    def __init__(self, typecode="h", scale=1, levels=LEVELS):
+        self.scale = scale
+        self._integer = typecode != "f"
+        self.periods = [period for period, _ in levels]
+        self.rings = [Ring(slots, typecode) for _, slots in levels]
+        # open bucket per level: sample count, sum, min, max
+        acc_type = "l" if self._integer else "f"
+        self._acc_size = struct.calcsize(acc_type)
+        self._acc = array.array(acc_type, bytes(4 * len(levels) * self._acc_size))
+        self._ends = [None] * len(levels)
+
+    @property
+    def nbytes(self):
+        """Bytes of sample storage, fixed for the life of the history."""
+        return sum(ring.nbytes for ring in self.rings) + len(self._acc) * self._acc_size
+
+    def add(self, now, value):
+        """Fold a reading taken at ``now`` into every level."""
+        if self._integer:
+            value = int(value * self.scale)
+        acc = self._acc
+        for level, period in enumerate(self.periods):
+            a = level * 4
+            end = self._ends[level]
+            if end is None or now >= end:
+                if end is not None and acc[a]:
+                    if self._integer:
+                        mean = acc[a + 1] // acc[a]
+                    else:
+                        mean = acc[a + 1] / acc[a]
+                    self.rings[level].push(acc[a + 2], acc[a + 3], mean)
+                self._ends[level] = (now // period + 1) * period
+                acc[a] = 0
+                acc[a + 1] = 0
+            if acc[a] == 0 or value < acc[a + 2]:
+                acc[a + 2] = value
+            if acc[a] == 0 or value > acc[a + 3]:
+                acc[a + 3] = value
+            acc[a] += 1
+            acc[a + 1] += value
+
+    def latest(self, level, n, series="mean"):
+        """Yield up to ``n`` of the newest slots of ``level``, oldest first,
+        in reading units.
+
+        :param str series: ``"mean"``, ``"min"`` or ``"max"``.
+        """
+        ring = self.rings[level]
+        for value in ring.latest(n, getattr(ring, series)):
+            yield value / self.scale if self.scale != 1 else value
+
+
+class Sparkline:
+    """The newest means of one level of a ``History``, drawn as a line into a
+    bitmap that lasts as long as the sparkline.
+
+    ``plot`` does nothing while the level's ring has had no new slot since
+    the last drawing, and leaves the bitmap alone when the new points land on
+    the same pixels, so a steady reading costs neither drawing nor refresh.
+
+    Usage::
+
+        sparkline = Sparkline(66, 16, 30, x=140, y=122, color=0x00FF00)
+        group.append(sparkline.grid)
+        sparkline.plot(temperature)        # from a scheduler task
+
+    :param int width: Width in pixels.
+    :param int height: Height in pixels, at most 256.
+    :param int points: Number of newest slots shown.
+    :param int x: Left edge.
+    :param int y: Top edge.
+    :param int color: Line colour; the background is transparent.
+    """
+
+    def __init__(self, width, height, points, x=0, y=0, color=0xFFFFFF):
+        self.width = width
+        self.height = height
+        self.points = points
+        self.bitmap = displayio.Bitmap(width, height, 2)
+        palette = displayio.Palette(2)
+        palette[1] = color
+        palette.make_transparent(0)
+        self.grid = displayio.TileGrid(self.bitmap, pixel_shader=palette, x=x, y=y)
+        self._ys = bytearray(points)  # row of each point, newest last
+        self._shown = bytearray(points)
+        self._shown_count = 0
+        self._ring = None
+        self._pushes = None
+        self.draws = 0
+        self.skips = 0
+
+    def plot(self, history, level=0):
+        """Show the newest means of ``history``'s ``level``, if they changed."""
+        ring = history.rings[level]
+        if ring is self._ring and ring.pushes == self._pushes:
+            self.skips += 1
+            return
+        self._ring = ring
+        self._pushes = ring.pushes
+        count = min(self.points, ring.count)
+        # autoscaled to the points shown, top is the highest
+        low = high = None
+        for value in ring.latest(count):
+            if low is None or value < low:
+                low = value
+            if high is None or value > high:
+                high = value
+        bottom = self.height - 1
+        ys = self._ys
+        i = 0
+        for value in ring.latest(count):
+            ys[i] = bottom // 2 if high == low else bottom - int((value - low) * bottom // (high - low))
+            i += 1
+        for i in range(count, self.points):
+            ys[i] = 0
+        if count == self._shown_count and ys == self._shown:
+            self.skips += 1
+            return
+        self._ys, self._shown = self._shown, ys
+        self._shown_count = count
+        self.bitmap.fill(0)
+        right = self.width - 1
+        for i in range(1, count):
+            bitmaptools.draw_line(self.bitmap, (i - 1) * right // (count - 1), ys[i - 1],
+                                  i * right // (count - 1), ys[i], 1)
+        self.draws += 1
+
+    def clear(self):
+        """Blank the sparkline; the next ``plot`` draws whatever it is given."""
+        self.bitmap.fill(0)
+        self._ring = None
+        self._shown_count = 0
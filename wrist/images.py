@@ -0,0 +1,110 @@
+"""Shared, reference-counted bitmaps for ``set_image``.
+
+Several crew members carry the same item icons, and opening a BMP costs a
+FAT handle plus a header parse each time.  ``ImageCache`` keeps one
+``OnDiskBitmap`` and pixel shader per path and hands out TileGrids that share
+them.  Bitmaps no TileGrid is using stay cached, oldest-used first in line for
+eviction, until the image data they cover exceeds the memory budget; evicting
+one closes its file.
+"""
+
+import displayio
+
+
+class _Image:
+    """One open BMP, its bitmap and the TileGrids currently showing it."""
+
+    def __init__(self, path):
+        self.path = path
+        # CircuitPython 6 & 7 compatible: the file must stay open while shown
+        self.file = open(path, "rb")
+        self.bitmap = displayio.OnDiskBitmap(self.file)
+        self.pixel_shader = getattr(self.bitmap, "pixel_shader", None) or displayio.ColorConverter()
+        self.size = self._size()
+        self.refs = 0
+
+    def _size(self):
+        # bits per pixel sits at offset 28 of the BMP header
+        self.file.seek(28)
+        bpp = self.file.read(1)[0]
+        return self.bitmap.width * self.bitmap.height * bpp // 8
+
+    def close(self):
+        self.file.close()
+
+
+class ImageCache:
+    """Bitmaps keyed by path, shared between every TileGrid showing them.
+
+    Usage::
+
+        images = ImageCache(budget=64 * 1024)
+        sprite = images.tilegrid("/images/head_set.bmp")
+        group.append(sprite)
+        ...
+        images.release(group.pop())
+
+    :param int budget: Bytes of image data to keep cached for bitmaps that
+        are not currently shown.  Bitmaps in use never count against it.
+    """
+
+    def __init__(self, budget=64 * 1024):
+        self.budget = budget
+        self._images = {}
+        self._unused = []  # paths with no TileGrids, least recently used first
+        self._shown = {}  # id(TileGrid) -> _Image
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get(self, path):
+        image = self._images.get(path)
+        if image is None:
+            self.misses += 1
+            image = _Image(path)
+            self._images[path] = image
+        else:
+            self.hits += 1
+            if image.refs == 0:
+                self._unused.remove(path)
+        image.refs += 1
+        return image
+
+    def tilegrid(self, path, **kwargs):
+        """Return a new TileGrid showing ``path``, sharing its bitmap.
+
+        Extra keyword arguments are passed on to ``displayio.TileGrid``.
+        """
+        image = self._get(path)
+        sprite = displayio.TileGrid(image.bitmap, pixel_shader=image.pixel_shader, **kwargs)
+        self._shown[id(sprite)] = image
+        return sprite
+
+    def release(self, sprite):
+        """Forget ``sprite``; its bitmap is kept until the budget needs the room.
+
+        TileGrids that did not come from this cache are ignored.
+        """
+        image = self._shown.pop(id(sprite), None)
+        if image is None:
+            return
+        image.refs -= 1
+        if image.refs == 0:
+            self._unused.append(image.path)
+            self._trim()
+
+    def _trim(self):
+        cached = 0
+        for path in self._unused:
+            cached += self._images[path].size
+        while cached > self.budget and self._unused:
+            image = self._images.pop(self._unused.pop(0))
+            cached -= image.size
+            image.close()
+            self.evictions += 1
+
+    def stats(self):
+        """One line: cache hits against file opens, and what is held open."""
+        total = self.hits + self.misses
+        return "images: {} opens avoided of {} ({:.0f}% hit), {} files open, {} evicted".format(
+            self.hits, total, 100 * self.hits / total if total else 0, len(self._images), self.evictions)
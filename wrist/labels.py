@@ -0,0 +1,166 @@
+"""Dirty-tracked Label updates for views that share the same fields.
+
+Several views carry the same kind of label (a clock, a vitals readout), but
+only one view is on screen at a time.  ``LabelUpdater`` only writes the live
+view's label, and only when the text differs from what that label already
+shows, because every ``Label.text`` write re-lays-out all of its glyphs.
+
+Text that is rebuilt every frame, like the clock, can be written into a
+``TextBuffer`` instead of formatted into a new string.  The buffer is a fixed
+bytearray rewritten in place, and a new string is only made when a byte
+actually changed, so an unchanged frame allocates nothing at all.
+"""
+
+import time
+
+
+class LabelUpdater:
+    """Routes named text fields to the labels of whichever view is live.
+
+    Usage::
+
+        labels = LabelUpdater()
+        labels.add(1, "clock", home1_label)
+        labels.add(2, "clock", home1_label2)
+        labels.show(1)
+        labels.set("clock", "12:00:00")  # only home1_label is written
+    """
+
+    def __init__(self):
+        self._views = {}
+        self._fields = {}
+        self._shown = {}
+        self.live = None
+        self.writes = 0
+        self.unchanged = 0
+        self.hidden = 0
+        self._window = (time.monotonic(), 0, 0)
+
+    def add(self, view, name, label, text=None):
+        """Register ``label`` as field ``name`` of ``view``.
+
+        :param text: Optional constant text, written once now.
+        """
+        self._views.setdefault(view, {})[name] = label
+        self._fields[name] = self._fields.get(name, 0) + 1
+        if text is not None:
+            self._write(label, text)
+
+    def remove(self, view):
+        """Forget every label of ``view``, e.g. when the view is torn down."""
+        for name, label in self._views.pop(view, {}).items():
+            self._fields[name] -= 1
+            self._shown.pop(label, None)
+
+    def show(self, view):
+        """Make ``view`` the live view; its labels get the next ``set`` calls."""
+        self.live = view
+
+    def set(self, name, text):
+        """Show ``text`` in field ``name`` of the live view, if it changed."""
+        fields = self._views.get(self.live)
+        label = fields.get(name) if fields else None
+        self.hidden += self._fields.get(name, 0) - (label is not None)
+        if label is None:
+            return
+        if self._shown.get(label) == text:
+            self.unchanged += 1
+            return
+        self._write(label, text)
+
+    def _write(self, label, text):
+        label.text = text
+        self._shown[label] = text
+        self.writes += 1
+
+    @property
+    def skipped(self):
+        """Label writes avoided, both unchanged text and hidden views."""
+        return self.unchanged + self.hidden
+
+    def rates(self):
+        """Return (writes per second, skipped per second) since the last call."""
+        now = time.monotonic()
+        start, writes, skipped = self._window
+        self._window = (now, self.writes, self.skipped)
+        elapsed = (now - start) or 1
+        return (self.writes - writes) / elapsed, (self.skipped - skipped) / elapsed
+
+
+class TextBuffer:
+    """Text built into a preallocated bytearray, a str only when it changed.
+
+    Usage::
+
+        clock = TextBuffer(8)
+        clock.begin()
+        clock.add_int(hour, 2)
+        clock.add(b":")
+        clock.add_int(minute, 2)
+        labels.set("clock", clock.text())
+
+    Every method writes bytes in place and allocates nothing; ``text`` makes a
+    new str only after a write changed a byte, and otherwise returns the same
+    one as before.  Text past ``size`` bytes is cut off.
+
+    :param int size: Longest text in bytes, UTF-8 encoded.
+    """
+
+    def __init__(self, size):
+        self._bytes = bytearray(size)
+        self._end = 0
+        self._length = 0
+        self._changed = False
+        self._text = ""
+        self.made = 0
+
+    def begin(self):
+        """Start writing the text over from its first byte."""
+        self._end = 0
+
+    def _put(self, byte):
+        end = self._end
+        if end < len(self._bytes):
+            if self._bytes[end] != byte:
+                self._bytes[end] = byte
+                self._changed = True
+            self._end = end + 1
+
+    def add(self, data):
+        """Append ``data``, a bytes constant such as ``b":"`` or ``b"\\xc2\\xb0F"``."""
+        i = 0
+        while i < len(data):
+            self._put(data[i])
+            i += 1
+
+    def add_int(self, value, width=0, fill=0x30):
+        """Append ``value`` in decimal, padded on the left to ``width`` with ``fill``
+        (a byte value, zeros by default)."""
+        if value < 0:
+            self._put(0x2D)
+            value = -value
+        digits = 1
+        scale = 10
+        while value >= scale:
+            digits += 1
+            scale *= 10
+        while width > digits:
+            self._put(fill)
+            width -= 1
+        while digits:
+            scale //= 10
+            self._put(0x30 + value // scale % 10)
+            digits -= 1
+
+    def add_round(self, value):
+        """Append a float rounded to a whole number, like ``"{:.0f}"``."""
+        self.add_int(int(value + 0.5) if value >= 0 else -int(0.5 - value))
+
+    def text(self):
+        """The text written since ``begin``, as a str."""
+        if self._changed or self._end != self._length:
+            self._text = str(self._bytes[:self._end], "utf-8")
+            self._length = self._end
+            self._changed = False
+            self.made += 1
+        return self._text
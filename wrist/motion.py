@@ -0,0 +1,325 @@
+"""IMU sampling in bursts from the LSM9DS1 FIFO, with streaming gesture detectors.
+
+The accelerometer runs on its own (gyro powered down) at a fixed output
+rate and queues samples in the chip's 32-slot FIFO.  ``MotionService.poll``
+runs as a scheduler task a few times a second and drains whatever has
+queued, so the UI loop is never tied to the sample rate and no sample is
+missed as long as the FIFO is drained before it fills.  A drain is two I2C
+transactions however many samples are waiting: one read of FIFO_SRC for the
+count, then one burst of count x 6 bytes from OUT_X_L_XL.  With the FIFO on
+and the gyro off, the register address rolls back from OUT_Z_H_XL to
+OUT_X_L_XL, and each sample pops as its last byte is read.
+
+Every sample goes through each detector in turn.  Detectors work in whole
+milli-g and sample counts, keep their state in a few integers and
+fixed-size arrays, and create no objects per sample.  Each one's
+``update(x, y, z, dyn)`` gets the three axes and ``dyn``, the magnitude
+less 1g, and returns True when its event happens.  ``tools/imu_replay.py``
+runs them over recorded traces on the host to measure their cost.
+
+The watch's axes: +z out of the screen (face up reads +1g on z), x along
+the forearm, so an arm hanging at the side reads about 1g on x.
+"""
+
+import array
+import struct
+import time
+
+_CTRL_REG1_G = 0x10
+_CTRL_REG6_XL = 0x20
+_CTRL_REG9 = 0x23
+_OUT_X_L_XL = 0x28
+_FIFO_CTRL = 0x2E
+_FIFO_SRC = 0x2F
+
+# CTRL_REG6_XL output data rates, in samples per second
+RATES = {10: 0x20, 50: 0x40, 119: 0x60, 238: 0x80}
+RANGE_2G = 0x00
+MG_PER_LSB_2G = 0.061
+FIFO_SIZE = 32
+
+
+class AccelFIFO:
+    """The LSM9DS1 accelerometer sampling into its FIFO in continuous mode.
+
+    :param device: ``I2CDevice`` for the accelerometer/gyro (0x6B).
+    :param int rate: Samples per second, a key of ``RATES``.
+    """
+
+    def __init__(self, device, rate=50):
+        self.device = device
+        self.rate = rate
+        self._buf = bytearray(6 * FIFO_SIZE)
+        self._reg = bytearray(2)
+        self.overruns = 0
+        self._write(_CTRL_REG1_G, 0x00)  # gyro off: accelerometer-only mode
+        self._write(_CTRL_REG6_XL, RATES[rate] | RANGE_2G)
+        self._write(_FIFO_CTRL, 0x00)  # bypass first, which empties the FIFO
+        self._write(_CTRL_REG9, 0x02)  # FIFO_EN
+        self._write(_FIFO_CTRL, 0xC0)  # continuous: the oldest sample goes when full
+
+    def _write(self, register, value):
+        self._reg[0] = register
+        self._reg[1] = value
+        with self.device as i2c:
+            i2c.write(self._reg)
+
+    def _read(self, register, count):
+        self._reg[0] = register
+        with self.device as i2c:
+            i2c.write_then_readinto(self._reg, self._buf, out_end=1, in_end=count)
+
+    def pending(self):
+        """Number of samples waiting in the FIFO."""
+        self._read(_FIFO_SRC, 1)
+        if self._buf[0] & 0x40:
+            self.overruns += 1  # samples were lost since the last drain
+        return self._buf[0] & 0x3F
+
+    def read_into(self, samples, count):
+        """Pop ``count`` samples into ``samples`` as raw x, y, z triples, in
+        one burst read."""
+        if not count:
+            return
+        self._read(_OUT_X_L_XL, 6 * count)
+        buf = self._buf
+        for i in range(3 * count):
+            value = buf[2 * i] | (buf[2 * i + 1] << 8)
+            if value & 0x8000:
+                value -= 0x10000
+            samples[i] = value
+
+
+class WristRaise:
+    """The screen turned to face up within ``window`` seconds of the arm
+    being down, then held there steadily for ``hold`` seconds.
+
+    :param int rate: Samples per second.
+    :param int face_up: Milli-g on z that counts as facing up.
+    :param int down: Milli-g on z below which the wrist counts as lowered;
+        the detector re-arms there.
+    :param int still: Largest ``dyn`` (milli-g) while holding steady.
+
+    ``lowered`` is True from the wrist dropping below ``down`` until it
+    next faces up, for deciding nobody is looking at the screen.
+    """
+
+    name = "raise"
+
+    def __init__(self, rate, face_up=800, down=400, still=150, hold=0.2, window=1.0):
+        self.face_up = face_up
+        self.down = down
+        self.still = still
+        self.hold = int(hold * rate)
+        self.window = int(window * rate)
+        self._since_down = self.window + 1
+        self._rise = 0  # samples from lowered to the start of the steady run
+        self._steady = 0
+        self._armed = False
+        self.lowered = False
+        self.count = 0
+
+    def update(self, x, y, z, dyn):
+        if z < self.down:
+            self.lowered = True
+            self._since_down = 0
+            self._steady = 0
+            self._armed = True
+            return False
+        if self._since_down <= self.window:
+            self._since_down += 1
+        if z > self.face_up:
+            self.lowered = False
+        if z > self.face_up and -self.still < dyn < self.still:
+            if not self._steady:
+                self._rise = self._since_down
+            self._steady += 1
+        else:
+            self._steady = 0
+        if self._armed and self._steady >= self.hold and self._rise <= self.window:
+            self._armed = False
+            self.count += 1
+            return True
+        return False
+
+
+class Shake:
+    """``swings`` hard accelerations back and forth along one axis within
+    ``window`` seconds.
+
+    A swing is an axis reading ``threshold`` away from that axis' slow
+    running average (its share of gravity), so shaking counts whichever
+    way up the watch is held.
+
+    :param int rate: Samples per second.
+    :param int threshold: Milli-g from the running average that counts as
+        a swing.
+    """
+
+    name = "shake"
+
+    def __init__(self, rate, threshold=700, swings=4, window=1.0, refractory=1.0):
+        self.threshold = threshold
+        self.window = int(window * rate)
+        self.refractory = int(refractory * rate)
+        self._mean = array.array("l", bytes(3 * struct.calcsize("l")))
+        # sample number of each of the last ``swings`` swings, a ring
+        self._swings = array.array("l", bytes(swings * struct.calcsize("l")))
+        self._next = 0
+        self._last = 0  # last swing: +/-(axis + 1)
+        self._n = 0
+        self._quiet_until = 0
+        self.count = 0
+
+    def update(self, x, y, z, dyn):
+        self._n += 1
+        mean = self._mean
+        mean[0] += (x - mean[0]) >> 3
+        mean[1] += (y - mean[1]) >> 3
+        mean[2] += (z - mean[2]) >> 3
+        dx = x - mean[0]
+        dy = y - mean[1]
+        dz = z - mean[2]
+        if self._n < self._quiet_until:
+            return False
+        swing = 0
+        if dx > self.threshold or dx < -self.threshold:
+            swing = 1 if dx > 0 else -1
+        elif dy > self.threshold or dy < -self.threshold:
+            swing = 2 if dy > 0 else -2
+        elif dz > self.threshold or dz < -self.threshold:
+            swing = 3 if dz > 0 else -3
+        if not swing or swing == self._last:
+            return False  # nothing, or still the same swing
+        swings = self._swings
+        if swing != -self._last:
+            for i in range(len(swings)):
+                swings[i] = 0  # a swing on another axis starts a new count
+        self._last = swing
+        oldest = swings[self._next]  # about to be overwritten: the swing ``swings`` back
+        swings[self._next] = self._n
+        self._next = (self._next + 1) % len(swings)
+        if oldest and self._n - oldest <= self.window:
+            for i in range(len(swings)):
+                swings[i] = 0
+            self._last = 0
+            self._quiet_until = self._n + self.refractory
+            self.count += 1
+            return True
+        return False
+
+
+class Steps:
+    """Step counter: peaks of the smoothed ``dyn`` at walking intervals.
+
+    Peaks only count once ``settle`` of them have come at step intervals in
+    a row, so waving an arm about does not add steps.
+
+    :param int rate: Samples per second.
+    :param int threshold: Smoothed milli-g a peak must reach.
+    """
+
+    name = "step"
+
+    def __init__(self, rate, threshold=120, min_interval=0.25, max_interval=2.0, settle=4):
+        self.threshold = threshold
+        self.min_gap = int(min_interval * rate)
+        self.max_gap = int(max_interval * rate)
+        self.settle = settle
+        self._smooth = 0
+        self._high = False
+        self._gap = self.max_gap + 1
+        self._run = 0
+        self.count = 0
+
+    def update(self, x, y, z, dyn):
+        self._smooth += (dyn - self._smooth) >> 2
+        if self._gap <= self.max_gap:
+            self._gap += 1
+        if self._high:
+            if self._smooth < self.threshold // 2:
+                self._high = False
+            return False
+        if self._smooth < self.threshold or self._gap < self.min_gap:
+            return False
+        self._high = True
+        self._run = self._run + 1 if self._gap <= self.max_gap else 1
+        self._gap = 0
+        if self._run < self.settle:
+            return False
+        self.count += self.settle if self._run == self.settle else 1
+        return True
+
+
+class MotionService:
+    """Drains the accelerometer FIFO and runs the detectors over each sample.
+
+    Usage::
+
+        fifo = AccelFIFO(I2CDevice(i2c_bus, 0x6B))
+        motion = MotionService(fifo, (WristRaise(fifo.rate), Steps(fifo.rate)))
+        motion.on("raise", wake_display)
+        scheduler.add("motion", motion.poll, 0.2)
+
+    :param fifo: An ``AccelFIFO``.
+    :param detectors: Detector objects, run in this order.
+    :param record: Optional ``record(x, y, z)`` called with every sample in
+        milli-g, e.g. to log a trace for ``tools/imu_replay.py``.
+    """
+
+    def __init__(self, fifo, detectors, record=None):
+        self.fifo = fifo
+        self.detectors = tuple(detectors)
+        self.record = record
+        self.scale = int(MG_PER_LSB_2G * 1000)  # micro-g per LSB
+        self._samples = array.array("h", bytes(3 * FIFO_SIZE * struct.calcsize("h")))
+        self._handlers = {}
+        self.samples = 0
+        self.bursts = 0
+        self.largest = 0
+        self.busy = 0.0
+        self.events = {}
+        for detector in self.detectors:
+            self.events[detector.name] = 0
+
+    def on(self, name, handler):
+        """Call ``handler(detector)`` each time detector ``name`` fires."""
+        self._handlers[name] = handler
+
+    def poll(self):
+        """Read every queued sample and feed it to the detectors."""
+        start = time.monotonic()
+        count = self.fifo.pending()
+        if not count:
+            return
+        samples = self._samples
+        self.fifo.read_into(samples, count)
+        scale = self.scale
+        for i in range(count):
+            x = samples[3 * i] * scale // 1000
+            y = samples[3 * i + 1] * scale // 1000
+            z = samples[3 * i + 2] * scale // 1000
+            dyn = (x * x + y * y + z * z - 1000000) // 2000  # |a| - 1g, to first order
+            if self.record is not None:
+                self.record(x, y, z)
+            for detector in self.detectors:
+                if detector.update(x, y, z, dyn):
+                    self._fire(detector)
+        self.samples += count
+        self.bursts += 1
+        if count > self.largest:
+            self.largest = count
+        self.busy += time.monotonic() - start
+
+    def _fire(self, detector):
+        self.events[detector.name] += 1
+        handler = self._handlers.get(detector.name)
+        if handler is not None:
+            handler(detector)
+
+    def stats(self):
+        """One line: samples, burst sizes, cost per sample and event counts."""
+        events = " ".join("{} {}".format(name, count) for name, count in self.events.items())
+        return "motion: {} samples in {} bursts (max {}), {:.2f}ms/sample, {} overruns, events {}".format(
+            self.samples, self.bursts, self.largest, 1000 * self.busy / max(self.samples, 1),
+            self.fifo.overruns, events)
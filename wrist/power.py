@@ -0,0 +1,207 @@
+"""Power states: backlight, frame rate, task periods and sensor rates by activity.
+
+Most of the time nobody is looking at the watch, yet the loop keeps polling
+touch and redrawing the same frame at full rate under a fixed backlight.
+``PowerManager`` steps through a list of states as time passes without a
+touch or wrist raise (typically active, dimmed, idle, sleep) and applies
+each state's settings; any touch or wrist raise goes straight back to the
+first state.  A lowered arm, or darkness (a sleeve or pocket), skips ahead
+to the deeper states sooner.
+
+Within a state the backlight follows the light sensor, brighter in bright
+surroundings.  The manager also keeps the time spent in each state and the
+CPU duty cycle there, and estimates battery life from a simple current
+model.
+"""
+
+import time
+
+
+class PowerState:
+    """Settings for one power state.
+
+    :param str name: State name for reports.
+    :param float after: Seconds without activity before this state is entered.
+    :param float backlight: Backlight as a fraction of the ambient-adjusted
+        level; 0 turns it off.
+    :param float fps: Display frames per second; 0 stops refreshing.
+    :param dict periods: Scheduler task name to period in seconds, or None
+        to pause the task in this state.
+    :param dict ttls: Sensor name to time-to-live in seconds.
+    :param bool wake_only: A tap in this state only wakes the watch, so a
+        tap on a dark screen does not press a button nobody could see.
+    """
+
+    def __init__(self, name, after, backlight, fps, periods=None, ttls=None, wake_only=False):
+        self.name = name
+        self.after = after
+        self.backlight = backlight
+        self.fps = fps
+        self.periods = periods or {}
+        self.ttls = ttls or {}
+        self.wake_only = wake_only
+        self.residency = 0.0
+        self.busy = 0.0
+        self.light_time = 0.0  # seconds times backlight level, for the current estimate
+        self.entered = 0
+
+
+class PowerManager:
+    """Moves between ``states`` and applies them.
+
+    Usage::
+
+        power = PowerManager(display, scheduler, frames, sensors, STATES)
+        touch.on_touch = lambda point: power.activity()
+        scheduler.add("power", power.update, 1)
+
+    :param display: ``board.DISPLAY``, for its brightness.
+    :param scheduler: The ``Scheduler`` whose task periods the states set.
+    :param frames: The ``FrameGovernor`` whose rate the states set.
+    :param sensors: The ``SensorCache`` whose TTLs the states set.
+    :param states: ``PowerState`` objects, most awake first.
+    :param light: Optional function returning the ambient light reading.
+    :param lowered: Optional function returning True while the wrist is
+        down, so nobody can be looking at the screen.
+    :param backlight_range: Backlight levels for darkness and for
+        ``light_full`` or brighter.
+    :param int light_full: Light reading that gets the top backlight level.
+    :param int dark: Light reading at or below which the watch is assumed
+        to be covered.
+    :param float covered_after: Seconds without activity before a lowered
+        or covered watch goes straight to ``covered_state``.
+    :param str covered_state: Name of that state.
+    """
+
+    def __init__(self, display, scheduler, frames, sensors, states, light=None, lowered=None,
+                 backlight_range=(0.1, 0.5), light_full=40000, dark=500, covered_after=5,
+                 covered_state="idle"):
+        self.display = display
+        self.scheduler = scheduler
+        self.frames = frames
+        self.sensors = sensors
+        self.states = states
+        self.light = light
+        self.lowered = lowered
+        self.backlight_range = backlight_range
+        self.light_full = light_full
+        self.dark = dark
+        self.covered_after = covered_after
+        self.covered_state = covered_state
+        self.state = None
+        self.backlight = 0.0
+        now = time.monotonic()
+        self._last_activity = now
+        self._since = now
+        self._idle_mark = scheduler.idle
+        display.auto_brightness = False
+        self._enter(states[0], now)
+
+    def activity(self):
+        """Note a touch or wrist raise; back to the first state.
+
+        :return: True if this woke the watch from a ``wake_only`` state.
+        """
+        now = time.monotonic()
+        self._last_activity = now
+        woken = self.state.wake_only
+        if self.state is not self.states[0]:
+            self._enter(self.states[0], now)
+        return woken
+
+    def _target(self, now):
+        quiet = now - self._last_activity
+        if quiet >= self.covered_after and (
+                (self.lowered is not None and self.lowered())
+                or (self.light is not None and self.light() <= self.dark)):
+            for state in self.states:
+                if state.name == self.covered_state:
+                    quiet = max(quiet, state.after)
+        target = self.states[0]
+        for state in self.states:
+            if quiet >= state.after:
+                target = state
+        return target
+
+    def update(self):
+        """Scheduler task: change state if due and follow the ambient light."""
+        now = time.monotonic()
+        target = self._target(now)
+        if target is not self.state:
+            self._enter(target, now)
+        else:
+            self._set_backlight(now)
+
+    def _account(self, now):
+        state = self.state
+        elapsed = now - self._since
+        idle = self.scheduler.idle - self._idle_mark
+        state.residency += elapsed
+        state.busy += max(0.0, elapsed - idle)
+        state.light_time += elapsed * self.backlight
+        self._since = now
+        self._idle_mark = self.scheduler.idle
+
+    def _enter(self, state, now):
+        if self.state is not None:
+            self._account(now)
+        self.state = state
+        state.entered += 1
+        scheduler = self.scheduler
+        if state.fps:
+            self.frames.set_fps(state.fps)
+            scheduler.set_period("display", self.frames.interval)
+            scheduler.enable("display")
+        else:
+            scheduler.enable("display", False)
+        for name, period in state.periods.items():
+            if period is None:
+                scheduler.enable(name, False)
+            else:
+                scheduler.set_period(name, period)
+                scheduler.enable(name)
+        for name, ttl in state.ttls.items():
+            self.sensors.set_ttl(name, ttl)
+        self._set_backlight(now)
+        if state.fps:
+            scheduler.wake("display")
+
+    def _set_backlight(self, now):
+        level = self.state.backlight
+        if level:
+            low, high = self.backlight_range
+            if self.light is not None:
+                ambient = min(1.0, self.light() / self.light_full)
+                level *= low + (high - low) * ambient
+            else:
+                level *= high
+        if level != self.backlight:
+            self._account(now)
+            self.backlight = level
+            self.display.brightness = level
+
+    def estimate(self, battery_mah, base_ma, cpu_ma, backlight_ma):
+        """Average current and battery life under a simple linear model.
+
+        :param float base_ma: Draw with the CPU idle and the backlight off.
+        :param float cpu_ma: Extra draw while the CPU is busy.
+        :param float backlight_ma: Extra draw with the backlight at 1.0.
+        :return: ``(average mA, hours)``.
+        """
+        self._account(time.monotonic())
+        total = sum(state.residency for state in self.states) or 1
+        busy = sum(state.busy for state in self.states)
+        light = sum(state.light_time for state in self.states)
+        current = base_ma + cpu_ma * busy / total + backlight_ma * light / total
+        return current, battery_mah / current
+
+    def stats(self):
+        """One line per state: time spent there, entries and CPU duty cycle."""
+        self._account(time.monotonic())
+        total = sum(state.residency for state in self.states) or 1
+        lines = ["power: {}, backlight {:.2f}".format(self.state.name, self.backlight)]
+        for state in self.states:
+            lines.append("{:<8} {:>5.1f}% of the time {:>4} entries  duty {:>5.1f}%".format(
+                state.name, 100 * state.residency / total, state.entered,
+                100 * state.busy / state.residency if state.residency else 0))
+        return lines
@@ -0,0 +1,151 @@
+"""A small cooperative scheduler for periodic tasks.
+
+CircuitPython on the PyPortal has no asyncio in ``lib/``, and the app only
+needs periodic jobs, so this runs plain functions at fixed periods instead of
+coroutines.  Tasks never preempt each other: whenever several are due, the
+one with the lowest priority number runs first, and due tasks are re-checked
+after every run so a fast, high-priority task (touch) never waits behind more
+than one slow one.
+"""
+
+import time
+
+
+class Task:
+    """A function run every ``period`` seconds.
+
+    If the function returns a number, the next run happens that many seconds
+    later instead of after the full period.  A sensor task can start a
+    conversion and come back for the result once it is ready, without
+    blocking in between.
+    """
+
+    def __init__(self, name, func, period, priority=0, delay=0):
+        self.name = name
+        self.delay = delay
+        self.func = func
+        self.period = period
+        self.priority = priority
+        self.next_run = 0
+        self.enabled = True
+        self.runs = 0
+        self.overruns = 0
+        self.missed = 0
+        self.busy = 0.0
+        self.longest = 0.0
+        self.worst_delay = 0.0
+
+    def __repr__(self):
+        return "<Task {} every {}s>".format(self.name, self.period)
+
+
+class Scheduler:
+    """Runs :class:`Task` objects by priority, sleeping while nothing is due."""
+
+    def __init__(self):
+        self.tasks = []
+        self._by_name = {}
+        self.idle = 0.0
+        self.meter = None  # e.g. a wrist.heap.HeapMeter, told about every task run
+        self._started = None
+
+    def add(self, name, func, period, priority=0, delay=0):
+        """Add a task; it first runs ``delay`` seconds after the scheduler starts."""
+        task = Task(name, func, period, priority, delay)
+        if self._started is not None:
+            task.next_run = time.monotonic() + delay
+        self.tasks.append(task)
+        self.tasks.sort(key=lambda t: t.priority)
+        self._by_name[name] = task
+        return task
+
+    def __getitem__(self, name):
+        return self._by_name[name]
+
+    def set_period(self, name, period):
+        """Change how often a task runs, taking effect from its next run."""
+        task = self._by_name[name]
+        task.next_run += period - task.period
+        task.period = period
+
+    def enable(self, name, enabled=True):
+        """Pause a task, or resume it with its next run one period from now."""
+        task = self._by_name[name]
+        if enabled and not task.enabled:
+            task.next_run = time.monotonic() + task.period
+        task.enabled = enabled
+
+    def wake(self, name):
+        """Run a task as soon as possible instead of waiting out its period."""
+        task = self._by_name[name]
+        now = time.monotonic()
+        if task.next_run > now:
+            task.next_run = now
+
+    def _next_due(self, now):
+        for task in self.tasks:  # already in priority order
+            if task.enabled and task.next_run <= now:
+                return task
+        return None
+
+    def run_once(self):
+        """Run every task that is due, then sleep until the next one is."""
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+            for task in self.tasks:
+                task.next_run = now + task.delay
+        meter = self.meter
+        task = self._next_due(now)
+        ran = task is not None
+        while task is not None:
+            delay = now - task.next_run
+            if delay > task.worst_delay and task.runs:
+                task.worst_delay = delay
+            if meter is not None:
+                meter.start()
+            result = task.func()
+            if meter is not None:
+                meter.stop(task.name)
+            finished = time.monotonic()
+            took = finished - now
+            task.runs += 1
+            task.busy += took
+            if took > task.longest:
+                task.longest = took
+            if took > task.period:
+                task.overruns += 1
+            if result is not None:
+                task.next_run = finished + result
+            else:
+                task.next_run += task.period
+                if task.next_run <= finished:
+                    # fell a whole period or more behind: skip, don't burst
+                    task.missed += int((finished - task.next_run) / task.period) + 1
+                    task.next_run = finished + task.period
+            now = finished
+            task = self._next_due(now)
+        if ran and meter is not None:
+            meter.end_pass()
+        wake = None
+        for task in self.tasks:
+            if task.enabled and (wake is None or task.next_run < wake):
+                wake = task.next_run
+        if wake is not None and wake > now:
+            self.idle += wake - now
+            time.sleep(wake - now)
+
+    def run(self):
+        """Run forever."""
+        while True:
+            self.run_once()
+
+    def stats(self):
+        """One line per task: runs, overruns, missed periods and timings."""
+        elapsed = max(time.monotonic() - (self._started or 0), 0.001)
+        lines = ["idle {:.0f}%".format(100 * self.idle / elapsed)]
+        for task in self.tasks:
+            lines.append("{:<12} {:>6} runs {:>3} overruns {:>4} missed  avg {:.1f}ms  max {:.1f}ms  late {:.1f}ms".format(
+                task.name, task.runs, task.overruns, task.missed,
+                1000 * task.busy / max(task.runs, 1), 1000 * task.longest, 1000 * task.worst_delay))
+        return lines
@@ -0,0 +1,193 @@
+"""A vertical list of any length, drawn with a fixed pool of row widgets.
+
+Only the rows on screen exist.  ``ScrollList`` makes one more row widget than
+fits in its height and, as the list scrolls, moves them and rebinds each one
+that comes into view to its new entry.  Entry ``i`` always lands in pool slot
+``i % pool``, so a row only needs rebinding when a different entry scrolls
+into its slot, and memory and redraw cost depend on the height of the list,
+never on how many entries it has.
+
+Dragging scrolls the list with the finger.  Let go while moving and it keeps
+going at the release speed, slowing down under ``friction`` until it stops
+or reaches an end; ``animate`` runs that as a scheduler task.  A tap, a
+finger that lifts again without having moved, selects the entry it landed
+on; a drag never selects anything, so scrolling the list does not first
+open whatever was under the finger.  A finger landing on a moving list only
+stops it.
+"""
+
+import time
+
+import displayio
+
+STOP_SPEED = 20  # pixels per second below which a fling stops
+REST_TIME = 0.2  # a finger still this long before lifting throws nothing; a
+                 # display refresh can hold the release back by 0.1s
+
+
+class ScrollList:
+    """Entries ``0`` to ``count - 1`` in rows of equal height.
+
+    Usage::
+
+        rows = ScrollList(len(roster), make_button, bind_button, 213, 0, 106, 200, 40)
+        rows.on_select = lambda index, point: print(roster[index])
+        splash.append(rows.group)
+        touch.add(213, 0, 106, 200, "rows", on_press=rows.press, on_move=rows.move,
+                  on_release=rows.release)
+        scheduler.add("rows", rows.animate, 0.05)
+
+    :param int count: Number of entries.
+    :param make_row: ``make_row(slot)`` returns a new row widget, which
+        needs a settable ``y`` and ``hidden``, as a displayio Group has.
+    :param bind_row: ``bind_row(row, index)`` makes a row show entry ``index``.
+    :param int x: Left edge of the list.
+    :param int y: Top edge.
+    :param int width: Width.
+    :param int height: Height; rows below it are left for whatever is drawn
+        over the list to cover.
+    :param int row_height: Height of each row.
+    :param float friction: Seconds for a fling to lose about two thirds of
+        its speed.
+    """
+
+    def __init__(self, count, make_row, bind_row, x, y, width, height, row_height, friction=0.35):
+        self.count = count
+        self.bind_row = bind_row
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.row_height = row_height
+        self.friction = friction
+        self.on_select = None
+        self.group = displayio.Group(x=x, y=y)
+        pool = min(count, (height + row_height - 1) // row_height + 1)
+        self.rows = [make_row(slot) for slot in range(pool)]
+        self._bound = [None] * pool
+        for row in self.rows:
+            self.group.append(row)
+        self.scroll = 0
+        self.max_scroll = max(0, count * row_height - height)
+        self.velocity = 0.0  # pixels per second, positive scrolls down the list
+        self._touch_y = 0
+        self._touching = False
+        self._moved = False
+        self._pending = None  # entry a tap would select
+        self._last_move = 0.0
+        self._last_step = None
+        self.binds = 0
+        self.flings = 0
+        self._place()
+
+    def _place(self):
+        row_height = self.row_height
+        pool = len(self.rows)
+        first = self.scroll // row_height
+        last = min(first + pool, self.count)
+        for index in range(first, last):
+            slot = index % pool
+            row = self.rows[slot]
+            row.y = index * row_height - self.scroll
+            if self._bound[slot] != index:
+                self._bound[slot] = index
+                self.bind_row(row, index)
+                row.hidden = False
+                self.binds += 1
+        # at the end of the list there are more rows than entries left to show
+        for index in range(last, first + pool):
+            slot = index % pool
+            if self._bound[slot] is not None:
+                self._bound[slot] = None
+                self.rows[slot].hidden = True
+
+    def scroll_to(self, scroll):
+        """Scroll so ``scroll`` pixels of the list are above its top edge."""
+        scroll = max(0, min(int(scroll), self.max_scroll))
+        if scroll != self.scroll:
+            self.scroll = scroll
+            self._place()
+
+    def show(self, index):
+        """Scroll just far enough for entry ``index`` to be fully in view."""
+        top = index * self.row_height
+        if top < self.scroll:
+            self.scroll_to(top)
+        elif top + self.row_height > self.scroll + self.height:
+            self.scroll_to(top + self.row_height - self.height)
+
+    def rebind(self, index=None):
+        """Bind entry ``index`` again if it is on screen (every visible entry if None),
+        after what it shows has changed."""
+        for slot, bound in enumerate(self._bound):
+            if bound is not None and (index is None or bound == index):
+                self.bind_row(self.rows[slot], bound)
+                self.binds += 1
+
+    def press(self, key, point):
+        """Touch handler: a finger came down on the list; unless the list was
+        moving, the entry under it is selected if the finger lifts unmoved."""
+        moving = self.velocity != 0
+        self.velocity = 0.0
+        self._touch_y = point[1]
+        self._touching = True
+        self._moved = False
+        self._last_move = time.monotonic()
+        self._pending = None
+        if not moving:
+            index = (point[1] - self.y + self.scroll) // self.row_height
+            if 0 <= index < self.count:
+                self._pending = index
+
+    def move(self, key, point):
+        """Touch handler: the finger moved; the list follows it."""
+        now = time.monotonic()
+        delta = self._touch_y - point[1]
+        elapsed = now - self._last_move
+        if elapsed > 0:
+            # smoothed, so one jittery sample does not set the throw
+            self.velocity = 0.5 * self.velocity + 0.5 * delta / elapsed
+        self._touch_y = point[1]
+        self._last_move = now
+        self._moved = True
+        self._pending = None  # a drag, not a tap
+        self.scroll_to(self.scroll + delta)
+
+    def release(self, key, point):
+        """Touch handler: a tap selects its entry, and a drag still moving
+        when the finger lifts is thrown."""
+        self._touching = False
+        if not self._moved:
+            self.velocity = 0.0
+            pending, self._pending = self._pending, None
+            if pending is not None and self.on_select is not None:
+                self.on_select(pending, point)
+            return
+        if time.monotonic() - self._last_move > REST_TIME or abs(self.velocity) < STOP_SPEED:
+            self.velocity = 0.0
+            return
+        self.flings += 1
+        self._last_step = None
+
+    def animate(self):
+        """Scheduler task: carry a fling on; returns seconds until the next run."""
+        if not self.velocity or self._touching:
+            self._last_step = None
+            return None
+        now = time.monotonic()
+        if self._last_step is None:
+            self._last_step = now
+            return None
+        elapsed = min(now - self._last_step, self.friction)
+        self._last_step = now
+        before = self.scroll
+        self.scroll_to(self.scroll + self.velocity * elapsed)
+        self.velocity -= self.velocity * elapsed / self.friction
+        if abs(self.velocity) < STOP_SPEED or self.scroll == before:
+            self.velocity = 0.0  # slowed down, or hit an end
+        return None
+
+    def stats(self):
+        """One line: entries, row widgets, rebinds and flings."""
+        return "list: {} entries in {} rows, scrolled {}/{}px, {} binds, {} flings".format(
+            self.count, len(self.rows), self.scroll, self.max_scroll, self.binds, self.flings)
@@ -0,0 +1,117 @@
+"""Cached sensor snapshots, so no I2C register is read more often than needed.
+
+Each sensor gets a time-to-live.  ``get`` answers from the cache while the
+reading is younger than its TTL, and ``refresh`` renews every expired reading
+in one pass.  Sensors with a slow conversion (the SI7021 needs ~23ms) can be
+given a ``start`` function: the conversion is kicked off on one pass and the
+result collected on a later one, so the bus is never polled while it runs.
+"""
+
+import time
+
+
+class Sensor:
+    """One cached reading and its counters."""
+
+    def __init__(self, name, read, ttl, start=None, settle=0):
+        self.name = name
+        self.read = read
+        self.ttl = ttl
+        self.start = start
+        self.settle = settle
+        self.value = None
+        self.stamp = None
+        self.started = None
+        self.reads = 0
+        self.hits = 0
+
+    def expires(self):
+        if self.stamp is None:
+            return 0
+        return self.stamp + self.ttl
+
+
+class SensorCache:
+    """Named sensor readings with per-sensor TTLs.
+
+    Usage::
+
+        sensors = SensorCache()
+        sensors.add("light", read_light, ttl=0.5)
+        sensors.refresh()          # reads everything that has expired
+        sensors.get("light")       # cached until the TTL runs out
+    """
+
+    def __init__(self):
+        self._sensors = {}
+
+    def add(self, name, read, ttl, start=None, settle=0):
+        """Register a sensor.
+
+        :param read: Function returning the reading; one bus read per call.
+        :param float ttl: Seconds a reading stays fresh.
+        :param start: Optional function that starts a conversion.
+        :param float settle: Seconds from ``start`` until ``read`` is ready.
+        """
+        self._sensors[name] = Sensor(name, read, ttl, start, settle)
+
+    def set_ttl(self, name, ttl):
+        """Change how long ``name``'s readings stay fresh."""
+        self._sensors[name].ttl = ttl
+
+    def _read(self, sensor, now):
+        sensor.value = sensor.read()
+        sensor.stamp = now
+        sensor.started = None
+        sensor.reads += 1
+
+    def get(self, name):
+        """Return the reading for ``name``, reading the bus only if it expired.
+
+        A sensor with a ``start`` never reads the bus here once it has a
+        value: expired or with its conversion in flight, it keeps answering
+        with its last value until ``refresh`` collects the next one, rather
+        than blocking on a conversion.
+        """
+        sensor = self._sensors[name]
+        now = time.monotonic()
+        if sensor.stamp is not None and (now < sensor.expires() or sensor.start is not None):
+            sensor.hits += 1
+            return sensor.value
+        self._read(sensor, now)
+        return sensor.value
+
+    def refresh(self):
+        """Renew every expired reading in one batched pass.
+
+        :return: Seconds until the next reading expires or a conversion is
+            ready, for use as a scheduler task's next delay.
+        """
+        now = time.monotonic()
+        wake = None
+        for sensor in self._sensors.values():
+            if sensor.started is not None:
+                if now - sensor.started >= sensor.settle:
+                    self._read(sensor, now)
+            elif now >= sensor.expires():
+                if sensor.start is not None and sensor.stamp is not None:
+                    sensor.start()
+                    sensor.started = now
+                else:
+                    self._read(sensor, now)
+            if sensor.started is not None:
+                due = sensor.started + sensor.settle
+            else:
+                due = sensor.expires()
+            if wake is None or due < wake:
+                wake = due
+        return max(0, wake - now) if wake is not None else None
+
+    def stats(self):
+        """One line per sensor: bus reads against cache hits."""
+        lines = []
+        for sensor in self._sensors.values():
+            total = sensor.reads + sensor.hits
+            lines.append("{:<12} {:>6} reads {:>7} hits ({:.0f}% cached)".format(
+                sensor.name, sensor.reads, sensor.hits, 100 * sensor.hits / total if total else 0))
+        return lines
@@ -0,0 +1,174 @@
+"""Sensor telemetry logged to the SD card as fixed-width binary records.
+
+Each sample is packed with ``struct`` straight into a RAM buffer.  The buffer
+is written out only in whole blocks (512 bytes by default, one SD sector),
+from a scheduled ``flush`` or when it fills up, so the card sees a few large
+aligned writes instead of a small write per reading.  A partial block waits
+in the buffer for the next flush; ``close`` writes whatever is left.
+
+Files rotate when they reach ``max_bytes`` or when the day changes, and are
+named ``<prefix>-<YYYYMMDD>-<n>.bin`` (``<prefix>-<n>.bin`` for logs kept
+without dates).  Each starts with a header block that
+describes its records, so ``tools/decode_log.py`` can read any log without
+knowing which version of the app wrote it::
+
+    magic "WLOG", version, record size, data offset, format length,
+    names length, record format, comma separated field names
+
+A field name may end in ``/<divisor>``, e.g. ``tempF/10`` for a temperature
+stored as tenths of a degree; the decoder divides it back out.
+"""
+
+import os
+import struct
+
+MAGIC = b"WLOG"
+VERSION = 1
+HEADER = "<4sBBHHH"
+
+
+class TelemetryLog:
+    """Buffered writer of fixed-width records to rotating files.
+
+    Usage::
+
+        log = TelemetryLog("/sd/log", "<IhHH", "time,tempF/10,humidity/10,light")
+        log.append((2022, 3, 9), stamp, 734, 412, 20000)   # RAM only
+        scheduler.add("log", log.flush, 30)                 # whole blocks to the card
+
+    :param str directory: Where log files go; created if missing.  Raises
+        ``OSError`` if it cannot be, e.g. with no SD card mounted.
+    :param str record: ``struct`` format of one record, little-endian.
+    :param str fields: Comma separated name of every value in ``record``.
+    :param int block_size: Bytes per write; a multiple of the card's sector.
+    :param int blocks: Buffer size in blocks.  Samples that arrive while the
+        buffer is full force an early flush.
+    :param int max_bytes: Start a new file once one reaches this size.
+    :param str prefix: File name prefix.
+    """
+
+    def __init__(self, directory, record, fields, block_size=512, blocks=4,
+                 max_bytes=1024 * 1024, prefix="wrist"):
+        self.directory = directory
+        self.record = record
+        self.fields = fields
+        self.record_size = struct.calcsize(record)
+        if len(fields.split(",")) != len(struct.unpack(record, bytes(self.record_size))):
+            raise ValueError("{} does not name every value of {}".format(fields, record))
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        # room for the blocks plus one record that straddles the last of them
+        self._buffer = bytearray(block_size * blocks + self.record_size)
+        self._view = memoryview(self._buffer)
+        self._fill = 0
+        self._file = None
+        self._day = None
+        self._size = 0
+        self.path = None
+        self.records = 0
+        self.writes = 0
+        self.forced = 0
+        self.dropped = 0
+        self.errors = 0
+        self.files = 0
+        try:
+            os.mkdir(directory)
+        except OSError as error:
+            if error.args[0] != 17:  # EEXIST; anything else means no card to log to
+                raise
+
+    def _header(self):
+        fmt = self.record.encode()
+        names = self.fields.encode()
+        size = struct.calcsize(HEADER) + len(fmt) + len(names)
+        offset = (size + self.block_size - 1) // self.block_size * self.block_size
+        header = bytearray(offset)
+        struct.pack_into(HEADER, header, 0, MAGIC, VERSION, self.record_size, offset, len(fmt), len(names))
+        start = struct.calcsize(HEADER)
+        header[start:start + len(fmt)] = fmt
+        header[start + len(fmt):size] = names
+        return header
+
+    def _open(self, day):
+        if day is None:
+            stem = self.prefix + "-"
+        else:
+            stem = "{}-{:04d}{:02d}{:02d}-".format(self.prefix, *day)
+        taken = [name for name in os.listdir(self.directory) if name.startswith(stem)]
+        self.path = "{}/{}{}.bin".format(self.directory, stem, len(taken))
+        self._file = open(self.path, "wb")  # pylint: disable=consider-using-with
+        header = self._header()
+        self._file.write(header)
+        self._size = len(header)
+        self.files += 1
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def append(self, day, *values):
+        """Pack one record into the buffer.
+
+        :param day: ``(year, month, day)`` the sample was taken on; a new
+            day starts a new file.  None rotates by size only.
+        :param values: One value per field of the record format.
+        """
+        if day != self._day:
+            if self._day is not None:
+                self.flush(partial=True)  # the old day's samples go in the old day's file
+                self._close()
+            self._day = day
+        if self._fill + self.record_size > len(self._buffer):
+            self.forced += 1
+            self.flush()
+        struct.pack_into(self.record, self._buffer, self._fill, *values)
+        self._fill += self.record_size
+        self.records += 1
+
+    def _write(self, count):
+        """Write the first ``count`` buffered bytes; False if the card failed."""
+        try:
+            if self._file is None:
+                self._open(self._day)
+            self._file.write(self._view[:count])
+            self._file.flush()
+        except OSError as error:
+            print("telemetry not written:", error)
+            self.errors += 1
+            self._close()
+            return False
+        self.writes += 1
+        self._size += count
+        left = self._fill - count
+        self._view[:left] = self._view[count:self._fill]
+        self._fill = left
+        return True
+
+    def flush(self, partial=False):
+        """Write the buffer's whole blocks to the card.
+
+        A failed write keeps the samples for the next try, unless the buffer
+        is full, in which case they are dropped so logging can go on.
+
+        :param bool partial: Also write the last, partly filled block.
+        """
+        count = self._fill if partial else self._fill // self.block_size * self.block_size
+        if count and not self._write(count) and self._fill + self.record_size > len(self._buffer):
+            self.dropped += self._fill // self.record_size
+            self._fill = 0
+        if self._file is not None and self._size >= self.max_bytes:
+            if self._fill:
+                self._write(self._fill)  # end the file on a whole record
+            self._close()
+
+    def close(self):
+        """Write everything still buffered and close the file."""
+        self.flush(partial=True)
+        self._close()
+
+    def stats(self):
+        """One line: records logged, writes made and trouble seen."""
+        return "telemetry: {} records in {} writes to {} files, {} forced, {} dropped, {} errors, {}B buffered".format(
+            self.records, self.writes, self.files, self.forced, self.dropped, self.errors, self._fill)
@@ -0,0 +1,261 @@
+"""A pannable, zoomable map drawn from a tile pyramid file.
+
+``tools/build_tiles.py`` cuts a map of any size into fixed-size tiles at
+several zoom levels and writes them, one byte per pixel, into one file.
+``TileMap`` shows a window of one level through a single TileGrid whose
+tiles come from a sheet of cache slots in RAM.  The slots hold the tiles on
+screen plus a ring of neighbours around them, recycled least recently used
+first, so memory is fixed by the window size and never by the map's.
+
+Any tile is found with one multiply and one seek, and loading it is a
+``readinto`` of a preallocated buffer and an ``arrayblit`` into its slot.
+Panning within a tile only moves the TileGrid.  Crossing into the next
+column or row re-points the grid at slots the ring has normally loaded
+already, and ``prefetch`` tops the ring up again from an idle-time task.
+"""
+
+import struct
+import time
+
+import bitmaptools
+import displayio
+
+MAGIC = b"WMAP"
+HEADER = "<4sBBHH"
+LEVEL = "<HHI"
+
+
+class _Level:
+    """One zoom level: its size in pixels and tiles, and where its tiles start."""
+
+    def __init__(self, width, height, offset, tile):
+        self.width = width
+        self.height = height
+        self.offset = offset
+        self.columns = (width + tile - 1) // tile
+        self.rows = (height + tile - 1) // tile
+
+
+class TileMap:
+    """A window onto a tile pyramid.
+
+    Usage::
+
+        tile_map = TileMap("/images/map.tiles", 212, 240)
+        group.append(tile_map.group)
+        tile_map.pan(40, 0)     # 40 pixels further east
+        tile_map.zoom(-1)       # one level closer
+        scheduler.add("map tiles", tile_map.prefetch, 0.1)
+
+    :param str path: Tile file written by ``tools/build_tiles.py``.
+    :param int width: Window width in pixels.
+    :param int height: Window height in pixels.
+    :param int ring: Columns and rows of tiles kept around the window.
+    :param int level: Zoom level to start at, 0 being full size; None
+        starts at the most zoomed-out level.
+    """
+
+    def __init__(self, path, width, height, ring=1, level=None):
+        self._file = open(path, "rb")
+        try:
+            self._read_header(path)
+        except ValueError:
+            self._file.close()
+            raise
+        tile = self.tile
+        self.width = width
+        self.height = height
+        self.ring = ring
+        # enough columns and rows to cover the window at any sub-tile offset
+        self.columns = (width + tile - 1) // tile + 1
+        self.rows = (height + tile - 1) // tile + 1
+        slots = (self.columns + 2 * ring) * (self.rows + 2 * ring)
+        # slot 0 stays blank (index 0) for grid cells beyond the map's edges
+        self.sheet = displayio.Bitmap(tile, tile * (slots + 1), len(self.palette))
+        self._buffer = bytearray(tile * tile)
+        self._key = [None] * (slots + 1)
+        self._slot = {}  # tile key -> slot
+        self._lru = list(range(1, slots + 1))  # least recently used first
+        self.grid = displayio.TileGrid(self.sheet, pixel_shader=self.palette,
+                                       width=self.columns, height=self.rows,
+                                       tile_width=tile, tile_height=tile)
+        self.group = displayio.Group()
+        self.group.append(self.grid)
+        self._mask(width, 0, tile, height + tile)  # the grid overhangs the window by
+        self._mask(0, height, width, tile)         # up to a tile right and below
+        self.level = len(self.levels) - 1 if level is None else level
+        self.x = 0  # window's top left, in pixels of the current level
+        self.y = 0
+        self._column = None  # first tile column and row on screen
+        self._row = None
+        self._ring_full = False
+        self.loads = 0
+        self.hits = 0
+        self.load_time = 0.0
+        self.pans = 0
+        self.longest_pan = 0.0
+        self._move(0, 0)
+
+    def _read_exactly(self, path, size):
+        data = self._file.read(size)
+        if len(data) != size:
+            raise ValueError("{} is truncated".format(path))
+        return data
+
+    def _read_header(self, path):
+        """Read the palette and level table; a file that is not a tile file,
+        or is cut short anywhere, raises ValueError."""
+        magic, version, levels, tile, colors = struct.unpack(
+            HEADER, self._read_exactly(path, struct.calcsize(HEADER)))
+        if magic != MAGIC or version != 1:
+            raise ValueError("{} is not a tile file".format(path))
+        self.tile = tile
+        self.palette = displayio.Palette(colors)
+        rgb = self._read_exactly(path, 3 * colors)
+        for i in range(colors):
+            self.palette[i] = (rgb[3 * i] << 16) | (rgb[3 * i + 1] << 8) | rgb[3 * i + 2]
+        self.levels = []
+        size = struct.calcsize(LEVEL)
+        end = 0
+        for _ in range(levels):
+            level_width, level_height, offset = struct.unpack(LEVEL, self._read_exactly(path, size))
+            level = _Level(level_width, level_height, offset, tile)
+            self.levels.append(level)
+            end = max(end, offset + level.columns * level.rows * tile * tile)
+        if not self.levels:
+            raise ValueError("{} has no levels".format(path))
+        if self._file.seek(0, 2) < end:
+            raise ValueError("{} is truncated".format(path))
+
+    def _mask(self, x, y, width, height):
+        palette = displayio.Palette(1)
+        palette[0] = 0x000000
+        self.group.append(displayio.TileGrid(displayio.Bitmap(width, height, 1),
+                                             pixel_shader=palette, x=x, y=y))
+
+    @property
+    def nbytes(self):
+        """Bytes of tile pixels held in RAM, about fixed for a window size."""
+        bits = 1
+        while (1 << bits) < len(self.palette):
+            bits *= 2
+        return self.sheet.width * self.sheet.height * bits // 8 + len(self._buffer)
+
+    def close(self):
+        """Close the tile file; the map must no longer be shown."""
+        self._file.close()
+
+    def _use(self, slot):
+        self._lru.remove(slot)
+        self._lru.append(slot)
+
+    def _load(self, key, column, row):
+        slot = self._lru.pop(0)
+        if self._key[slot] is not None:
+            del self._slot[self._key[slot]]
+        self._key[slot] = key
+        self._slot[key] = slot
+        self._lru.append(slot)
+        start = time.monotonic()
+        level = self.levels[self.level]
+        tile = self.tile
+        self._file.seek(level.offset + (row * level.columns + column) * tile * tile)
+        self._file.readinto(self._buffer)
+        bitmaptools.arrayblit(self.sheet, self._buffer, 0, slot * tile, tile, (slot + 1) * tile)
+        self.load_time += time.monotonic() - start
+        self.loads += 1
+        return slot
+
+    def _tile_slot(self, column, row):
+        """Slot holding a tile of the current level, loading it if needed."""
+        level = self.levels[self.level]
+        if not (0 <= column < level.columns and 0 <= row < level.rows):
+            return 0
+        key = (self.level << 24) | (row << 12) | column
+        slot = self._slot.get(key)
+        if slot is None:
+            return self._load(key, column, row)
+        self.hits += 1
+        self._use(slot)
+        return slot
+
+    def _move(self, x, y):
+        level = self.levels[self.level]
+        self.x = max(0, min(x, level.width - self.width))
+        self.y = max(0, min(y, level.height - self.height))
+        tile = self.tile
+        column = self.x // tile
+        row = self.y // tile
+        self.grid.x = column * tile - self.x
+        self.grid.y = row * tile - self.y
+        if column == self._column and row == self._row:
+            return
+        self._column = column
+        self._row = row
+        grid = self.grid
+        for j in range(self.rows):
+            for i in range(self.columns):
+                grid[i, j] = self._tile_slot(column + i, row + j)
+        self._ring_full = False
+
+    def pan(self, dx, dy):
+        """Move the window ``dx``, ``dy`` pixels across the map, stopping at its edges."""
+        start = time.monotonic()
+        self._move(self.x + dx, self.y + dy)
+        took = time.monotonic() - start
+        self.pans += 1
+        if took > self.longest_pan:
+            self.longest_pan = took
+
+    def zoom(self, step):
+        """Go ``step`` levels out (positive) or in (negative), keeping the centre.
+
+        :return: True if the level changed.
+        """
+        level = max(0, min(self.level + step, len(self.levels) - 1))
+        if level == self.level:
+            return False
+        center_x = self.x + self.width // 2
+        center_y = self.y + self.height // 2
+        shift = level - self.level
+        if shift > 0:
+            center_x >>= shift
+            center_y >>= shift
+        else:
+            center_x <<= -shift
+            center_y <<= -shift
+        self.level = level
+        self._column = None
+        self._move(center_x - self.width // 2, center_y - self.height // 2)
+        return True
+
+    def prefetch(self, limit=4):
+        """Load up to ``limit`` missing tiles of the ring around the window.
+
+        Cheap once the ring is full, so it can run often as an idle task.
+        """
+        if self._ring_full:
+            return
+        ring = self.ring
+        level = self.levels[self.level]
+        key_base = self.level << 24
+        for row in range(max(0, self._row - ring), min(level.rows, self._row + self.rows + ring)):
+            for column in range(max(0, self._column - ring), min(level.columns, self._column + self.columns + ring)):
+                key = key_base | (row << 12) | column
+                slot = self._slot.get(key)
+                if slot is not None:
+                    self._use(slot)  # so loading the rest cannot evict it
+                elif not limit:
+                    return
+                else:
+                    self._load(key, column, row)
+                    limit -= 1
+        self._ring_full = True
+
+    def stats(self):
+        """One line: position, cache use and tile load and pan times."""
+        total = self.loads + self.hits
+        return "map: level {} of {} at {},{}, {} slots {}KB, {} loads {:.1f}ms avg, {:.0f}% hit, {} pans max {:.0f}ms".format(
+            self.level, len(self.levels), self.x, self.y, len(self._key) - 1, self.nbytes // 1024,
+            self.loads, 1000 * self.load_time / max(self.loads, 1),
+            100 * self.hits / total if total else 0, self.pans, 1000 * self.longest_pan)
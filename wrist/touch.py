@@ -0,0 +1,232 @@
+"""Non-blocking touch input: press, hold and release events for screen areas.
+
+``TouchEngine.poll`` reads the touchscreen once per call and never waits for
+a finger to lift, so it can run as a scheduler task next to the sensor and
+display tasks.  A contact only counts as a press once it has lasted the
+debounce time; the press position is the average of the samples seen during
+that time.  Likewise a release needs the debounce time with no contact, so a
+bouncing finger does not fire a second press.
+
+Targets are kept in a grid of cells, so finding the one under a point looks
+at one cell's short list rather than every button on screen.
+
+Latency is what the wearer sees: from first contact until the change the
+press caused is on the screen.  A handler that changes the screen calls
+``responded``, and the display calls ``shown`` after each refresh, which
+stops the clock.  Presses that change nothing on screen are not timed.
+"""
+
+import time
+
+IDLE = 0
+PENDING = 1
+PRESSED = 2
+RELEASING = 3
+
+
+class Target:
+    """A touchable rectangle and its handlers, each called as ``handler(key, point)``."""
+
+    def __init__(self, x, y, width, height, key, on_press, on_hold, on_release, on_move=None):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.key = key
+        self.on_press = on_press
+        self.on_hold = on_hold
+        self.on_release = on_release
+        self.on_move = on_move
+
+    def contains(self, x, y):
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+
+class TouchEngine:
+    """Turns touchscreen samples into events for registered targets.
+
+    Usage::
+
+        touch = TouchEngine(ts)
+        touch.add(b.x, b.y, b.width, b.height, i, on_press=press_button)
+        scheduler.add("touch", touch.poll, 0.02)
+        frames.add_after(touch.shown)   # press_button calls touch.responded()
+
+    :param ts: An ``adafruit_touchscreen.Touchscreen``.
+    :param float debounce: Seconds a contact (or its absence) must last to
+        count as a press (or release).
+    :param float hold_time: Seconds pressed before ``on_hold`` fires, once.
+    :param int move_step: Pixels a held finger must move before ``on_move``
+        fires; a press that has moved never fires ``on_hold``.
+    :param int cell: Side of the hit-test grid cells, in pixels.
+    :param float latency_budget: Seconds from first contact until the
+        press's response is on screen that a press is allowed to take;
+        longer ones are counted in ``over_budget``.
+
+    ``on_touch``, if set, is called as ``on_touch(point)`` for every press,
+    on a target or not, before the target's handler.  If it returns True the
+    press goes no further, e.g. when it only woke the screen.
+    """
+
+    def __init__(self, ts, debounce=0.02, hold_time=0.6, cell=40, latency_budget=0.15, move_step=4):
+        self.ts = ts
+        self.debounce = debounce
+        self.hold_time = hold_time
+        self.move_step = move_step
+        self.cell = cell
+        self.latency_budget = latency_budget
+        self.on_touch = None
+        self._grid = {}
+        self.state = IDLE
+        self.target = None
+        self.point = None
+        self._since = 0.0  # when the current state started
+        self._released = 0.0
+        self._sum_x = 0
+        self._sum_y = 0
+        self._samples = 0
+        self._held = False
+        self._contact = 0.0  # first contact of the current press
+        self._awaiting = None  # first contact of a press whose response is not shown yet
+        self.presses = 0
+        self.holds = 0
+        self.moves = 0
+        self.releases = 0
+        self.bounces = 0
+        self.misses = 0
+        self.swallowed = 0
+        self.responses = 0
+        self.latency = 0.0
+        self.longest = 0.0
+        self.total_latency = 0.0
+        self.over_budget = 0
+
+    def add(self, x, y, width, height, key, on_press=None, on_hold=None, on_release=None, on_move=None):
+        """Register a rectangle; where targets overlap the first added wins.
+
+        ``on_move`` makes the target draggable: it is called with the new
+        point each time the finger has moved ``move_step`` pixels.
+        """
+        target = Target(x, y, width, height, key, on_press, on_hold, on_release, on_move)
+        cell = self.cell
+        for cx in range(x // cell, (x + width - 1) // cell + 1):
+            for cy in range(y // cell, (y + height - 1) // cell + 1):
+                self._grid.setdefault((cx, cy), []).append(target)
+        return target
+
+    def hit(self, x, y):
+        """Return the target under (x, y), or None."""
+        for target in self._grid.get((x // self.cell, y // self.cell), ()):
+            if target.contains(x, y):
+                return target
+        return None
+
+    def _sample(self, point):
+        self._sum_x += point[0]
+        self._sum_y += point[1]
+        self._samples += 1
+
+    def poll(self):
+        """Read the touchscreen once and fire whatever event is due.
+
+        :return: While a contact or its end is being debounced, the seconds
+            until it can count as a press or release, so the scheduler polls
+            again right then rather than a whole period later; otherwise None.
+        """
+        point = self.ts.touch_point
+        now = time.monotonic()
+        state = self.state
+        if state == IDLE:
+            if point:
+                self.state = PENDING
+                self._since = now
+                self._sum_x = self._sum_y = self._samples = 0
+                self._sample(point)
+                return self.debounce
+        elif state == PENDING:
+            if not point:
+                self.bounces += 1
+                self.state = IDLE
+                return None
+            self._sample(point)
+            if now - self._since >= self.debounce:
+                self._press(now)
+            else:
+                return self.debounce - (now - self._since)
+        elif state == PRESSED:
+            if point:
+                target = self.target
+                if (target is not None and target.on_move is not None
+                        and (abs(point[0] - self.point[0]) >= self.move_step
+                             or abs(point[1] - self.point[1]) >= self.move_step)):
+                    self._held = True  # a drag, never a hold
+                    self.point = (point[0], point[1])
+                    self.moves += 1
+                    target.on_move(target.key, self.point)
+                if not self._held and now - self._since >= self.hold_time:
+                    self._held = True
+                    self.holds += 1
+                    if self.target is not None and self.target.on_hold is not None:
+                        self.target.on_hold(self.target.key, self.point)
+            else:
+                self.state = RELEASING
+                self._released = now
+                return self.debounce
+        elif state == RELEASING:
+            if point:
+                self.state = PRESSED  # the finger bounced, still the same press
+            elif now - self._released < self.debounce:
+                return self.debounce - (now - self._released)
+            else:
+                self.state = IDLE
+                self.releases += 1
+                if self.target is not None and self.target.on_release is not None:
+                    self.target.on_release(self.target.key, self.point)
+                self.target = None
+
+    def _press(self, now):
+        x = self._sum_x // self._samples
+        y = self._sum_y // self._samples
+        self.point = (x, y)
+        self.target = self.hit(x, y)
+        self.state = PRESSED
+        self._held = False
+        self._contact = self._since
+        self._since = now
+        self.presses += 1
+        if self.on_touch is not None and self.on_touch(self.point):
+            self.target = None
+            self.swallowed += 1
+            return
+        if self.target is None:
+            self.misses += 1
+            return
+        if self.target.on_press is not None:
+            self.target.on_press(self.target.key, self.point)
+
+    def responded(self):
+        """Called by a handler that changed the screen; the current press is
+        timed until the next ``shown``."""
+        self._awaiting = self._contact
+
+    def shown(self):
+        """Called after every display refresh; ends the timing of a press
+        whose response it put on screen."""
+        if self._awaiting is None:
+            return
+        latency = time.monotonic() - self._awaiting
+        self._awaiting = None
+        self.responses += 1
+        self.latency = latency
+        self.total_latency += latency
+        if latency > self.longest:
+            self.longest = latency
+        if latency > self.latency_budget:
+            self.over_budget += 1
+
+    def stats(self):
+        """One line: event counts and first-contact-to-screen latency."""
+        return "touch: {} presses {} holds {} moves {} releases {} bounces {} misses {} swallowed, latency avg {:.0f}ms max {:.0f}ms over {} responses, {} over {:.0f}ms".format(
+            self.presses, self.holds, self.moves, self.releases, self.bounces, self.misses, self.swallowed,
+            1000 * self.total_latency / max(self.responses, 1), 1000 * self.longest, self.responses,
+            self.over_budget, 1000 * self.latency_budget)
@@ -0,0 +1,166 @@
+"""Views declared up front but only built when first needed.
+
+Each view is a function that builds and returns its Group.  ``Views`` calls
+it the first time the view is shown, so time to the first frame does not
+depend on how many views there are.  Cheap views never shown can be built
+ahead of time by ``prefetch`` while the scheduler is otherwise idle; a view
+that holds a lot of memory is left out, so it costs nothing until visited.  Views not shown
+for a while can be torn down by ``expire`` to give their memory back, and
+are built again on the next visit.
+
+Only the live view is on the display.  ``Views`` owns one Group, ``slot``,
+that goes into the display tree once, and showing a view puts its Group in
+the slot in place of the last one: one item assignment, with no search
+of the display tree.  Views are numbered in the order they were added, so a
+caller switches by index from a table.  Each switch is timed, from the
+start of ``switch`` to the end of the view's ``show`` function, and
+compared against ``switch_budget``.
+"""
+
+import time
+
+import displayio
+
+
+class View:
+    """One lazily built view and its counters."""
+
+    def __init__(self, name, build, teardown=None, show=None, prefetch=True):
+        self.name = name
+        self.build = build
+        self.teardown = teardown
+        self.show = show
+        self.prefetch = prefetch
+        self.index = None
+        self.group = None
+        self.last_shown = None
+        self.builds = 0
+        self.build_time = 0.0
+
+
+class Views:
+    """Named views, built on demand.
+
+    Usage::
+
+        views = Views(teardown_after=300, switch_budget=0.05)
+        splash.append(views.slot)
+        MAP = views.add("map", build_map_view, teardown_map_view)
+        views.switch(MAP)   # built on this first call
+
+    :param float teardown_after: Seconds a view may go unshown before
+        ``expire`` tears it down; None keeps every view once built.
+    :param float switch_budget: Seconds a switch may take before it is
+        counted as over budget; None counts none.
+    """
+
+    def __init__(self, teardown_after=None, switch_budget=None):
+        self.teardown_after = teardown_after
+        self.switch_budget = switch_budget
+        self.live = None
+        self.slot = displayio.Group()
+        self._views = {}
+        self._table = []  # views by index
+        self.switches = 0
+        self.switch_time = 0.0
+        self.last_switch = 0.0
+        self.worst_switch = 0.0
+        self.over_budget = 0
+
+    def add(self, name, build, teardown=None, show=None, prefetch=True):
+        """Declare a view.
+
+        :param build: Function returning the view's Group.
+        :param teardown: Optional function given the Group when the view is
+            torn down, to release what it holds (images, labels).
+        :param show: Optional function called as ``show(group, arg)`` each
+            time the view is switched to, to fill it in.
+        :param bool prefetch: False keeps ``prefetch`` from building the
+            view, for one whose memory should not be spent on a guess.
+        :return: The view's index, for ``switch``.
+        """
+        view = View(name, build, teardown, show, prefetch)
+        view.index = len(self._table)
+        self._views[name] = view
+        self._table.append(view)
+        return view.index
+
+    def _build(self, view):
+        start = time.monotonic()
+        view.group = view.build()
+        view.last_shown = time.monotonic()  # a prefetched view gets a full grace period
+        view.build_time += view.last_shown - start
+        view.builds += 1
+
+    def get(self, name):
+        """Return the Group for ``name``, building it if needed."""
+        view = self._views[name]
+        if view.group is None:
+            self._build(view)
+        return view.group
+
+    def switch(self, index, arg=None):
+        """Put view ``index`` in the slot and call its ``show`` with ``arg``.
+
+        :return: The view's Group.
+        """
+        start = time.monotonic()
+        view = self._table[index]
+        if view.group is None:
+            self._build(view)
+        group = view.group
+        slot = self.slot
+        if not len(slot):
+            slot.append(group)
+        elif slot[0] is not group:
+            slot[0] = group
+        if view.show is not None:
+            view.show(group, arg)
+        now = time.monotonic()
+        view.last_shown = now
+        self.live = view.name
+        elapsed = now - start
+        self.switches += 1
+        self.switch_time += elapsed
+        self.last_switch = elapsed
+        if elapsed > self.worst_switch:
+            self.worst_switch = elapsed
+        if self.switch_budget is not None and elapsed > self.switch_budget:
+            self.over_budget += 1
+        return group
+
+    def show(self, name, arg=None):
+        """``switch`` to a view by name."""
+        return self.switch(self._views[name].index, arg)
+
+    def prefetch(self):
+        """Build one prefetchable view that has never been built, if any; for
+        idle time."""
+        for view in self._views.values():
+            if view.builds == 0 and view.prefetch:
+                self._build(view)
+                return
+
+    def expire(self):
+        """Tear down views not shown for ``teardown_after`` seconds."""
+        if self.teardown_after is None:
+            return
+        now = time.monotonic()
+        for view in self._views.values():
+            if view.group is None or view.name == self.live:
+                continue
+            if now - view.last_shown >= self.teardown_after:
+                if view.teardown is not None:
+                    view.teardown(view.group)
+                view.group = None
+
+    def stats(self):
+        """One line for switches, then one per view: builds and time spent building."""
+        lines = ["views: {} switches, avg {:.1f}ms, last {:.1f}ms, max {:.1f}ms, {} over {}ms".format(
+            self.switches, 1000 * self.switch_time / max(self.switches, 1), 1000 * self.last_switch,
+            1000 * self.worst_switch, self.over_budget,
+            "-" if self.switch_budget is None else "{:.0f}".format(1000 * self.switch_budget))]
+        for view in self._views.values():
+            lines.append("{:<12} {:>3} builds {:.1f}ms {}".format(
+                view.name, view.builds, 1000 * view.build_time, "built" if view.group is not None else "-"))
+        return lines
@@ -0,0 +1,278 @@
+"""Crew vitals pulled from a base station over the ESP32 co-processor's WiFi.
+
+``VitalsFeed.poll`` runs as a scheduler task and moves one short step at a
+time: join the access point, open a connection, send one request, collect
+whatever part of the answer has arrived.  Each step is a handful of SPI
+commands to the ESP32, none of which waits on the network, so a slow or
+silent server holds up nothing but the feed itself.  The exception is
+opening a connection, which the co-processor does before answering; that
+happens once, as the connection is kept open and reused for every request,
+and after a failure no sooner than the backoff allows.
+
+One request per interval asks for every crew feed::
+
+    GET /vitals?feeds=johnson,ford&since=41 HTTP/1.1
+    If-None-Match: "41"
+
+and the server (``tools/vitals_server.py`` stands in for one) answers
+``304 Not Modified`` with no body when nothing changed, or with JSON holding
+only the feeds that changed since version 41::
+
+    {"version": 42, "feeds": {"ford": {"pulse": 68, "resp": 14}}}
+
+Either answer confirms every feed as current.  An answer of any other
+shape, or with a value outside 0 to ``MAX_VALUE``, fails the request without
+touching the values.  Values are kept after failures, and ``stale`` tells when the last confirmation is too old to
+trust.  Failed requests back off exponentially up to ``max_backoff``.
+"""
+
+import json
+import time
+
+WL_CONNECTED = 3
+SOCKET_CLOSED = 0
+SOCKET_ESTABLISHED = 4
+JOIN_TIMEOUT = 20  # seconds to join the access point
+MAX_VALUE = 255  # highest pulse or respiration accepted; the history keeps bytes
+
+IDLE = 0
+JOINING = 1
+CONNECTING = 2
+RECEIVING = 3
+
+
+def _parse_url(url):
+    """``(host, port, path)`` of an ``http://`` URL."""
+    if not url.startswith("http://"):
+        raise ValueError("only http:// URLs are supported: {}".format(url))
+    host, _, path = url[len("http://"):].partition("/")
+    host, _, port = host.partition(":")
+    return host, int(port) if port else 80, "/" + path
+
+
+def _check(answer):
+    """Raise ValueError unless ``answer`` has the shape of a vitals answer, so
+    a malformed body fails the request before any value is taken from it."""
+    if not isinstance(answer, dict) or not isinstance(answer.get("version"), int):
+        raise ValueError("answer without a version")
+    feeds = answer.get("feeds")
+    if not isinstance(feeds, dict):
+        raise ValueError("answer without feeds")
+    for values in feeds.values():
+        if not isinstance(values, dict):
+            raise ValueError("feed values are not an object")
+        for value in values.values():
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise ValueError("feed value is not an integer")
+            if not 0 <= value <= MAX_VALUE:
+                raise ValueError("feed value {} is out of range".format(value))
+
+
+class VitalsFeed:
+    """Latest pulse and respiration for each crew feed.
+
+    Usage::
+
+        feed = VitalsFeed(esp, "http://192.168.4.2:8080/vitals", ("johnson", "ford"),
+                          ssid=secrets["ssid"], password=secrets["password"])
+        feed.on_update = lambda name, values: print(name, values)
+        scheduler.add("vitals", feed.poll, 0.05)
+
+    :param esp: The ``adafruit_esp32spi.ESP_SPIcontrol`` of the co-processor.
+    :param str url: Base station endpoint.
+    :param feeds: Feed names to ask for.
+    :param float interval: Seconds between requests.
+    :param float timeout: Seconds a connection or an answer may take.
+    :param float stale_after: Seconds after the last answer that values
+        count as stale.
+    :param float max_backoff: Longest wait between failed requests.
+    :param str ssid: Access point to join first, or None if the
+        co-processor is already connected.
+    :param str password: Its passphrase.
+    :param int buffer_size: Largest answer accepted, headers included.
+    """
+
+    def __init__(self, esp, url, feeds, interval=5, timeout=5, stale_after=30, max_backoff=120,
+                 ssid=None, password=None, buffer_size=1024):
+        self.esp = esp
+        self.host, self.port, self.path = _parse_url(url)
+        self.feeds = tuple(feeds)
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.max_backoff = max_backoff
+        self.ssid = ssid
+        self.password = password
+        self.on_update = None
+        self.values = {}
+        self.version = None
+        self.confirmed = None  # when the server last vouched for every value
+        self.state = IDLE
+        self._socket = None
+        self._buffer = bytearray(buffer_size)
+        self._received = 0
+        self._started = 0.0
+        self._next = 0.0
+        self.failures = 0
+        self.requests = 0
+        self.connections = 0
+        self.not_modified = 0
+        self.updates = 0
+        self.errors = 0
+        self.last_error = None
+        self.bytes_received = 0
+        self.longest_step = 0.0
+
+    def stale(self, feed=None):
+        """True if ``feed`` (or any feed) has no value the server confirmed lately."""
+        if self.confirmed is None or (feed is not None and feed not in self.values):
+            return True
+        return time.monotonic() - self.confirmed > self.stale_after
+
+    def get(self, feed):
+        """Last known values of ``feed``, a dict, or None if never received."""
+        return self.values.get(feed)
+
+    def poll(self):
+        """Scheduler task: take the next step; returns seconds until the one after."""
+        start = time.monotonic()
+        try:
+            delay = self._step(start)
+        except (OSError, RuntimeError, ValueError) as error:
+            delay = self._fail(repr(error))
+        took = time.monotonic() - start
+        if took > self.longest_step:
+            self.longest_step = took
+        return delay
+
+    def _step(self, now):
+        esp = self.esp
+        state = self.state
+        if state == IDLE:
+            if now < self._next:
+                return self._next - now
+            self._started = now
+            if self.ssid is not None and esp.status != WL_CONNECTED:
+                esp.wifi_set_passphrase(bytes(self.ssid, "utf-8"), bytes(self.password or "", "utf-8"))
+                self.state = JOINING
+                return 0.25
+            return self._connect(now)
+        if now - self._started > (JOIN_TIMEOUT if state == JOINING else self.timeout):
+            return self._fail("timed out")
+        if state == JOINING:
+            if esp.status != WL_CONNECTED:
+                return 0.25
+            self._started = now
+            return self._connect(now)
+        if state == CONNECTING:
+            status = esp.socket_status(self._socket)
+            if status == SOCKET_ESTABLISHED:
+                return self._send()
+            if status == SOCKET_CLOSED:
+                return self._fail("connection refused")
+            return 0.05
+        return self._receive()
+
+    def _connect(self, now):
+        if self._socket is not None:
+            if self.esp.socket_status(self._socket) == SOCKET_ESTABLISHED:
+                return self._send()  # reuse the open connection
+            self._close()
+        self._socket = self.esp.get_socket()
+        self.esp.socket_open(self._socket, self.host, self.port)
+        self.connections += 1
+        self.state = CONNECTING
+        return 0.05
+
+    def _send(self):
+        since = "" if self.version is None else "&since={}".format(self.version)
+        match = "" if self.version is None else 'If-None-Match: "{}"\r\n'.format(self.version)
+        request = "GET {}?feeds={}{} HTTP/1.1\r\nHost: {}\r\n{}Connection: keep-alive\r\n\r\n".format(
+            self.path, ",".join(self.feeds), since, self.host, match)
+        self.esp.socket_write(self._socket, bytes(request, "utf-8"))
+        self.requests += 1
+        self._received = 0
+        self.state = RECEIVING
+        return 0.05
+
+    def _receive(self):
+        esp = self.esp
+        available = esp.socket_available(self._socket)
+        if not available:
+            if esp.socket_status(self._socket) != SOCKET_ESTABLISHED:
+                return self._fail("connection closed")
+            return 0.05
+        room = len(self._buffer) - self._received
+        if room <= 0:
+            return self._fail("answer too large")
+        data = esp.socket_read(self._socket, min(available, room))
+        self._buffer[self._received:self._received + len(data)] = data
+        self._received += len(data)
+        self.bytes_received += len(data)
+        return self._answer()
+
+    def _answer(self):
+        buffer = self._buffer
+        end = buffer.find(b"\r\n\r\n", 0, self._received)
+        if end < 0:
+            return 0.05  # headers not all here yet
+        lines = str(buffer[:end], "utf-8").split("\r\n")
+        status = lines[0].split(" ")
+        if len(status) < 2:
+            raise ValueError("bad status line")
+        status = int(status[1])
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        body_start = end + 4
+        if self._received < body_start + length:
+            return 0.05  # body still arriving
+        if headers.get("connection", "").lower() == "close":
+            self._close()
+        if status == 304:
+            self.not_modified += 1
+        elif status == 200:
+            self._update(json.loads(str(buffer[body_start:body_start + length], "utf-8")))
+        else:
+            return self._fail("HTTP {}".format(status))
+        self.confirmed = time.monotonic()
+        self.failures = 0
+        self.state = IDLE
+        self._next = self._started + self.interval
+        return max(0.0, self._next - time.monotonic())
+
+    def _update(self, answer):
+        _check(answer)
+        self.version = answer["version"]
+        for name, values in answer["feeds"].items():
+            self.values[name] = values
+            self.updates += 1
+            if self.on_update is not None:
+                self.on_update(name, values)
+
+    def _fail(self, reason):
+        self.errors += 1
+        self.failures += 1
+        self.last_error = reason
+        self._close()
+        self.state = IDLE
+        backoff = min(self.max_backoff, self.interval * (1 << min(self.failures, 16)))
+        self._next = time.monotonic() + backoff
+        return backoff
+
+    def _close(self):
+        if self._socket is not None:
+            try:
+                self.esp.socket_close(self._socket)
+            except (OSError, RuntimeError):
+                pass
+            self._socket = None
+
+    def stats(self):
+        """One line: requests against connections, answers, failures and freshness."""
+        age = "never" if self.confirmed is None else "{:.0f}s ago".format(time.monotonic() - self.confirmed)
+        return "vitals: {} requests on {} connections, {} not modified, {} updates, {} errors ({}), {} bytes, longest step {:.1f}ms, confirmed {}".format(
+            self.requests, self.connections, self.not_modified, self.updates, self.errors,
+            self.last_error or "none", self.bytes_received, 1000 * self.longest_step, age)